@@ -5,12 +5,17 @@ Production-optimized for Gemini API image generation
 
 import os
 from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import Response
 
 from models import ImageGenerationResponse
 from core import RecipeRecommender
 from core.s3_service import get_s3_service
 from database.session_storage_service import get_session_storage_service
-from helpers.image_helpers import validate_session_and_get_context, update_session_history
+from helpers.image_helpers import (
+    validate_session_and_get_context,
+    update_session_history,
+    extract_session_ingredients,
+)
 
 router = APIRouter(prefix="/api", tags=["images"])
 
@@ -23,6 +28,54 @@ def set_recommender(rec: RecipeRecommender):
     recommender = rec
 
 
+def check_image_generation_limit(user_email: str):
+    """
+    Raise 403 if the user has used up today's image generations
+    
+    Raises:
+        HTTPException: If the database is missing or the limit is reached
+    """
+    import psycopg
+    from psycopg.rows import dict_row
+    
+    supabase_url = os.getenv("SUPABASE_OG_URL")
+    if not supabase_url:
+        raise HTTPException(status_code=500, detail="Database not configured")
+    
+    with psycopg.connect(supabase_url, row_factory=dict_row) as conn:
+        with conn.cursor() as cursor:
+            # Call database function directly
+            cursor.execute("""
+                SELECT * FROM check_image_generation_limit(%s)
+            """, (user_email,))
+            
+            limit_result = cursor.fetchone()
+            
+            if not limit_result or not limit_result['allowed']:
+                message = f"You have reached your daily limit of {limit_result['max_allowed']} images. Please try again tomorrow."
+                raise HTTPException(
+                    status_code=403,
+                    detail=message
+                )
+
+
+def increment_image_generation_count(user_email: str):
+    """Count a successful generation against the user's daily limit (best effort)"""
+    try:
+        import psycopg
+        supabase_url = os.getenv("SUPABASE_OG_URL")
+        with psycopg.connect(supabase_url) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT increment_image_generation_count(%s) as success
+                """, (user_email,))
+                conn.commit()
+                print(f"   ✅ Incremented image generation count for {user_email}")
+    except Exception as increment_error:
+        print(f"⚠️  Failed to increment image count: {increment_error}")
+        # Continue anyway - image was generated
+
+
 @router.post("/step/gemini_image", response_model=ImageGenerationResponse)
 async def generate_gemini_image(
     session_id: str,
@@ -42,48 +95,13 @@ async def generate_gemini_image(
     """
     try:
         # Check image generation limit first
-        import psycopg
-        from psycopg.rows import dict_row
-        
-        supabase_url = os.getenv("SUPABASE_OG_URL")
-        if not supabase_url:
-            raise HTTPException(status_code=500, detail="Database not configured")
-        
-        with psycopg.connect(supabase_url, row_factory=dict_row) as conn:
-            with conn.cursor() as cursor:
-                # Call database function directly
-                cursor.execute("""
-                    SELECT * FROM check_image_generation_limit(%s)
-                """, (user_email,))
-                
-                limit_result = cursor.fetchone()
-                
-                if not limit_result or not limit_result['allowed']:
-                    message = f"You have reached your daily limit of {limit_result['max_allowed']} images. Please try again tomorrow."
-                    raise HTTPException(
-                        status_code=403,
-                        detail=message
-                    )
+        check_image_generation_limit(user_email)
         
         # Validate session and get context
         session, recipe_name, current_step, current_index = validate_session_and_get_context(session_id)
         
         # Get recipe ingredients for cumulative state tracking
-        recipe_ingredients = []
-        if "parsed_recipe" in session and session["parsed_recipe"]:
-            recipe_data = session["parsed_recipe"]
-            # Extract ingredients list from the recipe data
-            if "ingredients" in recipe_data:
-                ingredients_text = recipe_data["ingredients"]
-                # Parse ingredients (simple extraction)
-                import re
-                ingredients_lines = ingredients_text.strip().split('\n')
-                for line in ingredients_lines:
-                    # Extract ingredient name (before quantities/measurements)
-                    ingredient_match = re.search(r'-\s*([^-\d]+?)(?:\s*[-\d]|$)', line)
-                    if ingredient_match:
-                        ingredient_name = ingredient_match.group(1).strip()
-                        recipe_ingredients.append(ingredient_name)
+        recipe_ingredients = extract_session_ingredients(session)
         
         # Generate image using Gemini with cumulative state
         try:
@@ -135,20 +153,8 @@ async def generate_gemini_image(
         
         # If image was generated, increment count FIRST (regardless of S3 upload)
         if image_base64:
-            try:
-                # Increment generation count - do this FIRST after successful generation
-                import psycopg
-                supabase_url = os.getenv("SUPABASE_OG_URL")
-                with psycopg.connect(supabase_url) as conn:
-                    with conn.cursor() as cursor:
-                        cursor.execute("""
-                            SELECT increment_image_generation_count(%s) as success
-                        """, (user_email,))
-                        conn.commit()
-                        print(f"   ✅ Incremented image generation count for {user_email}")
-            except Exception as increment_error:
-                print(f"⚠️  Failed to increment image count: {increment_error}")
-                # Continue anyway - image was generated
+            # Increment generation count - do this FIRST after successful generation
+            increment_image_generation_count(user_email)
         
         # Upload to S3 and store in session
         if image_base64:
@@ -210,3 +216,55 @@ async def generate_gemini_image(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+
+
+@router.post(
+    "/step/gemini_image.png",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}}}
+)
+async def generate_gemini_image_binary(
+    session_id: str,
+    user_email: str = Header(..., alias="X-User-Email")
+):
+    """
+    Generate image for current cooking step and return it as binary PNG
+    
+    Same generation and limits as /step/gemini_image, but the image bytes
+    are streamed as the response body instead of base64 inside JSON
+    (no S3 upload, ~33% less bandwidth). The prompt used is returned in
+    the X-Image-Description header.
+    """
+    try:
+        check_image_generation_limit(user_email)
+        
+        session, recipe_name, current_step, current_index = validate_session_and_get_context(session_id)
+        
+        try:
+            image_bytes, description = recommender.generate_image_bytes_with_gemini(
+                recipe_name,
+                current_step,
+                session_id=session_id,
+                step_index=current_index,
+                ingredients=extract_session_ingredients(session)
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Image generation failed: {str(e)}")
+        
+        update_session_history(session, current_index, description)
+        
+        if not image_bytes:
+            raise HTTPException(status_code=502, detail="No image data returned from Gemini")
+        
+        increment_image_generation_count(user_email)
+        
+        return Response(
+            content=image_bytes,
+            media_type="image/png",
+            headers={"X-Image-Description": description.encode("ascii", "ignore").decode()[:1024].replace("\n", " ")}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
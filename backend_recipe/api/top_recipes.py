@@ -27,6 +27,7 @@ from core.top_recipes_service import (
     update_recipe,
     delete_recipe,
     get_filter_options,
+    TOP_RECIPES_MAX_LIMIT,
     TopRecipe,
     TopRecipeSummary
 )
@@ -154,7 +155,7 @@ def convert_summary_to_model(summary: TopRecipeSummary) -> TopRecipeSummaryModel
 @router.get("/", response_model=TopRecipesResponse)
 async def list_top_recipes(
     page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(30, ge=1, le=100, description="Recipes per page"),
+    page_size: int = Query(30, ge=1, le=TOP_RECIPES_MAX_LIMIT, description="Recipes per page"),
     region: Optional[str] = Query(None, description="Filter by region"),
     difficulty: Optional[str] = Query(None, description="Filter by difficulty"),
     meal_types: Optional[str] = Query(None, description="Comma-separated meal types"),
@@ -5,7 +5,7 @@ Module Structure:
 - BaseRecommender: Shared functionality (image generation, alternatives)
 - RecipeRecommender: RAG-based recommender (PDF/vector store)
 - OptimizedRecipeRecommender: Database-first recommender (structured queries)
-- ImageGenerator: Unified image generation (Gemini + Stable Diffusion)
+- ImageGenerator: Unified image generation (Imagen, with Gemini batch mode)
 """
 
 from .base_recommender import BaseRecommender
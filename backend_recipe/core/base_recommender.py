@@ -68,50 +68,87 @@ class BaseRecommender:
         Returns:
             Tuple of (base64_image_string, prompt_used)
         """
-        # If session tracking is enabled, use cumulative state
-        if session_id and step_index is not None:
-            # Get or create cumulative state for this session
-            if session_id not in self._cumulative_states:
-                self._cumulative_states[session_id] = CumulativeRecipeState(
-                    llm=self.llm,
-                    recipe_name=recipe_name,
-                    total_ingredients=ingredients or []
-                )
-            
-            state = self._cumulative_states[session_id]
-            
-            # Add current step to state
-            visual_state = state.add_step(step_index, step_description)
-            
-            # Get cumulative prompt with positive/negative
-            prompt_data = state.get_cumulative_prompt(step_description)
-            
-            # Log confidence and state
-            metadata = prompt_data.get("metadata", {})
-            print(f"   📊 State confidence: {metadata.get('confidence', 0):.2f}")
-            print(f"   👁️ Visible ingredients: {metadata.get('visible_count', 0)}")
-            print(f"   🚫 Absent ingredients: {metadata.get('absent_count', 0)}")
-            
-            if metadata.get("fallback"):
-                print("   ⚠️ Using conservative fallback due to low confidence")
-            
-            # Format for Gemini (concatenate positive and negative)
-            # Note: Gemini doesn't have separate negative prompt field, 
-            # so we include it in the main prompt
-            cumulative_prompt = (
-                f"{prompt_data['positive']}\n\n"
-                f"IMPORTANT CONSTRAINTS:\n{prompt_data['negative']}"
-            )
-            
-            # Generate image with cumulative state
-            return self.image_generator.generate_image(
-                recipe_name, 
-                step_description,
-                cumulative_prompt=cumulative_prompt
+        cumulative_prompt = self._build_cumulative_image_prompt(
+            recipe_name, step_description, session_id, step_index, ingredients
+        )
+        return self.image_generator.generate_image(
+            recipe_name,
+            step_description,
+            cumulative_prompt=cumulative_prompt
+        )
+    
+    def generate_image_bytes_with_gemini(
+        self,
+        recipe_name: str,
+        step_description: str,
+        session_id: Optional[str] = None,
+        step_index: Optional[int] = None,
+        ingredients: Optional[List[str]] = None
+    ) -> Tuple[Optional[bytes], str]:
+        """
+        Same as generate_image_with_gemini, but returns raw image bytes
+        
+        Returns:
+            Tuple of (image_bytes, prompt_used)
+        """
+        cumulative_prompt = self._build_cumulative_image_prompt(
+            recipe_name, step_description, session_id, step_index, ingredients
+        )
+        return self.image_generator.generate_image_raw(
+            recipe_name,
+            step_description,
+            cumulative_prompt=cumulative_prompt
+        )
+    
+    def _build_cumulative_image_prompt(
+        self,
+        recipe_name: str,
+        step_description: str,
+        session_id: Optional[str],
+        step_index: Optional[int],
+        ingredients: Optional[List[str]]
+    ) -> Optional[str]:
+        """
+        Advance the session's cumulative state and build the step prompt
+        
+        Returns:
+            Cumulative prompt, or None for standard generation (no session tracking)
+        """
+        if not session_id or step_index is None:
+            return None
+        
+        # Get or create cumulative state for this session
+        if session_id not in self._cumulative_states:
+            self._cumulative_states[session_id] = CumulativeRecipeState(
+                llm=self.llm,
+                recipe_name=recipe_name,
+                total_ingredients=ingredients or []
             )
-        else:
-            # Standard generation without state tracking
-            return self.image_generator.generate_image(recipe_name, step_description)
+        
+        state = self._cumulative_states[session_id]
+        
+        # Add current step to state
+        visual_state = state.add_step(step_index, step_description)
+        
+        # Get cumulative prompt with positive/negative
+        prompt_data = state.get_cumulative_prompt(step_description)
+        
+        # Log confidence and state
+        metadata = prompt_data.get("metadata", {})
+        print(f"   📊 State confidence: {metadata.get('confidence', 0):.2f}")
+        print(f"   👁️ Visible ingredients: {metadata.get('visible_count', 0)}")
+        print(f"   🚫 Absent ingredients: {metadata.get('absent_count', 0)}")
+        
+        if metadata.get("fallback"):
+            print("   ⚠️ Using conservative fallback due to low confidence")
+        
+        # Format for Gemini (concatenate positive and negative)
+        # Note: Gemini doesn't have separate negative prompt field, 
+        # so we include it in the main prompt
+        return (
+            f"{prompt_data['positive']}\n\n"
+            f"IMPORTANT CONSTRAINTS:\n{prompt_data['negative']}"
+        )
     
     def generate_image_prompt(
         self, 
@@ -5,6 +5,7 @@ Uses LangChain memory components to track recipe progress and maintain context
 
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import hashlib
 import json
 
 # For LangChain v1.0+, memory classes are in langchain_community
@@ -61,6 +62,14 @@ class CumulativeRecipeState:
     Tracks what has been done so far to generate accurate images
     """
     
+    # Shared across instances: canonical state hash -> (positive, negative)
+    # Identical visual states (common for "mix"/"stir" steps) reuse the
+    # prompt instead of making another visual-enhancer LLM call
+    _prompt_cache: Dict[str, Tuple[str, str]] = {}
+    _prompt_cache_max_size = 512
+    _prompt_cache_hits = 0
+    _prompt_cache_misses = 0
+    
     def __init__(self, llm, recipe_name: str, total_ingredients: List[str]):
         """
         Initialize cumulative recipe state
@@ -351,6 +360,45 @@ Return ONLY the JSON object, nothing else.""",
         }
         cooking_state = state_map.get(last_action.action_type, "cooking") if last_action else "cooking"
         
+        cache_key = self._prompt_cache_key(
+            current_step_description,
+            visible_names,
+            preparation_map,
+            cooking_state
+        )
+        cached = CumulativeRecipeState._prompt_cache.get(cache_key)
+        if cached:
+            CumulativeRecipeState._prompt_cache_hits += 1
+            positive, negative = cached
+        else:
+            CumulativeRecipeState._prompt_cache_misses += 1
+            positive, negative = self._build_cumulative_prompt(
+                current_step_description,
+                visible_names,
+                preparation_map,
+                cooking_state
+            )
+            self._store_prompt(cache_key, positive, negative)
+        
+        return {
+            "positive": positive,
+            "negative": negative,
+            "metadata": {
+                "confidence": last_action.confidence if last_action else 0.0,
+                "step_number": self.current_visual_state.step_number,
+                "visible_count": len(visible_names),
+                "absent_count": len(self.current_visual_state.absent_ingredients)
+            }
+        }
+    
+    def _build_cumulative_prompt(
+        self,
+        current_step_description: str,
+        visible_names: List[str],
+        preparation_map: Dict[str, str],
+        cooking_state: str
+    ) -> Tuple[str, str]:
+        """Build (positive, negative) prompts for the current visual state"""
         # Use visual enhancer to create descriptive prompt
         print(f"\n🎨 Generating visual prompt:")
         print(f"   Visible ingredients to describe: {visible_names}")
@@ -395,15 +443,44 @@ Return ONLY the JSON object, nothing else.""",
             recipe_name=self.recipe_name
         )
         
+        return positive, negative
+    
+    def _prompt_cache_key(
+        self,
+        current_step_description: str,
+        visible_names: List[str],
+        preparation_map: Dict[str, str],
+        cooking_state: str
+    ) -> str:
+        """Content hash over the canonicalized inputs of _build_cumulative_prompt"""
+        canonical = json.dumps(
+            {
+                "recipe_name": self.recipe_name,
+                "step_description": current_step_description,
+                "visible": sorted(visible_names),
+                "preparation": preparation_map,
+                "cooking_state": cooking_state,
+                "absent": sorted(self.current_visual_state.absent_ingredients)
+            },
+            sort_keys=True
+        )
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+    
+    @classmethod
+    def _store_prompt(cls, cache_key: str, positive: str, negative: str):
+        """Store prompts, evicting the oldest entry when full"""
+        if len(cls._prompt_cache) >= cls._prompt_cache_max_size:
+            cls._prompt_cache.pop(next(iter(cls._prompt_cache)), None)
+        cls._prompt_cache[cache_key] = (positive, negative)
+    
+    @classmethod
+    def cache_info(cls) -> Dict[str, int]:
+        """Prompt cache statistics for observability"""
         return {
-            "positive": positive,
-            "negative": negative,
-            "metadata": {
-                "confidence": last_action.confidence if last_action else 0.0,
-                "step_number": self.current_visual_state.step_number,
-                "visible_count": len(visible_names),
-                "absent_count": len(self.current_visual_state.absent_ingredients)
-            }
+            "hits": cls._prompt_cache_hits,
+            "misses": cls._prompt_cache_misses,
+            "size": len(cls._prompt_cache),
+            "max_size": cls._prompt_cache_max_size
         }
     
     def _get_conservative_prompt(self) -> Dict[str, str]:
@@ -451,6 +528,41 @@ Return ONLY the JSON object, nothing else.""",
             ]
         }
     
+    def snapshot(self) -> Dict:
+        """
+        Serializable copy of the state later steps build on (see restore)
+        
+        Only the latest step is kept: prompts read the current visual state
+        and the last action, never older history.
+        """
+        last_step = self.step_states[-1] if self.step_states else None
+        return {
+            "last_step": last_step.model_dump() if last_step else None,
+            "visible_ingredients": [ing.model_dump() for ing in self.visible_ingredients.values()],
+            "absent_ingredients": list(self.absent_ingredients)
+        }
+    
+    def restore(self, snapshot: Dict):
+        """
+        Continue from a snapshot() instead of replaying the earlier steps
+        
+        Args:
+            snapshot: Dict returned by snapshot() (e.g. from a previous run)
+        """
+        self.reset()
+        self.visible_ingredients = {
+            ing["name"]: IngredientState.model_validate(ing)
+            for ing in snapshot.get("visible_ingredients") or []
+        }
+        self.absent_ingredients = list(snapshot.get("absent_ingredients", self.total_ingredients))
+        
+        if snapshot.get("last_step"):
+            step_state = RecipeStepState.model_validate(snapshot["last_step"])
+            self.step_states.append(step_state)
+            self.current_visual_state = step_state.visual_state
+            if step_state.visual_state:
+                self._update_memory(step_state.step_description, step_state.visual_state)
+    
     def reset(self):
         """Reset the cumulative state"""
         self.step_states.clear()
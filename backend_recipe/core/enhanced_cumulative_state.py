@@ -3,12 +3,38 @@ Enhanced Cumulative State System
 Integrates visual state management, step parsing, and prompt generation
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import os
 import json
+import logging
 
-from .visual_state_models import RecipeVisualStateManager, StepAction
+from pydantic_core import to_json
+
+from .visual_state_models import (
+    EnhancedStateSnapshot,
+    IngredientState,
+    RecipeVisualStateManager,
+    StepAction,
+    VisualState,
+)
 from .step_parser import DeterministicStepParser
-from .visual_prompt_generator import VisualPromptGenerator, EnhancedImageGenerator
+from .visual_prompt_generator import VisualPromptGenerator
+from .enhanced_state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+
+def _construct_visual_state(data: Dict) -> VisualState:
+    """Rebuild a trusted VisualState dict without validation (incl. nested ingredients)"""
+    return VisualState.model_construct(**{
+        **data,
+        "visible_ingredients": [
+            IngredientState.model_construct(**ingredient)
+            for ingredient in data["visible_ingredients"]
+        ]
+    })
 
 
 class EnhancedCumulativeState:
@@ -41,6 +67,56 @@ class EnhancedCumulativeState:
         
         # Track parsing confidence
         self.step_confidences: Dict[int, float] = {}
+        self._confidence_sum = 0.0
+        
+        # Memoized results (cleared whenever state is restored)
+        # (step_number, step_text) -> full image prompt
+        self._image_prompt_cache: Dict[Tuple[int, str], str] = {}
+        # (visual state hash, low confidence) -> prompts dict
+        self._prompt_cache: Dict[Tuple[str, bool], Dict[str, str]] = {}
+        
+        # Canonical visual state hash -> first prompt rendered for it.
+        # Persisted, so visually-equivalent later steps reuse that prompt
+        # (and therefore its image from the image ledger)
+        self.state_prompts: Dict[str, str] = {}
+    
+    @staticmethod
+    def state_hash(visual_state: VisualState) -> str:
+        """Canonical hash of a visual state, stable across processes"""
+        canonical = json.dumps(visual_state.model_dump(), sort_keys=True)
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def canonical_state_hash(visual_state: VisualState) -> str:
+        """
+        Hash of what a state looks like, ignoring the step number
+        
+        Ingredients are sorted and pan state normalized so that e.g. a
+        "stir" step and a following "let simmer" step that leave the pan
+        unchanged collapse to the same hash.
+        """
+        canonical = {
+            "visible": sorted(
+                (ing.name.lower(), (ing.preparation or "").lower())
+                for ing in visual_state.visible_ingredients
+                if ing.visible
+            ),
+            "absent": sorted(name.lower() for name in visual_state.absent_ingredients),
+            "pan_state": " ".join(visual_state.pan_state.lower().split()),
+            "utensil": visual_state.utensil,
+            "flame_level": visual_state.flame_level,
+            "lighting": visual_state.lighting,
+            "camera_angle": visual_state.camera_angle
+        }
+        return hashlib.blake2b(
+            json.dumps(canonical, sort_keys=True).encode("utf-8"),
+            digest_size=16
+        ).hexdigest()
+    
+    def clear_caches(self):
+        """Drop memoized prompts (call after restoring or rewinding state)"""
+        self._image_prompt_cache.clear()
+        self._prompt_cache.clear()
     
     def process_step(
         self, 
@@ -57,31 +133,65 @@ class EnhancedCumulativeState:
         Returns:
             Tuple of (prompts_dict, parsed_action)
         """
-        # Parse the step into structured action
-        action = self.step_parser.parse_step(step_text, step_number)
-        
-        # Apply action to visual state
-        new_state = self.state_manager.apply_action(action)
+        applied = self._applied_step(step_number)
+        if applied is not None:
+            # Already applied (e.g. a retry after the session was persisted):
+            # reuse its action and resulting state instead of applying it twice
+            action, new_state = applied
+        else:
+            # Parse the step into structured action
+            action = self.step_parser.parse_step(step_text, step_number)
+            
+            # Apply action to visual state
+            new_state = self.state_manager.apply_action(action)
         
         # Track confidence
-        self.step_confidences[step_number] = action.confidence
+        self._record_confidence(step_number, action.confidence)
         
-        # Generate prompts from state
-        prompts = self.prompt_generator.generate_prompts(
-            new_state,
-            step_text,
-            action.confidence
-        )
+        # Generate prompts from state (reuse prompts for an identical state)
+        prompt_key = (self.state_hash(new_state), action.confidence < 0.5)
+        prompts = self._prompt_cache.get(prompt_key)
+        if prompts is None:
+            prompts = self.prompt_generator.generate_prompts(
+                new_state,
+                step_text,
+                action.confidence
+            )
+            self._prompt_cache[prompt_key] = prompts
         
         # Log the processing
         self._log_step_processing(step_number, step_text, action, new_state)
         
         return prompts, action
     
+    def _applied_step(self, step_number: int) -> Optional[Tuple[StepAction, VisualState]]:
+        """(action, state after it) for a step already applied to the visual state, or None"""
+        manager = self.state_manager
+        for index in range(len(manager.actions_history) - 1, -1, -1):
+            if manager.actions_history[index].step_number == step_number:
+                # state_history[i] is the state before action i
+                if index + 1 < len(manager.state_history):
+                    return manager.actions_history[index], manager.state_history[index + 1]
+                return manager.actions_history[index], manager.current_state
+        return None
+    
+    def _record_confidence(self, step_number: int, confidence: float):
+        """Track a step's confidence, keeping the running sum in step"""
+        self._confidence_sum += confidence - self.step_confidences.get(step_number, 0.0)
+        self.step_confidences[step_number] = confidence
+    
+    def _restore_confidences(self, step_confidences: Dict[int, float]):
+        """Replace all confidences (on load) and rebuild the running sum once"""
+        self.step_confidences = step_confidences
+        self._confidence_sum = sum(step_confidences.values())
+    
     def get_image_prompt(self, step_number: int, step_text: str) -> str:
         """
         Get complete image generation prompt for a step
         
+        Repeated calls for the same step (retries, re-renders) return the
+        memoized prompt without re-parsing or re-applying the step.
+        
         Args:
             step_number: Step number
             step_text: Step description
@@ -89,19 +199,34 @@ class EnhancedCumulativeState:
         Returns:
             Complete prompt for image generation
         """
-        prompts, _ = self.process_step(step_number, step_text)
+        cache_key = (step_number, step_text)
+        cached = self._image_prompt_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        # Combine prompts for Gemini-style API
-        full_prompt = f"""{prompts['positive']}
-
-STRICT REQUIREMENTS - MUST NOT SHOW:
-{prompts['negative']}
-
-{prompts['style_suffix']}"""
+        prompts, action = self.process_step(step_number, step_text)
         
+        # Combine prompts for Gemini-style API (single allocation)
+        parts = []
         if 'note' in prompts:
-            full_prompt = f"[{prompts['note']}]\n\n{full_prompt}"
+            parts.append(f"[{prompts['note']}]\n\n")
+        parts.extend([
+            prompts['positive'],
+            "\n\nSTRICT REQUIREMENTS - MUST NOT SHOW:\n",
+            prompts['negative'],
+            "\n\n",
+            prompts['style_suffix']
+        ])
+        full_prompt = "".join(parts)
+        
+        # Collapse onto the prompt of an earlier, visually identical state
+        _, step_state = self._applied_step(step_number)
+        state_key = self.canonical_state_hash(step_state)
+        if action.confidence < 0.5:
+            state_key += ":low"
+        full_prompt = self.state_prompts.setdefault(state_key, full_prompt)
         
+        self._image_prompt_cache[cache_key] = full_prompt
         return full_prompt
     
     def get_current_state_summary(self) -> Dict:
@@ -119,7 +244,7 @@ STRICT REQUIREMENTS - MUST NOT SHOW:
             "absent_ingredients": current.absent_ingredients,
             "pan_state": current.pan_state,
             "total_steps_processed": len(self.state_manager.state_history),
-            "average_confidence": sum(self.step_confidences.values()) / len(self.step_confidences) if self.step_confidences else 0
+            "average_confidence": self._confidence_sum / len(self.step_confidences) if self.step_confidences else 0
         }
     
     def _log_step_processing(
@@ -129,30 +254,52 @@ STRICT REQUIREMENTS - MUST NOT SHOW:
         action: StepAction,
         new_state
     ):
-        """Log step processing for debugging"""
-        print(f"\n=== Step {step_number} Processing ===")
-        print(f"Text: {step_text}")
-        print(f"Parsed Action: {action.action_type}")
-        print(f"Added: {action.ingredients_added}")
-        print(f"Removed: {action.ingredients_removed}")
-        print(f"Visible now: {[ing.name for ing in new_state.visible_ingredients]}")
-        print(f"Absent: {new_state.absent_ingredients}")
-        print(f"Confidence: {action.confidence:.2f}")
+        """Log step processing for debugging (only formatted when DEBUG is on)"""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        logger.debug(
+            "Step %d processed: text=%r action=%s added=%s removed=%s "
+            "visible=%s absent=%s confidence=%.2f",
+            step_number,
+            step_text,
+            action.action_type,
+            action.ingredients_added,
+            action.ingredients_removed,
+            [ing.name for ing in new_state.visible_ingredients],
+            new_state.absent_ingredients,
+            action.confidence
+        )
+    
+    def _snapshot(self) -> EnhancedStateSnapshot:
+        """Wrap current state in a snapshot model (no re-validation)"""
+        return EnhancedStateSnapshot.model_construct(
+            recipe_name=self.recipe_name,
+            all_ingredients=self.all_ingredients,
+            current_state=self.state_manager.current_state,
+            state_history=self.state_manager.state_history,
+            actions_history=self.state_manager.actions_history,
+            step_confidences=self.step_confidences,
+            state_prompts=self.state_prompts
+        )
     
     def save_to_dict(self) -> Dict:
         """Save state to dictionary for persistence"""
-        return {
-            "recipe_name": self.recipe_name,
-            "all_ingredients": self.all_ingredients,
-            "current_state": self.state_manager.current_state.model_dump(),
-            "state_history": [state.model_dump() for state in self.state_manager.state_history],
-            "actions_history": [action.model_dump() for action in self.state_manager.actions_history],
-            "step_confidences": self.step_confidences
-        }
+        return self._snapshot().model_dump()
+    
+    def save_to_json(self) -> bytes:
+        """Serialize state to JSON bytes in one pass (for Redis/disk)"""
+        return to_json(self._snapshot())
     
     @classmethod
     def load_from_dict(cls, data: Dict, llm):
-        """Load state from dictionary"""
+        """
+        Load state from dictionary
+        
+        The dictionary must come from save_to_dict (trusted, already
+        validated), so models are rebuilt with model_construct and skip
+        Pydantic validation. Use load_from_json for untrusted payloads.
+        """
         instance = cls(
             llm=llm,
             recipe_name=data["recipe_name"],
@@ -160,15 +307,38 @@ STRICT REQUIREMENTS - MUST NOT SHOW:
         )
         
         # Restore state
-        from .visual_state_models import VisualState
-        instance.state_manager.current_state = VisualState(**data["current_state"])
+        instance.state_manager.current_state = _construct_visual_state(data["current_state"])
         instance.state_manager.state_history = [
-            VisualState(**state) for state in data["state_history"]
+            _construct_visual_state(state) for state in data["state_history"]
         ]
         instance.state_manager.actions_history = [
-            StepAction(**action) for action in data["actions_history"]
+            StepAction.model_construct(**action) for action in data["actions_history"]
         ]
-        instance.step_confidences = data["step_confidences"]
+        # JSON round-trips turn int keys into strings
+        instance._restore_confidences({
+            int(step): confidence for step, confidence in data["step_confidences"].items()
+        })
+        instance.state_prompts = dict(data.get("state_prompts", {}))
+        instance.clear_caches()
+        
+        return instance
+    
+    @classmethod
+    def load_from_json(cls, payload, llm):
+        """Load state from JSON produced by save_to_json"""
+        snapshot = EnhancedStateSnapshot.model_validate_json(payload)
+        
+        instance = cls(
+            llm=llm,
+            recipe_name=snapshot.recipe_name,
+            all_ingredients=snapshot.all_ingredients
+        )
+        instance.state_manager.current_state = snapshot.current_state
+        instance.state_manager.state_history = snapshot.state_history
+        instance.state_manager.actions_history = snapshot.actions_history
+        instance._restore_confidences(snapshot.step_confidences)
+        instance.state_prompts = snapshot.state_prompts
+        instance.clear_caches()
         
         return instance
 
@@ -187,24 +357,153 @@ def integrate_with_existing_system(
     
     This can be called from the existing generate_image_with_gemini method
     """
-    # Create or retrieve enhanced state for session
-    # In production, this would use Redis or session storage
+    # Retrieve the session's enhanced state (or start a new one)
+    store = get_state_store()
+    payload = store.get(session_id)
+    state = EnhancedCumulativeState.load_from_json(payload, llm) if payload else None
+    if state is None or state.recipe_name != recipe_name:
+        state = EnhancedCumulativeState(
+            llm=llm,
+            recipe_name=recipe_name,
+            all_ingredients=all_ingredients
+        )
+    
+    # Get enhanced prompt (reuses the prompt of an earlier, visually
+    # identical step, so the image ledger can serve that step's image)
+    prompt = state.get_image_prompt(step_index, step_text)
+    store.set(session_id, state.save_to_json())
+    
+    # Generate image with enhanced prompt
+    return base_image_generator.generate_image(recipe_name, step_text, cumulative_prompt=prompt)
+
+
+def _build_recipe_prompts(
+    llm,
+    recipe_name: str,
+    steps: List[str],
+    all_ingredients: List[str]
+) -> List[str]:
+    """Build every step prompt in order so visual state advances deterministically"""
     state = EnhancedCumulativeState(
         llm=llm,
         recipe_name=recipe_name,
         all_ingredients=all_ingredients
     )
+    # Parse all steps up front (one LLM call for every low-confidence step);
+    # the per-step calls below are then served from the parse cache
+    state.step_parser.parse_steps(steps)
     
-    # Get enhanced prompt
-    prompt = state.get_image_prompt(step_index, step_text)
+    return [
+        state.get_image_prompt(step_index, step_text)
+        for step_index, step_text in enumerate(steps)
+    ]
+
+
+def _dedupe_prompts(prompts: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    Collapse repeated prompts (visually identical steps)
     
-    # Generate image with enhanced prompt
-    enhanced_gen = EnhancedImageGenerator(base_image_generator)
-    visual_state = state.state_manager.current_state
-    
-    return enhanced_gen.generate_with_visual_state(
-        recipe_name,
-        step_text,
-        visual_state,
-        state.step_confidences.get(step_index, 1.0)
-    )
+    Returns:
+        Tuple of (unique_prompts, slot index into unique_prompts per step)
+    """
+    slots: Dict[str, int] = {}
+    step_slots = [slots.setdefault(prompt, len(slots)) for prompt in prompts]
+    return list(slots), step_slots
+
+
+def integrate_batch_with_existing_system(
+    base_image_generator,
+    llm,
+    recipe_name: str,
+    steps: List[str],
+    all_ingredients: List[str],
+    callback: Optional[Callable[[int, Optional[str]], None]] = None
+) -> List[Tuple[Optional[str], str]]:
+    """
+    Batch variant of integrate_with_existing_system for a whole recipe
+    
+    Prompts are built in step order and then submitted as one Gemini
+    batch job. Per-step results are delivered through
+    callback(step_index, image).
+    
+    Returns:
+        List of (base64_image, prompt_used) tuples, one per step
+    """
+    prompts = _build_recipe_prompts(llm, recipe_name, steps, all_ingredients)
+    unique_prompts, step_slots = _dedupe_prompts(prompts)
+    
+    unique_callback = None
+    if callback:
+        def unique_callback(unique_index: int, image: Optional[str]):
+            for step_index, slot in enumerate(step_slots):
+                if slot == unique_index:
+                    callback(step_index, image)
+    
+    images = base_image_generator.generate_images_batch(unique_prompts, callback=unique_callback)
+    
+    return [(images[slot], prompt) for slot, prompt in zip(step_slots, prompts)]
+
+
+def integrate_parallel_with_existing_system(
+    base_image_generator,
+    llm,
+    recipe_name: str,
+    steps: List[str],
+    all_ingredients: List[str],
+    max_workers: Optional[int] = None
+) -> List[Tuple[Optional[str], str]]:
+    """
+    Parallel variant of integrate_with_existing_system for a whole recipe
+    
+    Prompts are built in step order on the calling thread, then the
+    image calls run concurrently on a bounded thread pool.
+    
+    Returns:
+        List of (base64_image, prompt_used) tuples, one per step
+    """
+    prompts = _build_recipe_prompts(llm, recipe_name, steps, all_ingredients)
+    unique_prompts, step_slots = _dedupe_prompts(prompts)
+    
+    images = base_image_generator.generate_images_parallel(unique_prompts, max_workers=max_workers)
+    
+    return [(images[slot], prompt) for slot, prompt in zip(step_slots, prompts)]
+
+
+async def integrate_async_with_existing_system(
+    base_image_generator,
+    llm,
+    recipe_name: str,
+    steps: List[str],
+    all_ingredients: List[str],
+    max_concurrency: Optional[int] = None
+) -> List[Tuple[Optional[str], str]]:
+    """
+    Async variant of integrate_with_existing_system for a whole recipe
+    
+    Prompts are built in step order, then the image calls are awaited
+    concurrently on the event loop (bounded by max_concurrency).
+    
+    Returns:
+        List of (base64_image, prompt_used) tuples, one per step
+    """
+    # Prompt building parses steps (possibly calling the LLM), so keep it off the event loop
+    prompts = await asyncio.to_thread(_build_recipe_prompts, llm, recipe_name, steps, all_ingredients)
+    
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("IMAGE_GEN_MAX_WORKERS", "4"))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def render(prompt: str) -> Tuple[Optional[str], str]:
+        async with semaphore:
+            try:
+                return await base_image_generator.generate_image_async(
+                    recipe_name, "", cumulative_prompt=prompt
+                )
+            except Exception as e:
+                print(f"   ❌ Async image generation failed: {e}")
+                return None, prompt
+    
+    unique_prompts, step_slots = _dedupe_prompts(prompts)
+    results = await asyncio.gather(*(render(prompt) for prompt in unique_prompts))
+    
+    return [results[slot] for slot in step_slots]
@@ -0,0 +1,149 @@
+"""
+Enhanced State Store
+====================
+Session-scoped persistence for EnhancedCumulativeState snapshots so the
+cumulative visual state survives between requests (and web workers).
+Payloads are the JSON bytes produced by EnhancedCumulativeState.save_to_json.
+
+Uses Redis when REDIS_URL is set, otherwise an in-process store. Redis
+payloads are zstd-compressed (optionally with a trained dictionary from
+SESSION_STATE_ZSTD_DICT) when the zstandard package is installed.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_TTL_SECONDS = 3600
+
+# Every zstd frame starts with this magic number
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def state_key(session_id: str) -> str:
+    """Redis key for a session's enhanced cumulative state"""
+    return f"foodiee:session:{session_id}:state"
+
+
+class InMemoryStateStore:
+    """Process-local state store (single worker / development)"""
+
+    def __init__(self):
+        self._states: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        """Get saved state for a session, or None if missing/expired"""
+        with self._lock:
+            entry = self._states.get(session_id)
+            if not entry:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.time():
+                del self._states[session_id]
+                return None
+            return payload
+
+    def set(self, session_id: str, payload: bytes, ttl: int = DEFAULT_TTL_SECONDS):
+        """Save state for a session"""
+        with self._lock:
+            self._states[session_id] = (time.time() + ttl, payload)
+
+    def delete(self, session_id: str):
+        """Forget a session's state"""
+        with self._lock:
+            self._states.pop(session_id, None)
+
+
+class PayloadCompressor:
+    """zstd compression for state payloads (no-op if zstandard is missing)"""
+
+    def __init__(self, dict_path: Optional[str] = None, level: int = 3):
+        try:
+            import zstandard as zstd
+        except ImportError:
+            self._compressor = None
+            self._decompressor = None
+            return
+
+        dict_data = None
+        if dict_path:
+            with open(dict_path, "rb") as f:
+                dict_data = zstd.ZstdCompressionDict(f.read())
+
+        self._compressor = zstd.ZstdCompressor(level=level, dict_data=dict_data)
+        self._decompressor = zstd.ZstdDecompressor(dict_data=dict_data)
+
+    def compress(self, payload: bytes) -> bytes:
+        if self._compressor is None:
+            return payload
+        return self._compressor.compress(payload)
+
+    def decompress(self, payload: bytes) -> bytes:
+        # Uncompressed payloads (written before compression was enabled) pass through
+        if self._decompressor is None or not payload.startswith(ZSTD_MAGIC):
+            return payload
+        return self._decompressor.decompress(payload)
+
+
+def train_zstd_dictionary(samples: List[bytes], dict_size: int = 100_000) -> bytes:
+    """
+    Train a zstd dictionary from sample save_to_json payloads
+
+    Write the result to a file and point SESSION_STATE_ZSTD_DICT at it.
+    Every worker must use the same dictionary to read stored sessions.
+    """
+    import zstandard as zstd
+
+    return zstd.train_dictionary(dict_size, samples).as_bytes()
+
+
+class RedisStateStore:
+    """Redis-backed state store shared by all web workers"""
+
+    def __init__(self, redis_url: str, compressor: Optional[PayloadCompressor] = None):
+        import redis
+
+        self._redis = redis.Redis.from_url(redis_url)
+        self._compressor = compressor or PayloadCompressor()
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        """Get saved state for a session, or None if missing/expired"""
+        payload = self._redis.get(state_key(session_id))
+        if payload is None:
+            return None
+        return self._compressor.decompress(payload)
+
+    def set(self, session_id: str, payload: bytes, ttl: int = DEFAULT_TTL_SECONDS):
+        """Save state for a session"""
+        self._redis.set(state_key(session_id), self._compressor.compress(payload), ex=ttl)
+
+    def delete(self, session_id: str):
+        """Forget a session's state"""
+        self._redis.delete(state_key(session_id))
+
+
+# Global instance
+_state_store = None
+_state_store_lock = threading.Lock()
+
+def get_state_store():
+    """Get or create the state store (Redis if REDIS_URL is set)"""
+    global _state_store
+
+    if _state_store is None:
+        with _state_store_lock:
+            if _state_store is None:
+                redis_url = os.getenv("REDIS_URL")
+                if redis_url:
+                    compressor = PayloadCompressor(os.getenv("SESSION_STATE_ZSTD_DICT"))
+                    _state_store = RedisStateStore(redis_url, compressor)
+                else:
+                    _state_store = InMemoryStateStore()
+
+    return _state_store
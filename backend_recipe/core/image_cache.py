@@ -0,0 +1,108 @@
+"""
+Image Cache Module - Persistent on-disk ledger of generated images
+Keyed by a content hash of (model, prompt) so identical prompts are never
+sent to the image API twice, even across process restarts
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join("~", ".foodiee", "img_cache.db")
+DEFAULT_TTL_SECONDS = 30 * 86400  # 30 days
+
+
+class ImageCache:
+    """
+    SQLite-backed cache of generated images
+    Safe to share between threads (one short-lived connection per call)
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        Args:
+            path: Location of the SQLite cache file
+            ttl_seconds: How long a cached image stays valid
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS image_ledger (
+                    key TEXT PRIMARY KEY,
+                    image_bytes BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    @classmethod
+    def from_env(cls) -> Optional["ImageCache"]:
+        """
+        Build cache from environment, or None if disabled
+
+        Env vars:
+            IMAGE_CACHE_ENABLED: "false" disables the cache (default: enabled)
+            IMAGE_CACHE_PATH: SQLite file location
+            IMAGE_CACHE_TTL_DAYS: Days to keep cached images
+        """
+        if os.getenv("IMAGE_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+
+        try:
+            return cls(
+                path=os.getenv("IMAGE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=int(float(os.getenv("IMAGE_CACHE_TTL_DAYS", "30")) * 86400)
+            )
+        except (OSError, sqlite3.Error, ValueError) as e:
+            print(f"⚠️  Image cache disabled: {e}")
+            return None
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """Content hash for a (model, prompt) pair"""
+        return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached raw image bytes, or None on miss/expiry"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT image_bytes, expires_at FROM image_ledger WHERE key = ?",
+                    (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️  Image cache read failed: {e}")
+            return None
+
+        if not row or row[1] < time.time():
+            return None
+        return bytes(row[0])
+
+    def set(self, key: str, image_bytes: bytes):
+        """Store raw image bytes under key"""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO image_ledger (key, image_bytes, expires_at) VALUES (?, ?, ?)",
+                    (key, sqlite3.Binary(image_bytes), time.time() + self.ttl_seconds)
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️  Image cache write failed: {e}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and always closes"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
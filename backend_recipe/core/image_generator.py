@@ -3,36 +3,170 @@ Image Generation Module - Google Imagen 4.0 image generation
 Optimized for production use with Imagen 4.0 API
 """
 
-import base64
+import functools
 import os
-from typing import Optional, Tuple, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 
+import httpx
 from google import genai
 from google.genai import types
 
+from core.image_cache import ImageCache
+
 from dotenv import load_dotenv
 load_dotenv()
 
+# SIMD base64 (pybase64) when available, stdlib otherwise
+try:
+    import pybase64
+    _b64encode_as_string = pybase64.b64encode_as_string
+except ImportError:
+    import base64
+    def _b64encode_as_string(data: bytes) -> str:
+        return base64.b64encode(data).decode("ascii")
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); HTTP/1.1 keep-alive otherwise
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool for Imagen calls (shared by every thread using one generator)
+IMAGEN_MAX_CONNECTIONS = int(os.getenv("IMAGEN_MAX_CONNECTIONS", "50"))
+IMAGEN_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("IMAGEN_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# Gemini Batch API job states that will not change any more
+BATCH_TERMINAL_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+# Constant parts of the Imagen step prompt (built once at import).
+# Kept pure ASCII: a single emoji would widen every prompt string built
+# from these to 4 bytes per character (PEP 393)
+_IMAGEN_PREFIX = "Professional food photography of "
+
+_IMAGEN_MID = ". \n\nStep description (FOR REFERENCE ONLY - DO NOT WRITE THIS IN THE IMAGE): "
+
+_IMAGEN_SUFFIX = """
+
+[!] CRITICAL - READ THIS FIRST [!]
+The step description above tells you WHAT action/scene to photograph.
+DO NOT write the step description, step number, or any text in the image.
+Show the cooking action VISUALLY only, with NO text whatsoever.
+
+ABSOLUTE TEXT PROHIBITION - ZERO TOLERANCE:
+[X] ZERO text, letters, words, or numbers anywhere in the image
+[X] DO NOT write step numbers (like "Step 1", "Step 2")
+[X] DO NOT write the step description or instructions
+[X] DO NOT write recipe name, ingredient names, or measurements
+[X] DO NOT write any labels, captions, or descriptions
+[X] NO watermarks, typography, or written symbols of ANY kind
+[X] NO letters or characters of any form
+[OK] ONLY show the cooking action/scene VISUALLY - pure photography
+
+The description is your GUIDE for what to photograph, NOT text to display.
+
+Image requirements:
+- High-quality food photography showing the cooking action/result
+- Professional lighting and composition
+- Appetizing, clear presentation
+- Clean, focused shot
+- NO text elements of any kind
+
+ABSOLUTE PROHIBITION: Any text, letters, words, step numbers, descriptions, labels, captions, numbers, or typography are 100% FORBIDDEN.
+
+Create a purely visual photograph with ZERO text - show only the cooking scene."""
+
+
+# Imagen request config shared by every call
+_IMAGEN_CONFIG = types.GenerateImagesConfig(
+    number_of_images=1,
+    aspect_ratio="4:3",  # Horizontal format, closest to desired 1024x680 ratio
+    safety_filter_level="block_low_and_above",
+    person_generation="allow_adult"
+)
+
+
+def create_imagen_transport() -> httpx.HTTPTransport:
+    """
+    Pooled keep-alive transport for the genai client
+    
+    Connections stay open between Imagen calls (no TLS handshake per image)
+    and, with h2 installed, concurrent calls multiplex over one connection.
+    Transport retries are off: callers retry with their own backoff.
+    """
+    return httpx.HTTPTransport(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=IMAGEN_MAX_CONNECTIONS,
+            max_keepalive_connections=IMAGEN_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        retries=0
+    )
+
+
+def encode_image_base64(image_bytes: Optional[bytes]) -> Optional[str]:
+    """Base64-encode raw image bytes for JSON transport (None passes through)"""
+    if not image_bytes:
+        return None
+    return _b64encode_as_string(image_bytes)
+
+
 class ImageGenerator:
     """
     Image generation using Google Imagen 4.0 API
     Optimized for production with strict format requirements
     """
     
-    def __init__(self, llm):
+    def __init__(self, llm, http_transport: Optional[httpx.HTTPTransport] = None):
         """
         Args:
             llm: Language model (not used for image gen, kept for compatibility)
+            http_transport: Transport for the genai client (see create_imagen_transport);
+                the caller owns it and closes it. Default: httpx's own pool
         """
         self.llm = llm
+        self._http_transport = http_transport
+        
+        # Persistent prompt -> image ledger (None when disabled)
+        self._cache = ImageCache.from_env()
+        
+        # Shared genai client (lazy loaded, reused across calls and threads)
+        self._client = None
+        self._client_lock = threading.Lock()
+    
+    @property
+    def client(self) -> genai.Client:
+        """Get or create the shared genai client (keeps HTTP connections alive)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    api_key = os.environ.get("GOOGLE_API_KEY")
+                    if not api_key:
+                        raise ValueError("GOOGLE_API_KEY not configured")
+                    http_options = None
+                    if self._http_transport is not None:
+                        http_options = types.HttpOptions(client_args={"transport": self._http_transport})
+                    self._client = genai.Client(api_key=api_key, http_options=http_options)
+        return self._client
     
     # ========================================================
     # Common Methods
     # ========================================================
     
-    def generate_image_prompt(self, recipe_name: str, step_description: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def generate_image_prompt(recipe_name: str, step_description: str) -> str:
         """
-        Generate optimized image prompt for Imagen 4.0
+        Generate optimized image prompt for Imagen 4.0 (memoized; see cache_info)
         
         Args:
             recipe_name: Name of the recipe
@@ -41,37 +175,7 @@ class ImageGenerator:
         Returns:
             Optimized prompt string for Imagen 4.0 image generation
         """
-        return f"""Professional food photography of {recipe_name}. 
-
-Step description (FOR REFERENCE ONLY - DO NOT WRITE THIS IN THE IMAGE): {step_description}
-
-⚠️ CRITICAL - READ THIS FIRST ⚠️
-The step description above tells you WHAT action/scene to photograph.
-DO NOT write the step description, step number, or any text in the image.
-Show the cooking action VISUALLY only, with NO text whatsoever.
-
-ABSOLUTE TEXT PROHIBITION - ZERO TOLERANCE:
-❌ ZERO text, letters, words, or numbers anywhere in the image
-❌ DO NOT write step numbers (like "Step 1", "Step 2")
-❌ DO NOT write the step description or instructions
-❌ DO NOT write recipe name, ingredient names, or measurements
-❌ DO NOT write any labels, captions, or descriptions
-❌ NO watermarks, typography, or written symbols of ANY kind
-❌ NO letters or characters of any form
-✅ ONLY show the cooking action/scene VISUALLY - pure photography
-
-The description is your GUIDE for what to photograph, NOT text to display.
-
-Image requirements:
-- High-quality food photography showing the cooking action/result
-- Professional lighting and composition
-- Appetizing, clear presentation
-- Clean, focused shot
-- NO text elements of any kind
-
-ABSOLUTE PROHIBITION: Any text, letters, words, step numbers, descriptions, labels, captions, numbers, or typography are 100% FORBIDDEN.
-
-Create a purely visual photograph with ZERO text - show only the cooking scene."""
+        return _IMAGEN_PREFIX + recipe_name + _IMAGEN_MID + step_description + _IMAGEN_SUFFIX
     
     def generate_image(
         self,
@@ -99,56 +203,98 @@ Create a purely visual photograph with ZERO text - show only the cooking scene."
         # Generate with Imagen 4.0
         return self._generate_with_imagen(image_prompt)
     
-    def _generate_with_imagen(self, prompt: str) -> Tuple[Optional[str], str]:
+    def generate_image_raw(
+        self,
+        recipe_name: str,
+        step_description: str,
+        cumulative_prompt: Optional[str] = None
+    ) -> Tuple[Optional[bytes], str]:
+        """
+        Generate image using Imagen 4.0 API, returning raw bytes
+        
+        Use this for binary-capable transports (HTTP image responses, S3)
+        to skip base64 entirely; generate_image remains for JSON clients.
+        
+        Returns:
+            Tuple of (image_bytes, prompt_used)
+        """
+        if cumulative_prompt:
+            image_prompt = cumulative_prompt
+        else:
+            image_prompt = self.generate_image_prompt(recipe_name, step_description)
+        
+        return self._generate_imagen_bytes(image_prompt)
+    
+    def _generate_with_imagen(self, prompt: str, use_cache: bool = True) -> Tuple[Optional[str], str]:
         """
         Generate image using Imagen 4.0 API with strict size and format requirements
         
         Args:
             prompt: Image generation prompt
+            use_cache: Serve/store the result from the on-disk image ledger
             
         Returns:
             Tuple of (base64_image_string, prompt_used)
         """
-        api_key = os.environ.get("GOOGLE_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_API_KEY not configured")
+        image_bytes, prompt = self._generate_imagen_bytes(prompt, use_cache)
+        return encode_image_base64(image_bytes), prompt
+    
+    def _generate_imagen_bytes(self, prompt: str, use_cache: bool = True) -> Tuple[Optional[bytes], str]:
+        """
+        Generate image using Imagen 4.0 API, returning raw image bytes
+        
+        Args:
+            prompt: Image generation prompt
+            use_cache: Serve/store the result from the on-disk image ledger
+            
+        Returns:
+            Tuple of (image_bytes, prompt_used)
+        """
+        model = os.getenv("GEMINI_IMAGE_MODEL", "imagen-3.0-generate-001")
+        cache = self._cache if use_cache else None
+        cache_key = ImageCache.make_key(model, prompt) if cache else None
+        if cache:
+            cached = cache.get(cache_key)
+            if cached:
+                print(f"   ♻️  Image cache hit ({cache_key[:12]})")
+                return cached, prompt
         
-        client = genai.Client(api_key=api_key)
+        client = self.client
         
         try:
             # Imagen 4.0 uses generate_images API
             result = client.models.generate_images(
-                model=os.getenv("GEMINI_IMAGE_MODEL", "imagen-3.0-generate-001"),
+                model=model,
                 prompt=prompt,
-                config=types.GenerateImagesConfig(
-                    number_of_images=1,
-                    aspect_ratio="4:3",  # Horizontal format, closest to desired 1024x680 ratio
-                    safety_filter_level="block_low_and_above",
-                    person_generation="allow_adult"
-                ),
+                config=_IMAGEN_CONFIG,
             )
         except Exception as exc:
             raise ValueError(f"Imagen image generation failed: {exc}") from exc
         
-        # Extract image from response
-        image_base64 = self._extract_image_from_imagen_response(result)
+        return self._handle_imagen_result(result, cache, cache_key), prompt
+    
+    def _handle_imagen_result(self, result, cache: Optional[ImageCache], cache_key: Optional[str]) -> Optional[bytes]:
+        """Extract image bytes from an Imagen response, log, and store in the ledger"""
+        image_bytes = self._extract_image_from_imagen_response(result)
         
-        if not image_base64:
+        if not image_bytes:
             print(f"   ⚠️  No image data found in Imagen response")
         else:
             print(f"   ✅ Successfully generated image with Imagen 4.0 (4:3 aspect ratio)")
+            if cache:
+                cache.set(cache_key, image_bytes)
         
-        return image_base64, prompt
+        return image_bytes
     
-    def _extract_image_from_imagen_response(self, result) -> Optional[str]:
+    def _extract_image_from_imagen_response(self, result) -> Optional[bytes]:
         """
-        Extract image bytes from Imagen API response and convert to base64
+        Extract raw image bytes from Imagen API response
         
         Args:
             result: Imagen API response object
             
         Returns:
-            Base64 encoded image string or None
+            Image bytes or None
         """
         if not result or not hasattr(result, "generated_images") or not result.generated_images:
             return None
@@ -160,6 +306,216 @@ Create a purely visual photograph with ZERO text - show only the cooking scene."
         if hasattr(image, "image") and hasattr(image.image, "image_bytes"):
             image_bytes = image.image.image_bytes
             if image_bytes:
-                return base64.b64encode(image_bytes).decode("utf-8")
+                return image_bytes
+        
+        return None
+
+    
+    # ========================================================
+    # Async Generation
+    # ========================================================
+    
+    async def generate_image_async(
+        self,
+        recipe_name: str,
+        step_description: str,
+        cumulative_prompt: Optional[str] = None
+    ) -> Tuple[Optional[str], str]:
+        """
+        Async variant of generate_image (does not block the event loop)
+        
+        Returns:
+            Tuple of (base64_image_string, prompt_used)
+        """
+        if cumulative_prompt:
+            image_prompt = cumulative_prompt
+        else:
+            image_prompt = self.generate_image_prompt(recipe_name, step_description)
+        
+        return await self._agenerate_with_imagen(image_prompt)
+    
+    async def _agenerate_with_imagen(self, prompt: str, use_cache: bool = True) -> Tuple[Optional[str], str]:
+        """
+        Async variant of _generate_with_imagen using the genai async client
+        
+        Returns:
+            Tuple of (base64_image_string, prompt_used)
+        """
+        model = os.getenv("GEMINI_IMAGE_MODEL", "imagen-3.0-generate-001")
+        cache = self._cache if use_cache else None
+        cache_key = ImageCache.make_key(model, prompt) if cache else None
+        if cache:
+            cached = cache.get(cache_key)
+            if cached:
+                print(f"   ♻️  Image cache hit ({cache_key[:12]})")
+                return encode_image_base64(cached), prompt
+        
+        try:
+            result = await self.client.aio.models.generate_images(
+                model=model,
+                prompt=prompt,
+                config=_IMAGEN_CONFIG,
+            )
+        except Exception as exc:
+            raise ValueError(f"Imagen image generation failed: {exc}") from exc
+        
+        return encode_image_base64(self._handle_imagen_result(result, cache, cache_key)), prompt
+    
+    # ========================================================
+    # Parallel Generation
+    # ========================================================
+    
+    def generate_images_parallel(
+        self,
+        prompts: List[str],
+        max_workers: Optional[int] = None
+    ) -> List[Optional[str]]:
+        """
+        Generate images for independent prompts concurrently
+        
+        Prompts must already be built (cumulative state applied in step
+        order on the calling thread); only the API calls fan out. Keep
+        max_workers within the Imagen rate limit.
+        
+        Args:
+            prompts: Image generation prompts
+            max_workers: Thread count (default: IMAGE_GEN_MAX_WORKERS or 4)
+            
+        Returns:
+            List of base64 image strings (None on failure), aligned with prompts
+        """
+        if not prompts:
+            return []
+        
+        if max_workers is None:
+            max_workers = int(os.getenv("IMAGE_GEN_MAX_WORKERS", "4"))
+        
+        def generate(prompt: str) -> Optional[str]:
+            try:
+                image_base64, _ = self._generate_with_imagen(prompt)
+                return image_base64
+            except Exception as e:
+                print(f"   ❌ Parallel image generation failed: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as executor:
+            return list(executor.map(generate, prompts))
+    
+    # ========================================================
+    # Batch Mode (Gemini Batch API)
+    # ========================================================
+    
+    def generate_images_batch(
+        self,
+        prompts: List[str],
+        callback: Optional[Callable[[int, Optional[str]], None]] = None,
+        poll_interval: float = 10.0,
+        max_poll_interval: float = 120.0,
+        timeout: float = 24 * 3600
+    ) -> List[Optional[str]]:
+        """
+        Generate images for many prompts with a single Gemini Batch API job
+        
+        Batch mode trades latency for ~50% lower cost, so use it for
+        non-interactive work (mass generation, backfills). Imagen has no
+        batch endpoint, so this uses the Gemini image model instead.
+        Prompts already in the image ledger are not resubmitted.
+        
+        Args:
+            prompts: Image generation prompts, one per step
+            callback: Optional callback(index, base64_image) fired per result
+            poll_interval: Initial seconds between job status polls
+            max_poll_interval: Upper bound for the exponential poll backoff
+            timeout: Give up waiting after this many seconds
+            
+        Returns:
+            List of base64 image strings (None on failure), aligned with prompts
+        """
+        model = os.getenv("GEMINI_BATCH_IMAGE_MODEL", "gemini-2.5-flash-image")
+        results: List[Optional[str]] = [None] * len(prompts)
+        pending: List[int] = []
+        
+        for index, prompt in enumerate(prompts):
+            cached = self._cache.get(ImageCache.make_key(model, prompt)) if self._cache else None
+            if cached:
+                results[index] = encode_image_base64(cached)
+                if callback:
+                    callback(index, results[index])
+            else:
+                pending.append(index)
+        
+        if not pending:
+            return results
+        
+        client = self.client
+        
+        requests = [
+            types.InlinedRequest(
+                contents=prompts[index],
+                config=types.GenerateContentConfig(response_modalities=["IMAGE"])
+            )
+            for index in pending
+        ]
+        
+        try:
+            job = client.batches.create(
+                model=model,
+                src=requests,
+                config=types.CreateBatchJobConfig(display_name=f"foodiee-images-{int(time.time())}")
+            )
+        except Exception as exc:
+            raise ValueError(f"Gemini batch submission failed: {exc}") from exc
+        
+        print(f"   📦 Submitted batch job {job.name} with {len(pending)} image prompts")
+        
+        # Poll with exponential backoff until the job finishes
+        deadline = time.time() + timeout
+        delay = poll_interval
+        while job.state.name not in BATCH_TERMINAL_STATES:
+            if time.time() > deadline:
+                raise TimeoutError(f"Gemini batch job {job.name} did not finish within {timeout:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, max_poll_interval)
+            job = client.batches.get(name=job.name)
+        
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise ValueError(f"Gemini batch job {job.name} ended with state {job.state.name}")
+        
+        responses = job.dest.inlined_responses if job.dest else []
+        for index, inlined in zip(pending, responses or []):
+            image_bytes = None
+            if inlined.response:
+                image_bytes = self._extract_image_from_gemini_response(inlined.response)
+            else:
+                print(f"   ⚠️  Batch item {index} failed: {inlined.error}")
+            
+            if image_bytes and self._cache:
+                self._cache.set(ImageCache.make_key(model, prompts[index]), image_bytes)
+            
+            results[index] = encode_image_base64(image_bytes)
+            if callback:
+                callback(index, results[index])
+        
+        succeeded = sum(1 for image in results if image)
+        print(f"   ✅ Batch job {job.name} finished: {succeeded}/{len(prompts)} images")
+        
+        return results
+    
+    def _extract_image_from_gemini_response(self, response) -> Optional[bytes]:
+        """
+        Extract inline image bytes from a Gemini generate_content response
+        
+        Args:
+            response: GenerateContentResponse object
+            
+        Returns:
+            Image bytes or None
+        """
+        for candidate in getattr(response, "candidates", None) or []:
+            content = getattr(candidate, "content", None)
+            for part in getattr(content, "parts", None) or []:
+                inline_data = getattr(part, "inline_data", None)
+                if inline_data and inline_data.data:
+                    return inline_data.data
         
         return None
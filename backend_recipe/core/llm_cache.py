@@ -0,0 +1,129 @@
+"""
+LLM Response Cache
+==================
+Exact-match cache for LLM text responses so repeated prompts (and repeated
+dish requests) skip the round-trip entirely. Keys are sha256 hashes of the
+model + prompt, or of the normalized (dish_name, region) pair for whole recipes.
+
+Uses Redis when REDIS_URL is set, otherwise an in-process LRU.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_TTL_SECONDS = 86400  # 1 day
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class CacheBackend(Protocol):
+    """Minimal key/value interface shared by the cache backends"""
+
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, value: str, ttl: int = DEFAULT_TTL_SECONDS):
+        ...
+
+
+class MemoryCacheBackend:
+    """Process-local LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get cached value, or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int = DEFAULT_TTL_SECONDS):
+        """Cache value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisCacheBackend:
+    """Redis-backed cache shared by all web workers"""
+
+    def __init__(self, redis_url: str):
+        import redis
+
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get cached value, or None if missing/expired"""
+        try:
+            return self._redis.get(f"foodiee:llm:{key}")
+        except Exception as e:
+            print(f"⚠️  LLM cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: str, ttl: int = DEFAULT_TTL_SECONDS):
+        """Cache value"""
+        try:
+            self._redis.set(f"foodiee:llm:{key}", value, ex=ttl)
+        except Exception as e:
+            print(f"⚠️  LLM cache write failed: {e}")
+
+
+def prompt_cache_key(model: str, prompt: str) -> str:
+    """Cache key for a single LLM prompt"""
+    payload = json.dumps({"model": model, "prompt": prompt}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def recipe_cache_key(dish_name: str, region: str) -> str:
+    """Cache key for a whole generated recipe"""
+    payload = f"{dish_name.strip().lower()}|{region.strip().lower()}"
+    return "recipe:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Global instance
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[CacheBackend]:
+    """
+    Get or create the LLM response cache, or None if disabled
+
+    Env vars:
+        LLM_CACHE_ENABLED: "false" disables the cache (default: enabled)
+        REDIS_URL: Share the cache through Redis instead of per process
+    """
+    global _llm_cache
+
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                redis_url = os.getenv("REDIS_URL")
+                if redis_url:
+                    _llm_cache = RedisCacheBackend(redis_url)
+                else:
+                    _llm_cache = MemoryCacheBackend()
+
+    return _llm_cache
@@ -0,0 +1,98 @@
+"""
+Request Rate Limiter
+====================
+Token buckets that pace outgoing LLM / Imagen requests *before* they are
+sent, so a burst of concurrent jobs waits locally instead of burning
+round-trips on 429 rejections. One bucket per provider is shared by every
+service in the process (provider quotas are per API key, not per job).
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Requests per minute when no env override is set
+DEFAULT_RATES_PER_MINUTE = {
+    "imagen": 30,
+    "llm": 60,
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a request may be sent"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        """
+        Args:
+            rate_per_minute: Sustained requests per minute
+            burst: Requests that may be sent back-to-back after an idle period
+        """
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate_per_second
+            time.sleep(wait_time)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _NoLimit:
+    """Stand-in bucket when limiting is disabled (rate <= 0)"""
+
+    def acquire(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+# Global instances, one per provider
+_limiters: Dict[str, object] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str):
+    """
+    Get or create the shared limiter for a provider ('imagen' or 'llm')
+
+    Env vars:
+        IMAGEN_REQUESTS_PER_MINUTE: Imagen request budget (default: 30, 0 disables)
+        LLM_REQUESTS_PER_MINUTE: LLM request budget (default: 60, 0 disables)
+    """
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                rate = float(os.getenv(
+                    f"{provider.upper()}_REQUESTS_PER_MINUTE",
+                    DEFAULT_RATES_PER_MINUTE.get(provider, 60)
+                ))
+                limiter = TokenBucket(rate) if rate > 0 else _NoLimit()
+                _limiters[provider] = limiter
+    return limiter
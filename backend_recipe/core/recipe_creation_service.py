@@ -4,19 +4,182 @@ Recipe Creation Service
 Creates complete recipes from scratch by leveraging existing regeneration service
 """
 
-import json
+import asyncio
+import functools
+import os
+import queue
+import re
+import threading
 import time
-from typing import Dict, List, Any
-from datetime import datetime
-
-from core.recipe_regeneration_service import RecipeRegenerationService
-from prompts.recipe_creation_prompts import (
-    RECIPE_NAME_PROMPT,
-    RECIPE_DESCRIPTION_PROMPT,
-    INGREDIENTS_LIST_PROMPT,
-    STEPS_PROMPT,
-    RECIPE_METADATA_PROMPT
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple, Union
+from datetime import datetime, timezone
+
+from pydantic import BaseModel, Field, field_validator
+
+# orjson when available (faster parsing of LLM JSON replies), stdlib otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(data: Any) -> str:
+        return orjson.dumps(data).decode("utf-8")
+except ImportError:
+    import json
+    _json_loads = json.loads
+    
+    def _json_dumps(data: Any) -> str:
+        return json.dumps(data)
+
+from core.llm_cache import MemoryCacheBackend, get_llm_cache, prompt_cache_key, recipe_cache_key
+from core.recipe_regeneration_service import (
+    RecipeRegenerationService,
+    compute_retry_wait,
+    is_rate_limit_error
 )
+from core.recipe_template_cache import get_template_cache
+from prompts.recipe_creation_prompts import render
+
+
+# Main image, ingredients image, beginner & advanced step series
+IMAGE_JOB_WORKERS = 4
+
+# Max in-flight LLM/image requests per service (shared by text and image calls)
+RECIPE_LLM_CONCURRENCY = int(os.getenv("RECIPE_LLM_CONCURRENCY", "8"))
+
+# In-process memo of names/descriptions for inputs that repeat within a batch.
+# A bounded LRU of results (functools.lru_cache can't memoize coroutines) that
+# sits in front of the shared LLM cache, so repeats skip even a Redis lookup.
+_INTRO_MEMO = MemoryCacheBackend(max_entries=1024)
+
+DIFFICULTY_LEVELS = ("Easy", "Medium", "Hard")
+
+# Process-local memo of (model, prompt) -> reply, only used when the LLM runs
+# at temperature 0 (replies are deterministic, so any repeat can be reused)
+_TEMP_ZERO_MEMO = MemoryCacheBackend(max_entries=4096)
+
+# Whole text recipes go stale sooner than individual prompt responses
+RECIPE_CACHE_TTL_SECONDS = 6 * 3600
+
+# Completed "name" / "description" string fields in a partially streamed JSON reply
+_NAME_FIELD_RE = re.compile(r'"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_DESCRIPTION_FIELD_RE = re.compile(r'"description"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# LLM JSON replies sometimes arrive wrapped in a ```json ... ``` fence
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*\n?(.*?)\n?```\s*$", re.DOTALL)
+
+
+# Log lines are printed / written to the tracker by a background thread so
+# slow tracker writes (one DB insert each) stay off the generation path
+_LOG_QUEUE: "queue.Queue[Tuple[Optional[Callable], str, str]]" = queue.Queue()
+_log_thread = None
+_log_thread_lock = threading.Lock()
+
+
+def _drain_log_queue():
+    """Background consumer for _LOG_QUEUE"""
+    while True:
+        tracker_log, message, level = _LOG_QUEUE.get()
+        try:
+            print(f"[{level}] {message}")
+            if tracker_log is not None:
+                tracker_log(message, level, -1, "new_recipe")
+        except Exception:
+            pass
+        finally:
+            _LOG_QUEUE.task_done()
+
+
+def _ensure_log_thread():
+    """Start the log consumer thread on first use"""
+    global _log_thread
+    
+    if _log_thread is None:
+        with _log_thread_lock:
+            if _log_thread is None:
+                _log_thread = threading.Thread(target=_drain_log_queue, name="recipe-creation-log", daemon=True)
+                _log_thread.start()
+
+
+def _strip_json_fence(content: str) -> str:
+    """Unwrap a markdown code fence around an LLM JSON reply, if present"""
+    match = _FENCE_RE.match(content)
+    return match.group(1) if match else content.strip()
+
+
+def _parse_json_blob(content: str) -> Any:
+    """Parse an LLM JSON reply, unwrapping a markdown code fence if present"""
+    return _json_loads(_strip_json_fence(content))
+
+
+def _llm_key(llm) -> str:
+    """Identifies the model behind an LLM handle (memo keys change on model swap)"""
+    return f"{type(llm).__name__}:{getattr(llm, 'model', '?')}"
+
+
+def _ingredients_lines(ingredients: List[Dict]) -> str:
+    """Ingredient block for the steps prompts ("- name: quantity" per line)"""
+    return "\n".join(f"- {ing['ingredient']}: {ing['quantity']}" for ing in ingredients)
+
+
+def _ingredients_short(ingredients: List[Dict]) -> str:
+    """Comma-separated first ten ingredient names for the ingredients image"""
+    return ", ".join(ing['ingredient'] for ing in ingredients[:10])
+
+
+def _format_ingredients(ingredients: List[Any]) -> List[Dict[str, str]]:
+    """Normalize LLM ingredient objects to {ingredient, quantity, notes}"""
+    formatted = []
+    for ing in ingredients:
+        if isinstance(ing, dict):
+            formatted.append({
+                "ingredient": ing.get("ingredient") or ing.get("name", ""),
+                "quantity": ing.get("quantity", "to taste"),
+                "notes": ing.get("notes", "")
+            })
+    return formatted
+
+
+class MetadataOut(BaseModel):
+    """
+    Recipe metadata as returned by the LLM, validated in one pass
+    
+    Missing fields get defaults, rating is clamped and difficulty coerced to
+    a DB-valid value instead of failing; extra fields are ignored.
+    """
+    prep_time_minutes: int = 20
+    cook_time_minutes: int = 30
+    calories: int = 0
+    rating: float = Field(4.0, ge=3.5, le=5.0)
+    difficulty: Literal["Easy", "Medium", "Hard"] = "Medium"
+    tastes: List[str] = []
+    meal_types: List[str] = []
+    dietary_tags: List[str] = []
+    
+    @field_validator("prep_time_minutes", "cook_time_minutes", "calories", mode="before")
+    @classmethod
+    def _round_number(cls, value):
+        return round(value) if isinstance(value, float) else value
+    
+    @field_validator("rating", mode="before")
+    @classmethod
+    def _clamp_rating(cls, value):
+        try:
+            return max(3.5, min(5.0, float(value)))
+        except (TypeError, ValueError):
+            return 4.0
+    
+    @field_validator("difficulty", mode="before")
+    @classmethod
+    def _coerce_difficulty(cls, value):
+        value = str(value).strip().capitalize()
+        return value if value in DIFFICULTY_LEVELS else "Medium"
+    
+    def to_recipe_fields(self) -> Dict[str, Any]:
+        """Metadata dict used to build recipes (adds total time)"""
+        return self.model_dump() | {
+            "total_time_minutes": self.prep_time_minutes + self.cook_time_minutes
+        }
 
 
 class RecipeCreationService:
@@ -29,139 +192,463 @@ class RecipeCreationService:
         Args:
             tracker: Optional ProgressTracker instance for logging
         """
-        # Create a dummy tracker if none provided
+        # Our own log lines skip the tracker entirely when there is none
+        self._tracker_log = tracker.log if tracker is not None and hasattr(tracker, 'log') else None
+        
+        # The regeneration service always logs through its tracker, so it gets a no-op one
         if tracker is None:
             tracker = DummyTracker()
         
         # Reuse existing regeneration service for all image/content generation
         self.regen_service = RecipeRegenerationService(tracker)
         self.tracker = tracker
+        self._cache = get_llm_cache()
+        self._templates = get_template_cache()
+        self._name_vectors: Dict[str, List[float]] = {}
+        _ensure_log_thread()
+        
+        # Resolved once; every text call reuses the same handle and retry policy
+        self._llm = self.regen_service.get_llm()
+        self._llm_key = _llm_key(self._llm)
+        self._temp_zero = getattr(self._llm, "temperature", None) == 0
+        self._retry = functools.partial(self._aretry_with_backoff, max_retries=3, initial_delay=2)
+        self._semaphore = None
+    
+    def _limiter(self) -> asyncio.Semaphore:
+        """
+        Concurrency limiter for the running event loop
+        
+        Each sync wrapper runs its own loop and asyncio primitives are bound
+        to one loop, so the semaphore is recreated when the loop changes.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(RECIPE_LLM_CONCURRENCY))
+        return self._semaphore[1]
+    
+    async def _limited_to_thread(self, func, *args, **kwargs):
+        """Run a blocking call in a thread while holding a concurrency slot"""
+        async with self._limiter():
+            return await asyncio.to_thread(func, *args, **kwargs)
+    
+    def invalidate_llm(self):
+        """Re-resolve the LLM handle (e.g. after config.llm was re-initialized)"""
+        self.regen_service._llm = None
+        self._llm = self.regen_service.get_llm()
+        self._llm_key = _llm_key(self._llm)
+        self._temp_zero = getattr(self._llm, "temperature", None) == 0
     
     def _log(self, message: str, level: str = "INFO"):
-        """Safe logging"""
-        print(f"[{level}] {message}")
-        if hasattr(self.tracker, 'log'):
+        """Queue a log line (printed and sent to the tracker in the background)"""
+        _LOG_QUEUE.put_nowait((self._tracker_log, message, level))
+    
+    def flush_logs(self):
+        """Block until every queued log line has been written"""
+        _LOG_QUEUE.join()
+    
+    def _run(self, coro):
+        """Run a coroutine from sync code, flushing queued logs afterwards"""
+        try:
+            return asyncio.run(coro)
+        finally:
+            self.flush_logs()
+    
+    async def _aretry_with_backoff(self, func, max_retries=3, initial_delay=2):
+        """Async twin of RecipeRegenerationService.retry_with_backoff (awaits instead of sleeping the thread)"""
+        for attempt in range(1, max_retries + 1):
             try:
-                self.tracker.log(message, level, -1, "new_recipe")
-            except:
-                pass
-    
-    def _generate_text(self, prompt: str) -> str:
-        """Generate text using LLM with retry"""
-        def generate():
-            response = self.regen_service.get_llm().invoke(prompt)
+                return await func()
+            except Exception as e:
+                error_msg = str(e)
+                
+                if attempt == max_retries:
+                    print(f"   ❌ Failed after {max_retries} attempts: {error_msg}")
+                    raise
+                
+                wait_time = compute_retry_wait(error_msg, attempt, initial_delay)
+                if is_rate_limit_error(error_msg):
+                    print(f"   ⚠️  Rate limit hit. Retry {attempt}/{max_retries} in {wait_time:.1f}s...")
+                else:
+                    print(f"   ⚠️  Error: {error_msg}. Retry {attempt}/{max_retries} in {wait_time:.1f}s...")
+                
+                await asyncio.sleep(wait_time)
+    
+    async def _agenerate_text(self, prompt: str) -> str:
+        """Generate text using LLM with retry (non-blocking, so calls can run concurrently)"""
+        llm = self._llm
+        
+        memo_key = None
+        if self._temp_zero:
+            memo_key = f"{self._llm_key}|{prompt}"
+            memoized = _TEMP_ZERO_MEMO.get(memo_key)
+            if memoized is not None:
+                return memoized
+        
+        key = None
+        if self._cache is not None:
+            key = prompt_cache_key(getattr(llm, 'model', ''), prompt)
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+        
+        async def generate():
+            # Slot is held per attempt, so backoff sleeps don't block other calls
+            async with self._limiter():
+                response = await llm.ainvoke(prompt)
             return response.content if hasattr(response, 'content') else str(response)
         
-        return self.regen_service.retry_with_backoff(generate, max_retries=3, initial_delay=2)
+        text = await self._retry(generate)
+        if key is not None:
+            self._cache.set(key, text)
+        if memo_key is not None:
+            _TEMP_ZERO_MEMO.set(memo_key, text)
+        return text
     
-    def generate_recipe_name(self, dish_name: str, region: str) -> str:
+    async def _astream_text(self, prompt: str) -> AsyncIterator[str]:
+        """Stream LLM text chunks (no retry; a cached reply is yielded whole)"""
+        llm = self._llm
+        
+        key = None
+        if self._cache is not None:
+            key = prompt_cache_key(getattr(llm, 'model', ''), prompt)
+            cached = self._cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        parts = []
+        async with self._limiter():
+            async for chunk in llm.astream(prompt):
+                text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                parts.append(text)
+                yield text
+        
+        if key is not None:
+            self._cache.set(key, "".join(parts))
+    
+    async def _aembed_recipe_name(self, recipe_name: str) -> Optional[List[float]]:
+        """Embedding of a recipe name for template lookups (None if unavailable)"""
+        if self._templates is None:
+            return None
+        if recipe_name in self._name_vectors:
+            return self._name_vectors[recipe_name]
+        
+        try:
+            from config import embeddings
+            if embeddings is None:
+                return None
+            vector = await embeddings.aembed_query(recipe_name)
+        except Exception as e:
+            self._log(f"Recipe name embedding failed ({e}), generating from scratch", "WARNING")
+            return None
+        
+        self._name_vectors[recipe_name] = vector
+        return vector
+    
+    async def agenerate_recipe_name(self, dish_name: str, region: str) -> str:
         """Generate formatted recipe name"""
+        memo_key = f"{self._llm_key}|name|{dish_name}|{region}"
+        name = _INTRO_MEMO.get(memo_key)
+        if name is not None:
+            return name
+        
         self._log(f"Generating recipe name for: {dish_name}")
-        prompt = RECIPE_NAME_PROMPT.format(dish_name=dish_name, region=region)
-        name = self._generate_text(prompt).strip().strip('"').strip("'")
+        prompt = render("RECIPE_NAME", dish_name=dish_name, region=region)
+        name = (await self._agenerate_text(prompt)).strip().strip('"').strip("'")
+        _INTRO_MEMO.set(memo_key, name)
         self._log(f"✓ Generated name: {name}", "SUCCESS")
         return name
     
-    def generate_description(self, recipe_name: str, region: str) -> str:
+    async def agenerate_description(self, recipe_name: str, region: str) -> str:
         """Generate recipe description"""
+        memo_key = f"{self._llm_key}|description|{recipe_name}|{region}"
+        description = _INTRO_MEMO.get(memo_key)
+        if description is not None:
+            return description
+        
         self._log(f"Generating description")
-        prompt = RECIPE_DESCRIPTION_PROMPT.format(recipe_name=recipe_name, region=region)
-        description = self._generate_text(prompt).strip()
+        prompt = render("RECIPE_DESCRIPTION", recipe_name=recipe_name, region=region)
+        description = (await self._agenerate_text(prompt)).strip()
+        _INTRO_MEMO.set(memo_key, description)
         self._log(f"✓ Generated description", "SUCCESS")
         return description
     
-    def generate_ingredients(self, recipe_name: str, region: str) -> List[Dict[str, str]]:
-        """Generate ingredients list"""
-        self._log(f"Generating ingredients")
-        
-        prompt = INGREDIENTS_LIST_PROMPT.format(recipe_name=recipe_name, region=region)
-        content = self._generate_text(prompt)
-        
-        # Parse JSON
-        content = content.strip()
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        content = content.strip()
-        
-        ingredients = json.loads(content)
-        
-        # Format ingredients
-        formatted = []
-        for ing in ingredients:
-            if isinstance(ing, dict):
-                formatted.append({
-                    "ingredient": ing.get("ingredient") or ing.get("name", ""),
-                    "quantity": ing.get("quantity", "to taste"),
-                    "notes": ing.get("notes", "")
-                })
+    async def agenerate_ingredients(self, recipe_name: str, region: str) -> List[Dict[str, str]]:
+        """Generate ingredients list (adapted from a similar recent recipe when one exists)"""
+        vector = await self._aembed_recipe_name(recipe_name)
+        template = self._templates.find("ingredients", region, vector) if vector is not None else None
+        
+        if template:
+            old_dish, old_ingredients = template
+            self._log(f"Adapting ingredients from similar recipe: {old_dish}")
+            prompt = render(
+                "INGREDIENTS_ADAPT",
+                old_dish=old_dish,
+                old_ingredients=_json_dumps(old_ingredients),
+                new_dish=recipe_name,
+                region=region
+            )
+        else:
+            self._log(f"Generating ingredients")
+            prompt = render("INGREDIENTS_LIST", recipe_name=recipe_name, region=region)
+        content = await self._agenerate_text(prompt)
+        
+        formatted = _format_ingredients(_parse_json_blob(content))
+        if vector is not None and not template:
+            self._templates.add("ingredients", region, recipe_name, vector, formatted)
         
         self._log(f"✓ Generated {len(formatted)} ingredients", "SUCCESS")
         return formatted
     
-    def generate_steps(self, recipe_name: str, ingredients: List[Dict], level: str) -> List[str]:
-        """Generate cooking steps"""
+    async def agenerate_steps(
+        self,
+        recipe_name: str,
+        ingredients: Union[List[Dict], str],
+        level: str
+    ) -> List[str]:
+        """Generate cooking steps (ingredients may be a prebuilt _ingredients_lines block)"""
         self._log(f"Generating {level} steps")
         
-        ingredients_str = "\n".join([f"- {ing['ingredient']}: {ing['quantity']}" for ing in ingredients])
-        prompt = STEPS_PROMPT.format(recipe_name=recipe_name, ingredients=ingredients_str, level=level)
-        content = self._generate_text(prompt)
-        
-        # Parse JSON
-        content = content.strip()
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        content = content.strip()
+        ingredients_str = ingredients if isinstance(ingredients, str) else _ingredients_lines(ingredients)
+        prompt = render("STEPS", recipe_name=recipe_name, ingredients=ingredients_str, level=level)
+        content = await self._agenerate_text(prompt)
         
-        steps = json.loads(content)
+        steps = _parse_json_blob(content)
         self._log(f"✓ Generated {len(steps)} {level} steps", "SUCCESS")
         return steps
     
-    def generate_metadata(self, recipe_name: str, region: str) -> Dict[str, Any]:
+    async def agenerate_steps_both(
+        self,
+        recipe_name: str,
+        ingredients: Union[List[Dict], str],
+        region: str = ""
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Generate beginner and advanced steps with one call (ingredients sent once)
+        
+        When a similar recent recipe from the same region exists, its steps are
+        adapted with a short edit prompt instead.
+        """
+        ingredients_str = ingredients if isinstance(ingredients, str) else _ingredients_lines(ingredients)
+        vector = await self._aembed_recipe_name(recipe_name)
+        template = self._templates.find("steps", region, vector) if vector is not None else None
+        
+        if template:
+            old_dish, old_levels = template
+            self._log(f"Adapting beginner & advanced steps from similar recipe: {old_dish}")
+            prompt = render(
+                "STEPS_ADAPT",
+                old_dish=old_dish,
+                old_steps=_json_dumps(old_levels),
+                new_dish=recipe_name,
+                ingredients=ingredients_str
+            )
+        else:
+            self._log("Generating beginner & advanced steps")
+            prompt = render("STEPS_BOTH", recipe_name=recipe_name, ingredients=ingredients_str)
+        levels = _parse_json_blob(await self._agenerate_text(prompt))
+        
+        beginner_steps, advanced_steps = levels["beginner"], levels["advanced"]
+        if vector is not None and not template:
+            self._templates.add("steps", region, recipe_name, vector,
+                                {"beginner": beginner_steps, "advanced": advanced_steps})
+        self._log(f"✓ Generated {len(beginner_steps)} beginner / {len(advanced_steps)} advanced steps", "SUCCESS")
+        return beginner_steps, advanced_steps
+    
+    async def agenerate_metadata(self, recipe_name: str, region: str) -> Dict[str, Any]:
         """Generate recipe metadata (times, calories, tags, etc.)"""
         self._log("Generating recipe metadata (times, calories, tags)")
         
-        prompt = RECIPE_METADATA_PROMPT.format(recipe_name=recipe_name, region=region)
-        content = self._generate_text(prompt)
+        prompt = render("RECIPE_METADATA", recipe_name=recipe_name, region=region)
+        content = await self._agenerate_text(prompt)
         
-        # Parse JSON
-        content = content.strip()
-        if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
-                content = content[4:]
-        content = content.strip()
+        metadata = MetadataOut.model_validate_json(_strip_json_fence(content)).to_recipe_fields()
         
-        metadata = json.loads(content)
+        self._log(f"✓ Generated metadata: {metadata['prep_time_minutes']}+{metadata['cook_time_minutes']}min, {metadata['calories']} cal, {metadata['rating']}⭐", "SUCCESS")
+        return metadata
+    
+    # Sync wrappers (each runs its own event loop; don't call from inside a running loop).
+    # Async callers should call flush_logs() before closing the tracker.
+    
+    def generate_recipe_name(self, dish_name: str, region: str) -> str:
+        """Generate formatted recipe name"""
+        return self._run(self.agenerate_recipe_name(dish_name, region))
+    
+    def generate_description(self, recipe_name: str, region: str) -> str:
+        """Generate recipe description"""
+        return self._run(self.agenerate_description(recipe_name, region))
+    
+    def generate_ingredients(self, recipe_name: str, region: str) -> List[Dict[str, str]]:
+        """Generate ingredients list"""
+        return self._run(self.agenerate_ingredients(recipe_name, region))
+    
+    def generate_steps(self, recipe_name: str, ingredients: Union[List[Dict], str], level: str) -> List[str]:
+        """Generate cooking steps"""
+        return self._run(self.agenerate_steps(recipe_name, ingredients, level))
+    
+    def generate_steps_both(
+        self,
+        recipe_name: str,
+        ingredients: Union[List[Dict], str],
+        region: str = ""
+    ) -> Tuple[List[str], List[str]]:
+        """Generate beginner and advanced steps with one call"""
+        return self._run(self.agenerate_steps_both(recipe_name, ingredients, region))
+    
+    def generate_metadata(self, recipe_name: str, region: str) -> Dict[str, Any]:
+        """Generate recipe metadata (times, calories, tags, etc.)"""
+        return self._run(self.agenerate_metadata(recipe_name, region))
+    
+    def create_recipe_text_only(self, dish_name: str, region: str) -> Dict[str, Any]:
+        """Generate only text content for a recipe (sync wrapper around acreate_recipe_text_only)"""
+        return self._run(self.acreate_recipe_text_only(dish_name, region))
+    
+    async def agenerate_recipe_text_fused(self, dish_name: str, region: str) -> Dict[str, Any]:
+        """
+        Generate name, description, metadata, ingredients and both step levels
+        with a single LLM call (dish_name/region and shared context sent once)
         
-        # Calculate total time
-        prep_time = metadata.get('prep_time_minutes', 20)
-        cook_time = metadata.get('cook_time_minutes', 30)
-        total_time = prep_time + cook_time
+        Raises:
+            ValueError: If the reply is missing a field or has empty lists
+        """
+        self._log(f"Generating full recipe for: {dish_name} (single call)")
+        
+        prompt = render("FULL_RECIPE", dish_name=dish_name, region=region)
+        return self._parse_fused_recipe(await self._agenerate_text(prompt), region)
+    
+    async def agenerate_recipe_text_streamed(
+        self,
+        dish_name: str,
+        region: str,
+        on_intro: Optional[Callable[[str, str], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Same single call as agenerate_recipe_text_fused, but streamed
+        
+        on_intro(recipe_name, description) fires as soon as both fields have
+        streamed in, so callers can start work (e.g. the main image) while the
+        ingredients and steps are still being generated.
+        
+        Raises:
+            ValueError: If the reply is missing a field or has empty lists
+        """
+        self._log(f"Streaming full recipe for: {dish_name} (single call)")
+        
+        prompt = render("FULL_RECIPE", dish_name=dish_name, region=region)
+        parts = []
+        intro_sent = False
+        async for chunk in self._astream_text(prompt):
+            parts.append(chunk)
+            if intro_sent or on_intro is None:
+                continue
+            
+            buffer = "".join(parts)
+            name_match = _NAME_FIELD_RE.search(buffer)
+            description_match = _DESCRIPTION_FIELD_RE.search(buffer)
+            if name_match and description_match:
+                intro_sent = True
+                on_intro(
+                    _json_loads(f'"{name_match.group(1)}"').strip(),
+                    _json_loads(f'"{description_match.group(1)}"').strip()
+                )
+        
+        return self._parse_fused_recipe("".join(parts), region)
+    
+    def _parse_fused_recipe(self, content: str, region: str) -> Dict[str, Any]:
+        """Build a text recipe from a FULL_RECIPE_PROMPT reply"""
+        data = _parse_json_blob(content)
         
-        # Get rating, ensure it's between 3.5 and 5.0
-        rating = metadata.get('rating', 4.0)
-        rating = max(3.5, min(5.0, rating))  # Clamp to valid range
+        recipe_name = str(data['name']).strip().strip('"').strip("'")
+        ingredients = _format_ingredients(data['ingredients'])
+        beginner_steps = data['steps_beginner']
+        advanced_steps = data['steps_advanced']
+        if not recipe_name or not ingredients or not beginner_steps or not advanced_steps:
+            raise ValueError("Incomplete recipe in single-call response")
         
-        self._log(f"✓ Generated metadata: {prep_time}+{cook_time}min, {metadata.get('calories')} cal, {rating}⭐", "SUCCESS")
+        self._log(f"✓ Generated {recipe_name}: {len(ingredients)} ingredients, "
+                  f"{len(beginner_steps)}/{len(advanced_steps)} steps", "SUCCESS")
+        return self._build_text_recipe(
+            recipe_name,
+            str(data['description']).strip(),
+            region,
+            MetadataOut.model_validate(data.get('metadata') or {}).to_recipe_fields(),
+            ingredients,
+            beginner_steps,
+            advanced_steps
+        )
+    
+    async def agenerate_recipe_text_pipeline(
+        self,
+        dish_name: str,
+        region: str,
+        recipe_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate text content field by field (one prompt per field)
+        
+        Description, metadata and ingredients only depend on the name, so they
+        are requested concurrently; both step levels then come from one prompt.
+        Pass recipe_name to skip the name prompt.
+        """
+        # Step 1: Generate recipe name
+        if recipe_name is None:
+            recipe_name = await self.agenerate_recipe_name(dish_name, region)
+        
+        # Step 2: Generate description, metadata and ingredients in parallel
+        description, metadata, ingredients = await asyncio.gather(
+            self.agenerate_description(recipe_name, region),
+            self.agenerate_metadata(recipe_name, region),
+            self.agenerate_ingredients(recipe_name, region)
+        )
+        
+        # Step 3: Generate beginner & advanced steps together
+        beginner_steps, advanced_steps = await self.agenerate_steps_both(
+            recipe_name, _ingredients_lines(ingredients), region
+        )
+        
+        return self._build_text_recipe(
+            recipe_name, description, region, metadata,
+            ingredients, beginner_steps, advanced_steps
+        )
+    
+    def _build_text_recipe(
+        self,
+        recipe_name: str,
+        description: str,
+        region: str,
+        metadata: Dict[str, Any],
+        ingredients: List[Dict],
+        beginner_steps: List[str],
+        advanced_steps: List[str]
+    ) -> Dict[str, Any]:
+        """Construct recipe (text only)"""
         return {
-            'prep_time_minutes': prep_time,
-            'cook_time_minutes': cook_time,
-            'total_time_minutes': total_time,
-            'calories': metadata.get('calories', 0),
-            'rating': rating,
-            'tastes': metadata.get('tastes', []),
-            'meal_types': metadata.get('meal_types', []),
-            'dietary_tags': metadata.get('dietary_tags', [])
+            "name": recipe_name,
+            "description": description,
+            "region": region,
+            "difficulty": metadata['difficulty'],  # Generated by LLM
+            "prep_time_minutes": metadata['prep_time_minutes'],
+            "cook_time_minutes": metadata['cook_time_minutes'],
+            "total_time_minutes": metadata['total_time_minutes'],
+            "calories": metadata['calories'],
+            "rating": metadata['rating'],  # Generated by LLM
+            "popularity_score": 0.0,
+            "tastes": metadata['tastes'],
+            "meal_types": metadata['meal_types'],
+            "dietary_tags": metadata['dietary_tags'],
+            "ingredients": ingredients,
+            "steps_beginner": beginner_steps,
+            "steps_advanced": advanced_steps,
         }
     
-    def create_recipe_text_only(self, dish_name: str, region: str) -> Dict[str, Any]:
+    async def acreate_recipe_text_only(self, dish_name: str, region: str) -> Dict[str, Any]:
         """
         Generate only text content for a recipe (no images)
         
+        Tries a single structured call first and falls back to the per-field
+        pipeline if that reply can't be parsed. Repeat requests for the same
+        (dish_name, region) are served from cache.
+        
         Args:
             dish_name: Dish name (e.g., "paneer tikka")
             region: Cuisine region (e.g., "Indian")
@@ -169,44 +656,26 @@ class RecipeCreationService:
         Returns:
             Recipe dictionary with text content only (no images)
         """
+        recipe_key = recipe_cache_key(dish_name, region)
+        if self._cache is not None:
+            cached = self._cache.get(recipe_key)
+            if cached is not None:
+                recipe = _json_loads(cached)
+                self._log(f"✅ Served text content for {recipe['name']} from cache", "SUCCESS")
+                return recipe
+        
         try:
-            # Step 1: Generate recipe name
-            recipe_name = self.generate_recipe_name(dish_name, region)
-            
-            # Step 2: Generate description
-            description = self.generate_description(recipe_name, region)
-            
-            # Step 3: Generate metadata (times, calories, tags)
-            metadata = self.generate_metadata(recipe_name, region)
-            
-            # Step 4: Generate ingredients
-            ingredients = self.generate_ingredients(recipe_name, region)
-            
-            # Step 5: Generate beginner & advanced steps
-            beginner_steps = self.generate_steps(recipe_name, ingredients, "beginner")
-            advanced_steps = self.generate_steps(recipe_name, ingredients, "advanced")
+            try:
+                recipe = await self.agenerate_recipe_text_fused(dish_name, region)
+            except (ValueError, KeyError, TypeError) as e:
+                # JSON decode errors (json and orjson) are ValueErrors
+                self._log(f"Single-call generation failed ({e}), falling back to per-field prompts", "WARNING")
+                recipe = await self.agenerate_recipe_text_pipeline(dish_name, region)
             
-            # Construct recipe (text only)
-            recipe = {
-                "name": recipe_name,
-                "description": description,
-                "region": region,
-                "difficulty": "Medium",  # Must match DB constraint: Easy, Medium, Hard
-                "prep_time_minutes": metadata['prep_time_minutes'],
-                "cook_time_minutes": metadata['cook_time_minutes'],
-                "total_time_minutes": metadata['total_time_minutes'],
-                "calories": metadata['calories'],
-                "rating": metadata['rating'],  # Generated by LLM
-                "popularity_score": 0.0,
-                "tastes": metadata['tastes'],
-                "meal_types": metadata['meal_types'],
-                "dietary_tags": metadata['dietary_tags'],
-                "ingredients": ingredients,
-                "steps_beginner": beginner_steps,
-                "steps_advanced": advanced_steps,
-            }
+            if self._cache is not None:
+                self._cache.set(recipe_key, _json_dumps(recipe), ttl=RECIPE_CACHE_TTL_SECONDS)
             
-            self._log(f"✅ Successfully generated text content for: {recipe_name}", "SUCCESS")
+            self._log(f"✅ Successfully generated text content for: {recipe['name']}", "SUCCESS")
             return recipe
             
         except Exception as e:
@@ -223,11 +692,44 @@ class RecipeCreationService:
         steps_advanced: List[str],
         generate_main_image: bool = True,
         generate_ingredients_image: bool = True,
-        generate_step_images: bool = True
+        generate_step_images: bool = True,
+        ingredients_short: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Generate all images for a recipe (sync wrapper around agenerate_recipe_images)"""
+        return self._run(self.agenerate_recipe_images(
+            recipe_id=recipe_id,
+            recipe_name=recipe_name,
+            description=description,
+            ingredients=ingredients,
+            steps_beginner=steps_beginner,
+            steps_advanced=steps_advanced,
+            generate_main_image=generate_main_image,
+            generate_ingredients_image=generate_ingredients_image,
+            generate_step_images=generate_step_images,
+            ingredients_short=ingredients_short
+        ))
+    
+    async def agenerate_recipe_images(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        description: str,
+        ingredients: List[Dict],
+        steps_beginner: List[str],
+        steps_advanced: List[str],
+        generate_main_image: bool = True,
+        generate_ingredients_image: bool = True,
+        generate_step_images: bool = True,
+        ingredients_short: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate all images for a recipe using real recipe ID
         
+        The main image, ingredients image and the two step-image series are
+        independent, so they run concurrently on a small thread pool (the
+        regeneration service calls are blocking). Each step series stays
+        sequential because its prompts build on cumulative state.
+        
         Args:
             recipe_id: Real recipe ID from database
             recipe_name: Recipe name
@@ -238,17 +740,24 @@ class RecipeCreationService:
             generate_main_image: Whether to generate main image
             generate_ingredients_image: Whether to generate ingredients image
             generate_step_images: Whether to generate step images
+            ingredients_short: Prebuilt _ingredients_short text (computed if omitted)
         
         Returns:
             Dictionary with image URLs
         """
         try:
-            images = {}
+            images = {
+                'main_image': None,
+                'ingredients_image': None,
+                'beginner_images': [],
+                'advanced_images': []
+            }
+            jobs = {}
             
-            # Generate main image
             if generate_main_image:
                 self._log("Generating main image")
-                images['main_image'] = self.regen_service.generate_main_image(
+                jobs['main_image'] = functools.partial(
+                    self.regen_service.generate_main_image,
                     recipe_id=recipe_id,
                     recipe_name=recipe_name,
                     description=description,
@@ -256,51 +765,50 @@ class RecipeCreationService:
                 )
             else:
                 self._log("Skipping main image generation", "INFO")
-                images['main_image'] = None
             
-            # Generate ingredients image
             if generate_ingredients_image:
                 self._log("Generating ingredients image")
-                ingredients_str = ", ".join([ing['ingredient'] for ing in ingredients[:10]])
-                images['ingredients_image'] = self.regen_service.generate_ingredients_image(
+                if ingredients_short is None:
+                    ingredients_short = _ingredients_short(ingredients)
+                jobs['ingredients_image'] = functools.partial(
+                    self.regen_service.generate_ingredients_image,
                     recipe_id=recipe_id,
                     recipe_name=recipe_name,
-                    ingredients=ingredients_str,
+                    ingredients=ingredients_short,
                     current_ingredients_image=None
                 )
             else:
                 self._log("Skipping ingredients image generation", "INFO")
-                images['ingredients_image'] = None
             
-            # Generate step images
             if generate_step_images:
                 # Extract ingredient names for cumulative state
                 ingredient_names = [ing.get('ingredient', ing.get('name', '')) if isinstance(ing, dict) else str(ing) 
                                   for ing in ingredients if ing]
                 
-                self._log(f"Generating beginner step images ({len(steps_beginner)} steps)")
-                images['beginner_images'] = self.regen_service.generate_step_images(
-                    recipe_id=recipe_id,
-                    recipe_name=recipe_name,
-                    steps=steps_beginner,
-                    existing_step_images=[],
-                    step_type="beginner",
-                    ingredients=ingredient_names
-                )
-                
-                self._log(f"Generating advanced step images ({len(steps_advanced)} steps)")
-                images['advanced_images'] = self.regen_service.generate_step_images(
-                    recipe_id=recipe_id,
-                    recipe_name=recipe_name,
-                    steps=steps_advanced,
-                    existing_step_images=[],
-                    step_type="advanced",
-                    ingredients=ingredient_names
-                )
+                for step_type, steps in (("beginner", steps_beginner), ("advanced", steps_advanced)):
+                    self._log(f"Generating {step_type} step images ({len(steps)} steps)")
+                    jobs[f'{step_type}_images'] = functools.partial(
+                        self.regen_service.generate_step_images,
+                        recipe_id=recipe_id,
+                        recipe_name=recipe_name,
+                        steps=steps,
+                        existing_step_images=[],
+                        step_type=step_type,
+                        ingredients=ingredient_names
+                    )
             else:
                 self._log("Skipping step images generation", "INFO")
-                images['beginner_images'] = []
-                images['advanced_images'] = []
+            
+            if jobs:
+                loop = asyncio.get_running_loop()
+                
+                with ThreadPoolExecutor(max_workers=IMAGE_JOB_WORKERS) as pool:
+                    async def run_job(job):
+                        async with self._limiter():
+                            return await loop.run_in_executor(pool, job)
+                    
+                    results = await asyncio.gather(*(run_job(job) for job in jobs.values()))
+                images.update(zip(jobs.keys(), results))
             
             self._log("✅ Successfully generated all images", "SUCCESS")
             return images
@@ -315,107 +823,111 @@ class RecipeCreationService:
         region: str,
         generate_main_image: bool = True,
         generate_ingredients_image: bool = True,
-        generate_step_images: bool = True
+        generate_step_images: bool = True,
+        created_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Generate complete recipe from scratch (sync wrapper around acreate_recipe_from_scratch)"""
+        return self._run(self.acreate_recipe_from_scratch(
+            dish_name,
+            region,
+            generate_main_image=generate_main_image,
+            generate_ingredients_image=generate_ingredients_image,
+            generate_step_images=generate_step_images,
+            created_at=created_at
+        ))
+    
+    async def acreate_recipe_from_scratch(
+        self, 
+        dish_name: str, 
+        region: str,
+        generate_main_image: bool = True,
+        generate_ingredients_image: bool = True,
+        generate_step_images: bool = True,
+        created_at: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate complete recipe from scratch
         
+        The recipe text is streamed from a single call; the main image starts
+        generating as soon as the name and description arrive, overlapping
+        with the rest of the text.
+        
         Args:
             dish_name: Dish name (e.g., "paneer tikka")
             region: Cuisine region (e.g., "Indian")
             generate_main_image: Whether to generate main cover image (default: True)
             generate_ingredients_image: Whether to generate ingredients image (default: True)
             generate_step_images: Whether to generate step images (default: True)
+            created_at: ISO timestamp to stamp on the recipe (default: now, UTC).
+                Batch drivers can pass one value so all recipes share it.
         
         Returns:
             Complete recipe dictionary ready to save
         """
+        main_image_task = None
+        intro_name = None
+        
+        def start_main_image(streamed_name: str, streamed_description: str):
+            nonlocal main_image_task, intro_name
+            intro_name = streamed_name
+            self._log("Generating main image (while recipe text streams)")
+            main_image_task = asyncio.create_task(self._limited_to_thread(
+                self.regen_service.generate_main_image,
+                recipe_id=-1,
+                recipe_name=streamed_name,
+                description=streamed_description,
+                current_image=None
+            ))
+        
         try:
-            # Step 1: Generate recipe name
-            recipe_name = self.generate_recipe_name(dish_name, region)
-            
-            # Step 2: Generate description
-            description = self.generate_description(recipe_name, region)
-            
-            # Step 3: Generate ingredients
-            ingredients = self.generate_ingredients(recipe_name, region)
-            
-            # Step 4: Generate beginner & advanced steps
-            beginner_steps = self.generate_steps(recipe_name, ingredients, "beginner")
-            advanced_steps = self.generate_steps(recipe_name, ingredients, "advanced")
-            
-            # Step 5: Generate images (conditionally based on flags)
-            main_image = None
-            if generate_main_image:
-                self._log("Generating main image")
-                main_image = self.regen_service.generate_main_image(
-                    recipe_id=-1,
-                    recipe_name=recipe_name,
-                    description=description,
-                    current_image=None
-                )
-            else:
-                self._log("Skipping main image generation", "INFO")
-            
-            ingredients_image = None
-            if generate_ingredients_image:
-                self._log("Generating ingredients image")
-                ingredients_str = ", ".join([ing['ingredient'] for ing in ingredients[:10]])
-                ingredients_image = self.regen_service.generate_ingredients_image(
-                    recipe_id=-1,
-                    recipe_name=recipe_name,
-                    ingredients=ingredients_str,
-                    current_ingredients_image=None
+            # Step 1: Stream name, description, ingredients & steps (main image starts mid-stream)
+            try:
+                text = await self.agenerate_recipe_text_streamed(
+                    dish_name,
+                    region,
+                    on_intro=start_main_image if generate_main_image else None
                 )
-            else:
-                self._log("Skipping ingredients image generation", "INFO")
+            except (ValueError, KeyError, TypeError) as e:
+                # JSON decode errors (json and orjson) are ValueErrors
+                self._log(f"Single-call generation failed ({e}), falling back to per-field prompts", "WARNING")
+                text = await self.agenerate_recipe_text_pipeline(dish_name, region, recipe_name=intro_name)
             
-            # Step 6: Generate step images (conditionally)
-            beginner_images = []
-            advanced_images = []
+            recipe_name = text['name']
+            description = text['description']
+            ingredients = text['ingredients']
+            beginner_steps = text['steps_beginner']
+            advanced_steps = text['steps_advanced']
             
-            if generate_step_images:
-                # Extract ingredient names for cumulative state
-                ingredient_names = [ing.get('ingredient', ing.get('name', '')) if isinstance(ing, dict) else str(ing) 
-                                  for ing in ingredients if ing]
-                
-                self._log(f"Generating beginner step images ({len(beginner_steps)} steps)")
-                beginner_images = self.regen_service.generate_step_images(
-                    recipe_id=-1,
-                    recipe_name=recipe_name,
-                    steps=beginner_steps,
-                    existing_step_images=[],
-                    step_type="beginner",
-                    ingredients=ingredient_names
-                )
-                
-                self._log(f"Generating advanced step images ({len(advanced_steps)} steps)")
-                advanced_images = self.regen_service.generate_step_images(
-                    recipe_id=-1,
-                    recipe_name=recipe_name,
-                    steps=advanced_steps,
-                    existing_step_images=[],
-                    step_type="advanced",
-                    ingredients=ingredient_names
-                )
-            else:
-                self._log("Skipping step images generation", "INFO")
+            # Step 2: Generate remaining images concurrently (per flags)
+            images = await self.agenerate_recipe_images(
+                recipe_id=-1,
+                recipe_name=recipe_name,
+                description=description,
+                ingredients=ingredients,
+                steps_beginner=beginner_steps,
+                steps_advanced=advanced_steps,
+                generate_main_image=generate_main_image and main_image_task is None,
+                generate_ingredients_image=generate_ingredients_image,
+                generate_step_images=generate_step_images
+            )
+            if main_image_task is not None:
+                images['main_image'] = await main_image_task
             
             # Construct complete recipe
             recipe = {
                 "name": recipe_name,
                 "description": description,
                 "region": region,
-                "difficulty": "Medium",  # Must match DB constraint: Easy, Medium, Hard
+                "difficulty": text['difficulty'],
                 "ingredients": ingredients,
-                "ingredients_image": ingredients_image,
+                "ingredients_image": images['ingredients_image'],
                 "steps_beginner": beginner_steps,
                 "steps_advanced": advanced_steps,
-                "steps_beginner_images": beginner_images,
-                "steps_advanced_images": advanced_images,
-                "image_url": main_image,
+                "steps_beginner_images": images['beginner_images'],
+                "steps_advanced_images": images['advanced_images'],
+                "image_url": images['main_image'],
                 "validation_status": "pending",
-                "created_at": datetime.now().isoformat(),
+                "created_at": created_at or datetime.now(timezone.utc).isoformat(),
             }
             
             self._log(f"✅ Successfully generated complete recipe: {recipe_name}", "SUCCESS")
@@ -424,9 +936,17 @@ class RecipeCreationService:
         except Exception as e:
             self._log(f"❌ Failed to generate recipe: {e}", "ERROR")
             raise
+        
+        finally:
+            if main_image_task is not None:
+                # On failure the early main image is abandoned: cancel it and
+                # collect its outcome so no exception goes unretrieved
+                if not main_image_task.done():
+                    main_image_task.cancel()
+                await asyncio.gather(main_image_task, return_exceptions=True)
 
 
 class DummyTracker:
-    """Dummy tracker for when no job tracking is needed"""
+    """No-op tracker for RecipeRegenerationService when no job tracking is needed"""
     def log(self, message, level, recipe_id, recipe_name, **kwargs):
         pass
@@ -10,25 +10,204 @@ Handles regeneration of recipe data including:
 - Ingredient validation and fixing
 """
 
-import json
+import asyncio
+import hashlib
+import os
+import random
+import re
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 
-from core.top_recipes_service import get_recipe_by_id, get_top_recipes, update_recipe
+# orjson when available (faster parsing of LLM JSON replies), stdlib otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+from core.top_recipes_service import (
+    append_recipe_json_items,
+    get_recipe_by_id,
+    get_step_state_snapshot,
+    get_top_recipes,
+    save_step_state_snapshot,
+    update_recipe
+)
 from core.s3_service import get_s3_service
-from core.image_generator import ImageGenerator
+from core.image_generator import ImageGenerator, create_imagen_transport
+from core.rate_limiter import get_rate_limiter
 from core.step_image_prompt_generator import create_prompt_generator_for_recipe
-from prompts.recipe_regeneration_prompts import (
-    INGREDIENTS_IMAGE_PROMPT,
-    BEGINNER_STEPS_PROMPT,
-    ADVANCED_STEPS_PROMPT,
-    INGREDIENT_VALIDATION_PROMPT,
-    MAIN_IMAGE_PROMPT
+from prompts.recipe_regeneration_prompts import render
+
+# Step images generated + uploaded at once (keep within the Imagen rate limit)
+STEP_IMAGE_MAX_WORKERS = int(os.getenv("IMAGE_GEN_MAX_WORKERS", "4"))
+
+# Output/latency bounds per LLM operation (retries are ours, LangChain's are off)
+STEPS_MAX_OUTPUT_TOKENS = 2048  # ~15 short steps
+VALIDATION_MAX_OUTPUT_TOKENS = 512
+LLM_TIMEOUT_SECONDS = 60
+
+# Incremental step-image saves are coalesced: at most one DB write per window,
+# or immediately once this many new images have piled up
+STEP_IMAGE_SAVE_DEBOUNCE_SECONDS = 1.5
+STEP_IMAGE_SAVE_EVERY = 4
+
+# Longest wait between retries, computed backoff and server-suggested waits alike
+RETRY_MAX_WAIT_SECONDS = 120
+
+# Server-suggested waits: HTTP "Retry-After: N" and Google's
+# "retry_delay { seconds: N }" / "'retryDelay': 'Ns'" error payloads
+_RETRY_AFTER_RE = re.compile(
+    r"retry-after:\s*(\d+(?:\.\d+)?)"
+    r"|retry_delay\s*\{\s*seconds:\s*(\d+)"
+    r"|retryDelay['\"]?\s*:\s*['\"](\d+(?:\.\d+)?)s",
+    re.IGNORECASE
 )
 
 
+# JSON payload inside an optional ```json fence
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\}|\[.*\])\s*```", re.DOTALL)
+
+
+def _strip_json_fence(content: str) -> str:
+    """Extract the JSON body from an LLM reply (fenced or bare)"""
+    stripped = content.strip()
+    if stripped.startswith(("{", "[")):
+        # Bare JSON (the common case): nothing to search for
+        return stripped
+    if stripped.startswith("```"):
+        # Fence at the start: slice between the markers, no split() list or regex
+        end = stripped.rfind("```", 3)
+        body = stripped[3:end] if end != -1 else stripped[3:]
+        if body[:4].lower() == "json":
+            body = body[4:]
+        return body.strip()
+    match = _FENCE_RE.search(content)
+    return match.group(1) if match else stripped
+
+
+def _parse_steps_response(content: str, expected_range: Tuple[int, int]) -> List[str]:
+    """
+    Parse an LLM steps reply into a list of step strings
+    
+    Raises:
+        Exception: If the reply isn't a JSON list or has an unexpected length
+    """
+    new_steps = _json_loads(_strip_json_fence(content))
+    if not isinstance(new_steps, list):
+        raise Exception(f"Expected list of steps, got {type(new_steps)}")
+    
+    min_steps, max_steps = expected_range
+    if not min_steps <= len(new_steps) <= max_steps:
+        raise Exception(f"Invalid number of steps: {len(new_steps)}. Expected {min_steps}-{max_steps}")
+    
+    return new_steps
+
+
+def _steps_digest(steps: List[str]) -> str:
+    """Fingerprint of step texts, so a saved state snapshot is only reused for the same steps"""
+    return hashlib.sha1("\x1f".join(steps).encode("utf-8")).hexdigest()
+
+
+def _format_error(e: BaseException, terminal: bool) -> Dict[str, Optional[str]]:
+    """
+    Tracker error_details for an exception
+    
+    Formatting a traceback walks every frame, so it is only done for errors
+    that end the operation here; errors that are retried or re-raised to a
+    caller that logs them get just the message.
+    """
+    return {
+        "error": str(e),
+        "traceback": traceback.format_exc() if terminal else None
+    }
+
+
+def is_rate_limit_error(error_msg: str) -> bool:
+    """Whether an error message looks like a 429 / quota rejection"""
+    lowered = error_msg.lower()
+    return "429" in error_msg or "rate limit" in lowered or "quota" in lowered
+
+
+def compute_retry_wait(error_msg: str, attempt: int, initial_delay: float) -> float:
+    """
+    Seconds to wait before retry number `attempt` (1-based)
+    
+    Honors a server-suggested delay when the error carries one (capped at
+    RETRY_MAX_WAIT_SECONDS); otherwise exponential backoff for rate limits
+    (flat delay for other errors), plus random jitter so concurrent jobs
+    don't retry in lockstep.
+    """
+    match = _RETRY_AFTER_RE.search(error_msg)
+    if match:
+        server_wait = float(next(group for group in match.groups() if group))
+        return min(server_wait, RETRY_MAX_WAIT_SECONDS) + random.uniform(0, 1)
+    
+    if is_rate_limit_error(error_msg):
+        backoff = min(RETRY_MAX_WAIT_SECONDS, initial_delay * (2 ** (attempt - 1)))
+        return backoff + random.uniform(0, initial_delay)
+    
+    return initial_delay + random.uniform(0, initial_delay / 2)
+
+
+class _DebouncedSaver:
+    """
+    Coalesces incremental saves of a growing list into fewer DB writes
+    
+    schedule() keeps only the latest snapshot and writes it once no newer
+    one arrives for `delay` seconds, or right away every `every` snapshots.
+    flush() writes whatever is still pending (call it in a finally block).
+    Images already on S3 are durable, so at worst the DB row is `delay` stale.
+    """
+    
+    def __init__(self, save, delay: float = STEP_IMAGE_SAVE_DEBOUNCE_SECONDS, every: int = STEP_IMAGE_SAVE_EVERY):
+        """
+        Args:
+            save: Callable taking the list snapshot to persist
+            delay: Quiet period before a trailing write
+            every: Unsaved snapshots that force an immediate write
+        """
+        self._save = save
+        self._delay = delay
+        self._every = max(1, every)
+        self._pending = None
+        self._unsaved = 0
+        self._timer = None
+        self._lock = threading.Lock()
+    
+    def schedule(self, items: List[dict]):
+        """Queue a snapshot of items for saving"""
+        with self._lock:
+            self._pending = list(items)
+            self._unsaved += 1
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self._unsaved < self._every:
+                self._timer = threading.Timer(self._delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self.flush()
+    
+    def flush(self):
+        """Write the pending snapshot now (no-op if nothing is pending)"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, None
+            self._unsaved = 0
+            if pending is not None:
+                # Saved under the lock so an older snapshot can't land after a newer one
+                self._save(pending)
+
+
 class RecipeRegenerationService:
     """Service for regenerating recipe content with smart skip logic"""
     
@@ -42,7 +221,14 @@ class RecipeRegenerationService:
         self.tracker = tracker
         self.s3_service = get_s3_service()
         self._llm = None
+        self._bounded_llms = {}
+        # Recipes fetched during the current job (see clear_recipe_cache)
+        self._recipe_cache = {}
         self._image_gen = None
+        self._http_transport = None
+        # Proactive pacing so bursts wait locally instead of hitting 429s
+        self._imagen_limiter = get_rate_limiter("imagen")
+        self._llm_limiter = get_rate_limiter("llm")
     
     def get_llm(self):
         """Get LLM instance (lazy load)"""
@@ -53,14 +239,48 @@ class RecipeRegenerationService:
             self._llm = llm
         return self._llm
     
+    def get_bounded_llm(self, max_output_tokens: int):
+        """Get LLM copy capped at max_output_tokens and LLM_TIMEOUT_SECONDS (shares the client)"""
+        bounded = self._bounded_llms.get(max_output_tokens)
+        if bounded is None:
+            bounded = self.get_llm().model_copy(update={
+                "max_output_tokens": max_output_tokens,
+                "timeout": LLM_TIMEOUT_SECONDS,
+                "max_retries": 0
+            })
+            self._bounded_llms[max_output_tokens] = bounded
+        return bounded
+    
+    def _get_recipe(self, recipe_id: int):
+        """Fetch a recipe once per job instead of once per step-image pass"""
+        recipe = self._recipe_cache.get(recipe_id)
+        if recipe is None:
+            recipe = get_recipe_by_id(recipe_id)
+            if recipe is not None:
+                self._recipe_cache[recipe_id] = recipe
+        return recipe
+    
+    def clear_recipe_cache(self):
+        """Forget recipes fetched during this job (call when the job ends)"""
+        self._recipe_cache.clear()
+    
     def get_image_generator(self):
         """Get ImageGenerator instance (lazy load)"""
         if self._image_gen is None:
-            self._image_gen = ImageGenerator(self.get_llm())
+            # Pooled keep-alive (HTTP/2 when available) connections for every Imagen call of the job
+            self._http_transport = create_imagen_transport()
+            self._image_gen = ImageGenerator(self.get_llm(), http_transport=self._http_transport)
         return self._image_gen
     
+    def close(self):
+        """Close pooled Imagen connections (call when the job ends; they reopen lazily)"""
+        if self._http_transport is not None:
+            self._http_transport.close()
+            self._http_transport = None
+            self._image_gen = None
+    
     def retry_with_backoff(self, func, max_retries=3, initial_delay=15, *args, **kwargs):
-        """Retry function with exponential backoff"""
+        """Retry function with jittered exponential backoff (honors Retry-After hints)"""
         for attempt in range(1, max_retries + 1):
             try:
                 return func(*args, **kwargs)
@@ -71,16 +291,34 @@ class RecipeRegenerationService:
                     print(f"   ❌ Failed after {max_retries} attempts: {error_msg}")
                     raise
                 
-                # Check if it's a rate limit error
-                if "429" in error_msg or "rate limit" in error_msg.lower() or "quota" in error_msg.lower():
-                    wait_time = initial_delay * (attempt ** 1.5)
+                wait_time = compute_retry_wait(error_msg, attempt, initial_delay)
+                if is_rate_limit_error(error_msg):
                     print(f"   ⚠️  Rate limit hit. Retry {attempt}/{max_retries} in {wait_time:.1f}s...")
                 else:
-                    wait_time = initial_delay
-                    print(f"   ⚠️  Error: {error_msg}. Retry {attempt}/{max_retries} in {wait_time:.1f}s...")
+                    print(f"   ⚠️  Error: {e.__class__.__name__}: {error_msg}. Retry {attempt}/{max_retries} in {wait_time:.1f}s...")
                 
                 time.sleep(wait_time)
     
+    async def aretry_with_backoff(self, func, max_retries=3, initial_delay=15):
+        """Async twin of retry_with_backoff (awaits instead of sleeping the thread)"""
+        for attempt in range(1, max_retries + 1):
+            try:
+                return await func()
+            except Exception as e:
+                error_msg = str(e)
+                
+                if attempt == max_retries:
+                    print(f"   ❌ Failed after {max_retries} attempts: {error_msg}")
+                    raise
+                
+                wait_time = compute_retry_wait(error_msg, attempt, initial_delay)
+                if is_rate_limit_error(error_msg):
+                    print(f"   ⚠️  Rate limit hit. Retry {attempt}/{max_retries} in {wait_time:.1f}s...")
+                else:
+                    print(f"   ⚠️  Error: {e.__class__.__name__}: {error_msg}. Retry {attempt}/{max_retries} in {wait_time:.1f}s...")
+                
+                await asyncio.sleep(wait_time)
+    
     # ========================================================================
     # Main Image Generation
     # ========================================================================
@@ -117,17 +355,19 @@ class RecipeRegenerationService:
         
         try:
             # Create prompt
-            prompt = MAIN_IMAGE_PROMPT.format(
+            prompt = render(
+                "MAIN_IMAGE",
                 recipe_name=recipe_name,
                 description=description
             )
             
             # Generate image
             def generate_image():
-                image_base64, _ = self.get_image_generator()._generate_with_imagen(prompt)
-                if not image_base64:
+                with self._imagen_limiter:
+                    image_bytes, _ = self.get_image_generator()._generate_imagen_bytes(prompt, use_cache=False)
+                if not image_bytes:
                     raise Exception("No image data returned from Gemini")
-                return image_base64
+                return image_bytes
             
             self.tracker.log(
                 f"Generating main image",
@@ -138,14 +378,14 @@ class RecipeRegenerationService:
                 metadata={"prompt": prompt}
             )
             
-            image_base64 = self.retry_with_backoff(generate_image)
+            image_bytes = self.retry_with_backoff(generate_image)
             
             # Upload to S3
             def upload_to_s3():
                 return self.s3_service.upload_recipe_main_image(
                     recipe_id=recipe_id,
                     recipe_name=recipe_name,
-                    image_base64=image_base64,
+                    image_bytes=image_bytes,
                     archive_existing=True
                 )
             
@@ -170,7 +410,7 @@ class RecipeRegenerationService:
                 recipe_id,
                 recipe_name,
                 operation="main_image",
-                error_details={"error": error_msg, "traceback": traceback.format_exc()}
+                error_details=_format_error(e, terminal=True)
             )
             return None
     
@@ -210,17 +450,19 @@ class RecipeRegenerationService:
         
         try:
             # Create prompt
-            prompt = INGREDIENTS_IMAGE_PROMPT.format(
+            prompt = render(
+                "INGREDIENTS_IMAGE",
                 recipe_name=recipe_name,
                 ingredients=ingredients
             )
             
             # Generate image
             def generate_image():
-                image_base64, _ = self.get_image_generator()._generate_with_imagen(prompt)
-                if not image_base64:
+                with self._imagen_limiter:
+                    image_bytes, _ = self.get_image_generator()._generate_imagen_bytes(prompt, use_cache=False)
+                if not image_bytes:
                     raise Exception("No image data returned from Gemini")
-                return image_base64
+                return image_bytes
             
             self.tracker.log(
                 f"Generating ingredients image",
@@ -231,7 +473,7 @@ class RecipeRegenerationService:
                 metadata={"prompt": prompt}
             )
             
-            image_base64 = self.retry_with_backoff(generate_image)
+            image_bytes = self.retry_with_backoff(generate_image)
             
             # Upload to S3 (using step image method with index 0 to distinguish)
             def upload_to_s3():
@@ -239,7 +481,7 @@ class RecipeRegenerationService:
                     recipe_id=recipe_id,
                     recipe_name=recipe_name,
                     step_index=0,  # Use 0 for ingredients image
-                    image_base64=image_base64,
+                    image_bytes=image_bytes,
                     archive_existing=True
                 )
             
@@ -267,33 +509,103 @@ class RecipeRegenerationService:
                 recipe_id,
                 recipe_name,
                 operation="ingredients_image",
-                error_details={"error": error_msg, "traceback": traceback.format_exc()}
+                error_details=_format_error(e, terminal=True)
             )
             return None
     
+    def generate_all_images(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        description: str,
+        ingredients: str,
+        current_image: Optional[str],
+        current_ingredients_image: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Generate main and ingredients images concurrently (sync wrapper around agenerate_all_images)"""
+        return asyncio.run(self.agenerate_all_images(
+            recipe_id, recipe_name, description, ingredients,
+            current_image, current_ingredients_image
+        ))
+    
+    async def agenerate_all_images(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        description: str,
+        ingredients: str,
+        current_image: Optional[str],
+        current_ingredients_image: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Generate main and ingredients images at the same time
+        
+        The two have independent prompts and S3 keys, so wall time is the
+        slower of the two instead of their sum. Each still skips when its
+        current URL is set, and one failing doesn't cancel the other.
+        
+        Returns:
+            Tuple of (main image URL, ingredients image URL), with the same
+            values generate_main_image / generate_ingredients_image return
+        """
+        results = await asyncio.gather(
+            asyncio.to_thread(
+                self.generate_main_image,
+                recipe_id, recipe_name, description, current_image
+            ),
+            asyncio.to_thread(
+                self.generate_ingredients_image,
+                recipe_id, recipe_name, ingredients, current_ingredients_image
+            ),
+            return_exceptions=True
+        )
+        main_image, ingredients_image = (
+            None if isinstance(result, BaseException) else result
+            for result in results
+        )
+        return main_image, ingredients_image
+    
     # ========================================================================
     # Step Images Generation (with Resume Logic)
     # ========================================================================
     
-    def _update_step_images_in_db(self, recipe_id: int, step_type: str, step_images: List[dict]):
+    def _update_step_images_in_db(
+        self,
+        recipe_id: int,
+        step_type: str,
+        step_images: List[dict],
+        saved_count: int = 0
+    ) -> bool:
         """
         Incrementally update step images in database (Supabase)
-        This is called after each individual image generation to prevent data loss
+        Called (debounced) as step images land to prevent data loss
+        
+        Only the images after saved_count are sent (JSONB array append); the
+        full list is written instead if the stored array isn't saved_count long.
         
         Args:
             recipe_id: Recipe ID
             step_type: 'beginner', 'advanced', or 'original'
             step_images: Complete list of step images to save
+            saved_count: How many of step_images the database already has
+            
+        Returns:
+            True if the database now holds step_images
         """
         try:
             field_name = f'steps_{step_type}_images' if step_type != 'original' else 'step_image_urls'
-            update_recipe(recipe_id=recipe_id, **{field_name: step_images})
+            new_images = step_images[saved_count:]
+            if not new_images:
+                return True
+            if not append_recipe_json_items(recipe_id, field_name, new_images, expected_length=saved_count):
+                update_recipe(recipe_id=recipe_id, **{field_name: step_images})
             self.tracker.log(
                 f"Incrementally saved {len(step_images)} {step_type} step images to database",
                 "INFO",
                 recipe_id,
                 operation="incremental_save"
             )
+            return True
         except Exception as e:
             # Log but don't fail - we'll retry on next generation
             self.tracker.log(
@@ -302,6 +614,108 @@ class RecipeRegenerationService:
                 recipe_id,
                 operation="incremental_save"
             )
+            return False
+    
+    def _load_state_snapshot(
+        self,
+        recipe_id: int,
+        step_type: str,
+        steps: List[str],
+        existing_count: int
+    ) -> Optional[Dict]:
+        """Cumulative state saved by the pass that stopped at existing_count (None if there is none or it is stale)"""
+        try:
+            saved = get_step_state_snapshot(recipe_id, step_type)
+        except Exception as e:
+            self.tracker.log(
+                f"Warning: Could not load cumulative state snapshot: {str(e)}",
+                "WARNING",
+                recipe_id,
+                operation="steps_images"
+            )
+            return None
+        
+        if (
+            not saved
+            or saved.get("next_step_index") != existing_count
+            or saved.get("steps_digest") != _steps_digest(steps[:existing_count])
+        ):
+            return None
+        return saved.get("state")
+    
+    def _save_state_snapshot(
+        self,
+        recipe_id: int,
+        step_type: str,
+        steps: List[str],
+        next_step_index: int,
+        state: Dict
+    ):
+        """Persist cumulative state after steps[:next_step_index] so a resume can skip replaying them"""
+        try:
+            save_step_state_snapshot(recipe_id, step_type, {
+                "next_step_index": next_step_index,
+                "steps_digest": _steps_digest(steps[:next_step_index]),
+                "state": state
+            })
+        except Exception as e:
+            # Resume just falls back to rebuilding state
+            self.tracker.log(
+                f"Warning: Failed to save cumulative state snapshot: {str(e)}",
+                "WARNING",
+                recipe_id,
+                operation="incremental_save"
+            )
+    
+    def _is_job_cancelled(self) -> bool:
+        """Check whether the tracker's job was cancelled (trackers without jobs never are)"""
+        if not hasattr(self.tracker, 'get_job_status'):
+            return False
+        job_status = self.tracker.get_job_status()
+        return bool(job_status and job_status.get('status') == 'cancelled')
+    
+    def _generate_step_image_bytes(self, prompt: str) -> bytes:
+        """Generate one step image as raw bytes (runs on a worker thread)"""
+        def generate_step_image():
+            with self._imagen_limiter:
+                image_bytes, _ = self.get_image_generator()._generate_imagen_bytes(prompt, use_cache=False)
+            if not image_bytes:
+                raise Exception("No image data returned from Gemini")
+            return image_bytes
+        
+        return self.retry_with_backoff(generate_step_image)
+    
+    def _extract_step_ingredients(self, recipe_id: int, recipe_name: str, recipe_obj=None) -> List[str]:
+        """Ingredient names for cumulative state, from recipe_obj or the (cached) recipe row"""
+        try:
+            recipe = recipe_obj if recipe_obj is not None else self._get_recipe(recipe_id)
+            if isinstance(recipe, dict):
+                recipe_ingredients = recipe.get('ingredients')
+            else:
+                recipe_ingredients = getattr(recipe, 'ingredients', None)
+            
+            if not recipe_ingredients:
+                return []
+            
+            # Parse ingredients from recipe
+            if isinstance(recipe_ingredients, str):
+                ingredients_data = _json_loads(recipe_ingredients)
+            else:
+                ingredients_data = recipe_ingredients
+            
+            # Extract ingredient names
+            if not isinstance(ingredients_data, list):
+                return []
+            return [ing.get('ingredient', ing.get('name', '')) if isinstance(ing, dict) else str(ing)
+                    for ing in ingredients_data if ing]
+        except Exception as e:
+            self.tracker.log(
+                f"Could not extract ingredients: {e}, continuing without",
+                "WARNING",
+                recipe_id,
+                recipe_name
+            )
+            return []
     
     def generate_step_images(
         self,
@@ -310,7 +724,8 @@ class RecipeRegenerationService:
         steps: List[str],
         existing_step_images: List[dict],
         step_type: str = "original",
-        ingredients: Optional[List[str]] = None
+        ingredients: Optional[List[str]] = None,
+        recipe_obj=None
     ) -> List[dict]:
         """
         Generate step images with resume capability and cumulative state
@@ -325,6 +740,8 @@ class RecipeRegenerationService:
             existing_step_images: List of existing step image dicts [{url, step_index, generated_at}]
             step_type: Type of step ('original', 'beginner', 'advanced') for S3 folder organization
             ingredients: Optional list of ingredients (extracted from recipe if not provided)
+            recipe_obj: Optional recipe (TopRecipe or row dict) the caller already has,
+                used for ingredients instead of fetching the recipe again
             
         Returns:
             Complete list of step image dicts (existing + newly generated)
@@ -345,37 +762,23 @@ class RecipeRegenerationService:
             )
             return existing_step_images
         
-        # Extract ingredients if not provided
-        if ingredients is None:
-            try:
-                recipe = get_recipe_by_id(recipe_id)
-                if recipe and recipe.ingredients:
-                    # Parse ingredients from recipe
-                    import json
-                    if isinstance(recipe.ingredients, str):
-                        ingredients_data = json.loads(recipe.ingredients)
-                    else:
-                        ingredients_data = recipe.ingredients
-                    
-                    # Extract ingredient names
-                    if isinstance(ingredients_data, list):
-                        ingredients = [ing.get('ingredient', ing.get('name', '')) if isinstance(ing, dict) else str(ing) 
-                                     for ing in ingredients_data if ing]
-                    else:
-                        ingredients = []
-                else:
-                    ingredients = []
-            except Exception as e:
-                self.tracker.log(
-                    f"Could not extract ingredients: {e}, continuing without",
-                    "WARNING",
-                    recipe_id,
-                    recipe_name
-                )
-                ingredients = []
+        # On resume, continue from the state the previous pass saved instead of
+        # starting cumulative state empty
+        state_snapshot = (
+            self._load_state_snapshot(recipe_id, step_type, steps, existing_count)
+            if existing_count else None
+        )
+        
+        # Without a snapshot, a single missing step has no earlier steps in this
+        # pass to build cumulative state from, so skip the state-parsing LLM call
+        # (and the ingredients lookup that only feeds it) and use the plain step prompt
+        use_cumulative_state = state_snapshot is not None or total_steps - existing_count > 1
+        if use_cumulative_state and ingredients is None:
+            ingredients = self._extract_step_ingredients(recipe_id, recipe_name, recipe_obj)
         
         self.tracker.log(
-            f"Generating {total_steps - existing_count} step images (have {existing_count}, need {total_steps}) using cumulative state",
+            f"Generating {total_steps - existing_count} step images (have {existing_count}, need {total_steps})"
+            + (" using cumulative state" if use_cumulative_state else ""),
             "INFO",
             recipe_id,
             recipe_name,
@@ -389,96 +792,144 @@ class RecipeRegenerationService:
             # Pass LLM from service to ensure it's initialized
             prompt_generator = create_prompt_generator_for_recipe(
                 recipe_name, 
-                ingredients, 
+                ingredients or [], 
                 llm=self.get_llm()
             )
+            if state_snapshot is not None:
+                prompt_generator.restore_state(state_snapshot)
             
-            # Generate missing step images (RESUME LOGIC HERE)
-            for step_idx in range(existing_count, total_steps):
-                # Check for job cancellation before each step
-                if hasattr(self.tracker, 'get_job_status'):
-                    job_status = self.tracker.get_job_status()
-                    if job_status and job_status.get('status') == 'cancelled':
-                        self.tracker.log(
-                            f"Job cancelled - stopping step image generation at step {step_idx + 1}/{total_steps}",
-                            "WARNING",
-                            recipe_id,
-                            recipe_name,
-                            operation="steps_images"
-                        )
-                        # Return what we have so far (already saved incrementally)
-                        return new_step_images
-                
+            # Every image of one pass shares a timestamp (formatted once, not per image)
+            generated_at = datetime.now().isoformat()
+            
+            # Cumulative state after each prompted step, saved with the images up to it
+            step_states = {}
+            completed = {}
+            key_to_step = {}
+            persisted_count = existing_count
+            
+            def save_images(images: List[dict]):
+                # Serialized by the saver; only images past persisted_count are sent
+                nonlocal persisted_count
+                if self._update_step_images_in_db(recipe_id, step_type, images, saved_count=persisted_count):
+                    persisted_count = len(images)
+                    state = step_states.get(persisted_count - 1)
+                    if state is not None:
+                        self._save_state_snapshot(recipe_id, step_type, steps, persisted_count, state)
+                    # list() copies the keys atomically; prompts keep adding entries
+                    for step_idx in [idx for idx in list(step_states) if idx < persisted_count]:
+                        step_states.pop(step_idx, None)
+            
+            saver = _DebouncedSaver(save_images)
+            pending = {}
+            save_lock = threading.Lock()
+            
+            def on_uploaded(s3_key: str, s3_url: str):
+                # Runs on an S3 transfer thread as each upload lands
+                step_idx = key_to_step[s3_key]
                 step_num = step_idx + 1
-                current_step = steps[step_idx]
-                
-                # Generate prompt using unified generator with cumulative state
-                prompt, metadata = prompt_generator.generate_prompt(
-                    step_index=step_idx,
-                    step_description=current_step,
-                    use_cumulative_state=True
-                )
-                
-                # Generate image
-                def generate_step_image():
-                    image_base64, _ = self.get_image_generator()._generate_with_imagen(prompt)
-                    if not image_base64:
-                        raise Exception("No image data returned from Gemini")
-                    return image_base64
-                
-                self.tracker.log(
-                    f"Generating step {step_num}/{total_steps} image ({step_type}) with cumulative state",
-                    "INFO",
-                    recipe_id,
-                    recipe_name,
-                    operation="steps_images",
-                    metadata={
-                        "step": step_num,
-                        "step_type": step_type,
-                        "prompt": prompt[:200] + "..." if len(prompt) > 200 else prompt,
-                        "cumulative_state": metadata
+                with save_lock:
+                    # Create step image dict with metadata
+                    completed[step_idx] = {
+                        "url": s3_url,
+                        "step_index": step_idx,  # 0-based index
+                        "generated_at": generated_at
                     }
-                )
-                
-                image_base64 = self.retry_with_backoff(generate_step_image)
-                
-                # Upload to S3 with step_type
-                def upload_step_to_s3():
-                    return self.s3_service.upload_recipe_step_image(
-                        recipe_id=recipe_id,
-                        recipe_name=recipe_name,
-                        step_index=step_num,
-                        image_base64=image_base64,
-                        archive_existing=True,
-                        step_type=step_type
+                    
+                    self.tracker.log(
+                        f"Successfully generated step {step_num}/{total_steps} image ({step_type})",
+                        "SUCCESS",
+                        recipe_id,
+                        recipe_name,
+                        operation="steps_images",
+                        metadata={"step": step_num, "step_type": step_type, "s3_url": s3_url}
                     )
-                
-                s3_url = self.retry_with_backoff(upload_step_to_s3, max_retries=3, initial_delay=5)
-                
-                # Create step image dict with metadata
-                step_image_dict = {
-                    "url": s3_url,
-                    "step_index": step_idx,  # 0-based index
-                    "generated_at": datetime.now().isoformat()
-                }
-                new_step_images.append(step_image_dict)
-                
-                # *** CRITICAL: Incrementally save to database after each image ***
-                # This prevents data loss if the process is interrupted
-                self._update_step_images_in_db(recipe_id, step_type, new_step_images)
-                
+                    
+                    # *** CRITICAL: Incrementally save to database as images land ***
+                    # Only the contiguous prefix is saved so resume-by-count stays correct;
+                    # writes are debounced and always flushed when the pass ends
+                    saved_count = len(new_step_images)
+                    while len(new_step_images) in completed:
+                        new_step_images.append(completed.pop(len(new_step_images)))
+                    if len(new_step_images) > saved_count:
+                        saver.schedule(new_step_images)
+            
+            def take(future):
+                # Finished generation -> (s3_key, image_bytes) for the uploader
+                step_idx = pending.pop(future)
+                s3_key = self.s3_service.step_image_key(recipe_id, recipe_name, step_idx + 1, step_type)
+                key_to_step[s3_key] = step_idx
+                return s3_key, future.result()
+            
+            def cancelled(step_num: int) -> bool:
+                if not self._is_job_cancelled():
+                    return False
                 self.tracker.log(
-                    f"Successfully generated step {step_num}/{total_steps} image ({step_type})",
-                    "SUCCESS",
+                    f"Job cancelled - stopping step image generation at step {step_num}/{total_steps}",
+                    "WARNING",
                     recipe_id,
                     recipe_name,
-                    operation="steps_images",
-                    metadata={"step": step_num, "step_type": step_type, "s3_url": s3_url}
+                    operation="steps_images"
                 )
+                return True
+            
+            def generated_images(executor):
+                # Three-stage pipeline: prompts are built here in step order (cumulative
+                # state depends on prior steps), Imagen calls run on the executor, and
+                # upload_many sends each finished image to S3 while later ones generate
+                for step_idx in range(existing_count, total_steps):  # RESUME LOGIC HERE
+                    step_num = step_idx + 1
+                    if cancelled(step_num):
+                        return
+                    
+                    prompt, metadata = prompt_generator.generate_prompt(
+                        step_index=step_idx,
+                        step_description=steps[step_idx],
+                        use_cumulative_state=use_cumulative_state
+                    )
+                    if use_cumulative_state:
+                        step_states[step_idx] = prompt_generator.state_snapshot()
+                    
+                    self.tracker.log(
+                        f"Generating step {step_num}/{total_steps} image ({step_type})"
+                        + (" with cumulative state" if use_cumulative_state else ""),
+                        "INFO",
+                        recipe_id,
+                        recipe_name,
+                        operation="steps_images",
+                        metadata={
+                            "step": step_num,
+                            "step_type": step_type,
+                            "prompt": prompt[:200] + "..." if len(prompt) > 200 else prompt,
+                            "cumulative_state": metadata
+                        }
+                    )
+                    pending[executor.submit(self._generate_step_image_bytes, prompt)] = step_idx
+                    
+                    # Hand over whatever finished while this prompt was being built
+                    for future in [f for f in pending if f.done()]:
+                        yield take(future)
                 
-                # Rate limiting: 2 second delay between generations
-                if step_num < total_steps:
-                    time.sleep(2)
+                for future in as_completed(list(pending)):
+                    step_num = pending[future] + 1
+                    yield take(future)
+                    if pending and cancelled(step_num):
+                        return
+            
+            max_workers = max(1, min(STEP_IMAGE_MAX_WORKERS, total_steps - existing_count))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                try:
+                    # One TransferManager for the whole pass; DB saves happen per upload.
+                    # One listing tells which step keys exist, so new ones skip the archive copy
+                    self.s3_service.upload_many(
+                        generated_images(executor),
+                        on_uploaded=on_uploaded,
+                        existing_keys=self.s3_service.list_recipe_keys(recipe_id, recipe_name)
+                    )
+                finally:
+                    # Don't start queued steps after a failure or cancellation
+                    for future in pending:
+                        future.cancel()
+                    saver.flush()
             
             return new_step_images
             
@@ -490,7 +941,8 @@ class RecipeRegenerationService:
                 recipe_id,
                 recipe_name,
                 operation="steps_images",
-                error_details={"error": error_msg, "traceback": traceback.format_exc()}
+                # Re-raised: the job handler logs the final traceback
+                error_details=_format_error(e, terminal=False)
             )
             # CRITICAL: Re-raise the exception to properly terminate the job
             # Don't silently continue - this was causing infinite loops
@@ -509,6 +961,61 @@ class RecipeRegenerationService:
         original_steps: Optional[str],
         existing_steps: Optional[List[str]] = None,
         desired_count: int = 10
+    ) -> Optional[List[str]]:
+        """Generate beginner-friendly steps (sync wrapper around agenerate_beginner_steps)"""
+        return asyncio.run(self.agenerate_beginner_steps(
+            recipe_id, recipe_name, description, ingredients, original_steps,
+            existing_steps=existing_steps,
+            desired_count=desired_count
+        ))
+    
+    def generate_advanced_steps(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        description: str,
+        ingredients: str,
+        original_steps: Optional[str],
+        existing_steps: Optional[List[str]] = None,
+        desired_count: int = 8
+    ) -> Optional[List[str]]:
+        """Generate advanced/experienced cook steps (sync wrapper around agenerate_advanced_steps)"""
+        return asyncio.run(self.agenerate_advanced_steps(
+            recipe_id, recipe_name, description, ingredients, original_steps,
+            existing_steps=existing_steps,
+            desired_count=desired_count
+        ))
+    
+    def generate_both_step_texts(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        description: str,
+        ingredients: str,
+        original_steps: Optional[str],
+        existing_beginner: Optional[List[str]] = None,
+        existing_advanced: Optional[List[str]] = None,
+        beginner: bool = True,
+        advanced: bool = True
+    ) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+        """Generate beginner and advanced steps concurrently (sync wrapper around agenerate_both_step_texts)"""
+        return asyncio.run(self.agenerate_both_step_texts(
+            recipe_id, recipe_name, description, ingredients, original_steps,
+            existing_beginner=existing_beginner,
+            existing_advanced=existing_advanced,
+            beginner=beginner,
+            advanced=advanced
+        ))
+    
+    async def agenerate_beginner_steps(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        description: str,
+        ingredients: str,
+        original_steps: Optional[str],
+        existing_steps: Optional[List[str]] = None,
+        desired_count: int = 10
     ) -> Optional[List[str]]:
         """
         Generate beginner-friendly steps (supports partial/resume generation)
@@ -520,102 +1027,13 @@ class RecipeRegenerationService:
         Returns:
             List of step strings or None if failed
         """
-        try:
-            # Calculate what's needed
-            existing_len = len(existing_steps) if existing_steps else 0
-            missing_count = max(0, desired_count - existing_len)
-            
-            if missing_count == 0:
-                self.tracker.log(
-                    f"Beginner steps already complete ({existing_len}/{desired_count})",
-                    "INFO",
-                    recipe_id,
-                    recipe_name,
-                    operation="steps_text"
-                )
-                return existing_steps
-            
-            # Create prompt with context for partial generation
-            context = ""
-            if existing_steps and len(existing_steps) > 0:
-                context = f"\n\nEXISTING STEPS (already generated):\n" + "\n".join([f"{i+1}. {step}" for i, step in enumerate(existing_steps)])
-                context += f"\n\nGenerate ONLY the next {missing_count} steps, continuing from step {existing_len + 1}. Do not repeat or modify existing steps."
-            
-            prompt = BEGINNER_STEPS_PROMPT.format(
-                recipe_name=recipe_name,
-                description=description,
-                ingredients=ingredients,
-                original_steps=original_steps or "No original steps available"
-            ) + context
-            
-            # Generate with LLM
-            def generate_steps():
-                response = self.get_llm().invoke(prompt)
-                content = response.content if hasattr(response, 'content') else str(response)
-                
-                # Parse JSON response
-                # Remove markdown code blocks if present
-                content = content.strip()
-                if content.startswith("```"):
-                    content = content.split("```")[1]
-                    if content.startswith("json"):
-                        content = content[4:]
-                content = content.strip()
-                
-                new_steps = json.loads(content)
-                if not isinstance(new_steps, list):
-                    raise Exception(f"Expected list of steps, got {type(new_steps)}")
-                
-                # Validate count for partial generation
-                if existing_len > 0:
-                    # For resume, accept the new steps generated
-                    if len(new_steps) < 1 or len(new_steps) > missing_count + 3:
-                        raise Exception(f"Invalid number of new steps: {len(new_steps)}. Expected ~{missing_count}")
-                else:
-                    # For full generation, expect 5-15 steps
-                    if len(new_steps) < 5 or len(new_steps) > 15:
-                        raise Exception(f"Invalid number of steps: {len(new_steps)}. Expected 5-15")
-                
-                return new_steps
-            
-            log_msg = f"Generating beginner steps ({existing_len} existing, {missing_count} needed)"
-            self.tracker.log(
-                log_msg,
-                "INFO",
-                recipe_id,
-                recipe_name,
-                operation="steps_text"
-            )
-            
-            new_steps = self.retry_with_backoff(generate_steps)
-            
-            # Merge with existing
-            final_steps = (existing_steps or []) + new_steps
-            
-            self.tracker.log(
-                f"Successfully generated {len(new_steps)} beginner steps (total: {len(final_steps)})",
-                "SUCCESS",
-                recipe_id,
-                recipe_name,
-                operation="steps_text",
-                metadata={"new_steps": len(new_steps), "total_steps": len(final_steps)}
-            )
-            
-            return final_steps
-            
-        except Exception as e:
-            error_msg = str(e)
-            self.tracker.log(
-                f"Failed to generate beginner steps: {error_msg}",
-                "ERROR",
-                recipe_id,
-                recipe_name,
-                operation="steps_text",
-                error_details={"error": error_msg, "traceback": traceback.format_exc()}
-            )
-            return None
+        return await self._agenerate_steps(
+            "beginner", "BEGINNER_STEPS",
+            recipe_id, recipe_name, description, ingredients, original_steps,
+            existing_steps, desired_count
+        )
     
-    def generate_advanced_steps(
+    async def agenerate_advanced_steps(
         self,
         recipe_id: int,
         recipe_name: str,
@@ -635,6 +1053,73 @@ class RecipeRegenerationService:
         Returns:
             List of step strings or None if failed
         """
+        return await self._agenerate_steps(
+            "advanced", "ADVANCED_STEPS",
+            recipe_id, recipe_name, description, ingredients, original_steps,
+            existing_steps, desired_count
+        )
+    
+    async def agenerate_both_step_texts(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        description: str,
+        ingredients: str,
+        original_steps: Optional[str],
+        existing_beginner: Optional[List[str]] = None,
+        existing_advanced: Optional[List[str]] = None,
+        beginner: bool = True,
+        advanced: bool = True
+    ) -> Tuple[Optional[List[str]], Optional[List[str]]]:
+        """
+        Generate beginner and advanced steps at the same time
+        
+        The two LLM calls are independent, so wall time is the slower of the
+        two rather than their sum. A failure (e.g. a 429) on one side doesn't
+        cancel the other.
+        
+        Args:
+            existing_beginner: Previously generated beginner steps (for resume)
+            existing_advanced: Previously generated advanced steps (for resume)
+            beginner: Generate beginner steps (None is returned in its place if False)
+            advanced: Generate advanced steps (None is returned in its place if False)
+        
+        Returns:
+            Tuple of (beginner_steps, advanced_steps), None for skipped/failed sides
+        """
+        async def skipped():
+            return None
+        
+        results = await asyncio.gather(
+            self.agenerate_beginner_steps(
+                recipe_id, recipe_name, description, ingredients, original_steps,
+                existing_steps=existing_beginner
+            ) if beginner else skipped(),
+            self.agenerate_advanced_steps(
+                recipe_id, recipe_name, description, ingredients, original_steps,
+                existing_steps=existing_advanced
+            ) if advanced else skipped(),
+            return_exceptions=True
+        )
+        beginner_steps, advanced_steps = (
+            None if isinstance(result, BaseException) else result
+            for result in results
+        )
+        return beginner_steps, advanced_steps
+    
+    async def _agenerate_steps(
+        self,
+        level: str,
+        template_id: str,
+        recipe_id: int,
+        recipe_name: str,
+        description: str,
+        ingredients: str,
+        original_steps: Optional[str],
+        existing_steps: Optional[List[str]],
+        desired_count: int
+    ) -> Optional[List[str]]:
+        """Shared body of agenerate_beginner_steps / agenerate_advanced_steps"""
         try:
             # Calculate what's needed
             existing_len = len(existing_steps) if existing_steps else 0
@@ -642,7 +1127,7 @@ class RecipeRegenerationService:
             
             if missing_count == 0:
                 self.tracker.log(
-                    f"Advanced steps already complete ({existing_len}/{desired_count})",
+                    f"{level.capitalize()} steps already complete ({existing_len}/{desired_count})",
                     "INFO",
                     recipe_id,
                     recipe_name,
@@ -656,56 +1141,42 @@ class RecipeRegenerationService:
                 context = f"\n\nEXISTING STEPS (already generated):\n" + "\n".join([f"{i+1}. {step}" for i, step in enumerate(existing_steps)])
                 context += f"\n\nGenerate ONLY the next {missing_count} steps, continuing from step {existing_len + 1}. Do not repeat or modify existing steps."
             
-            prompt = ADVANCED_STEPS_PROMPT.format(
+            prompt = render(
+                template_id,
                 recipe_name=recipe_name,
                 description=description,
                 ingredients=ingredients,
                 original_steps=original_steps or "No original steps available"
             ) + context
             
+            # Resume accepts roughly the missing steps; full generation expects 5-15
+            expected_range = (1, missing_count + 3) if existing_len > 0 else (5, 15)
+            llm = self.get_bounded_llm(STEPS_MAX_OUTPUT_TOKENS)
+            
             # Generate with LLM
-            def generate_steps():
-                response = self.get_llm().invoke(prompt)
+            async def generate_steps():
+                await asyncio.to_thread(self._llm_limiter.acquire)
+                response = await llm.ainvoke(prompt)
                 content = response.content if hasattr(response, 'content') else str(response)
-                
-                # Parse JSON response
-                content = content.strip()
-                if content.startswith("```"):
-                    content = content.split("```")[1]
-                    if content.startswith("json"):
-                        content = content[4:]
-                content = content.strip()
-                
-                new_steps = json.loads(content)
-                if not isinstance(new_steps, list):
-                    raise Exception(f"Expected list of steps, got {type(new_steps)}")
-                
-                # Validate count for partial generation
-                if existing_len > 0:
-                    if len(new_steps) < 1 or len(new_steps) > missing_count + 3:
-                        raise Exception(f"Invalid number of new steps: {len(new_steps)}. Expected ~{missing_count}")
-                else:
-                    if len(new_steps) < 5 or len(new_steps) > 15:
-                        raise Exception(f"Invalid number of steps: {len(new_steps)}. Expected 5-15")
-                
-                return new_steps
+                return _parse_steps_response(content, expected_range)
             
-            log_msg = f"Generating advanced steps ({existing_len} existing, {missing_count} needed)"
+            log_msg = f"Generating {level} steps ({existing_len} existing, {missing_count} needed)"
             self.tracker.log(
                 log_msg,
                 "INFO",
                 recipe_id,
                 recipe_name,
-                operation="steps_text"
+                operation="steps_text",
+                metadata={"max_output_tokens": STEPS_MAX_OUTPUT_TOKENS, "timeout": LLM_TIMEOUT_SECONDS}
             )
             
-            new_steps = self.retry_with_backoff(generate_steps)
+            new_steps = await self.aretry_with_backoff(generate_steps)
             
             # Merge with existing
             final_steps = (existing_steps or []) + new_steps
             
             self.tracker.log(
-                f"Successfully generated {len(new_steps)} advanced steps (total: {len(final_steps)})",
+                f"Successfully generated {len(new_steps)} {level} steps (total: {len(final_steps)})",
                 "SUCCESS",
                 recipe_id,
                 recipe_name,
@@ -718,12 +1189,12 @@ class RecipeRegenerationService:
         except Exception as e:
             error_msg = str(e)
             self.tracker.log(
-                f"Failed to generate advanced steps: {error_msg}",
+                f"Failed to generate {level} steps: {error_msg}",
                 "ERROR",
                 recipe_id,
                 recipe_name,
                 operation="steps_text",
-                error_details={"error": error_msg, "traceback": traceback.format_exc()}
+                error_details=_format_error(e, terminal=True)
             )
             return None
     
@@ -746,7 +1217,8 @@ class RecipeRegenerationService:
         """
         try:
             # Create prompt
-            prompt = INGREDIENT_VALIDATION_PROMPT.format(
+            prompt = render(
+                "INGREDIENT_VALIDATION",
                 recipe_name=recipe_name,
                 cuisine=cuisine,
                 ingredients=current_ingredients
@@ -754,26 +1226,18 @@ class RecipeRegenerationService:
             
             # Validate with LLM
             def validate_ingredients():
-                response = self.get_llm().invoke(prompt)
+                with self._llm_limiter:
+                    response = self.get_bounded_llm(VALIDATION_MAX_OUTPUT_TOKENS).invoke(prompt)
                 content = response.content if hasattr(response, 'content') else str(response)
-                
-                # Parse JSON response
-                content = content.strip()
-                if content.startswith("```"):
-                    content = content.split("```")[1]
-                    if content.startswith("json"):
-                        content = content[4:]
-                content = content.strip()
-                
-                result = json.loads(content)
-                return result
+                return _json_loads(_strip_json_fence(content))
             
             self.tracker.log(
                 f"Validating ingredients",
                 "INFO",
                 recipe_id,
                 recipe_name,
-                operation="ingredients_text"
+                operation="ingredients_text",
+                metadata={"max_output_tokens": VALIDATION_MAX_OUTPUT_TOKENS, "timeout": LLM_TIMEOUT_SECONDS}
             )
             
             validation_result = self.retry_with_backoff(validate_ingredients)
@@ -798,6 +1262,6 @@ class RecipeRegenerationService:
                 recipe_id,
                 recipe_name,
                 operation="ingredients_text",
-                error_details={"error": error_msg, "traceback": traceback.format_exc()}
+                error_details=_format_error(e, terminal=True)
             )
             return None
@@ -0,0 +1,107 @@
+"""
+Recipe Template Cache
+=====================
+Keeps a few recently generated outputs (ingredients, steps) per region,
+indexed by an embedding of the recipe name. When a new recipe is close
+enough to a stored one (e.g. "Chicken Tikka" after "Paneer Tikka"), the
+creation service asks the LLM to adapt the stored output with a short edit
+prompt instead of generating it from scratch.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.85
+DEFAULT_ENTRIES_PER_BUCKET = 8
+
+
+class RecipeTemplateCache:
+    """In-process store of (recipe name embedding -> generated output) per kind and region"""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        entries_per_bucket: int = DEFAULT_ENTRIES_PER_BUCKET
+    ):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a stored entry to be reused
+            entries_per_bucket: Entries kept per (kind, region); oldest are dropped
+        """
+        self.threshold = threshold
+        self.entries_per_bucket = entries_per_bucket
+        self._buckets: Dict[Tuple[str, str], Deque[Tuple[str, np.ndarray, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket_key(kind: str, region: str) -> Tuple[str, str]:
+        return kind, region.strip().lower()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def find(self, kind: str, region: str, vector: List[float]) -> Optional[Tuple[str, Any]]:
+        """
+        Most similar stored entry above the threshold
+
+        Returns:
+            Tuple of (stored recipe name, stored output), or None
+        """
+        query = self._normalize(vector)
+        with self._lock:
+            entries = list(self._buckets.get(self._bucket_key(kind, region), ()))
+
+        best = None
+        best_score = self.threshold
+        for recipe_name, stored, payload in entries:
+            score = float(np.dot(query, stored))
+            if score >= best_score:
+                best, best_score = (recipe_name, payload), score
+        return best
+
+    def add(self, kind: str, region: str, recipe_name: str, vector: List[float], payload: Any):
+        """Store a freshly generated output for later adaptation"""
+        entry = (recipe_name, self._normalize(vector), payload)
+        with self._lock:
+            bucket = self._buckets.setdefault(
+                self._bucket_key(kind, region),
+                deque(maxlen=self.entries_per_bucket)
+            )
+            bucket.append(entry)
+
+
+# Global instance (shared by every RecipeCreationService in the process)
+_template_cache = None
+_template_cache_lock = threading.Lock()
+
+def get_template_cache() -> Optional[RecipeTemplateCache]:
+    """
+    Get or create the template cache, or None if disabled
+
+    Env vars:
+        RECIPE_TEMPLATE_CACHE_ENABLED: "false" disables adaptation (default: enabled)
+        RECIPE_TEMPLATE_SIMILARITY: Cosine similarity needed to adapt (default: 0.85)
+    """
+    global _template_cache
+
+    if os.getenv("RECIPE_TEMPLATE_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+
+    if _template_cache is None:
+        with _template_cache_lock:
+            if _template_cache is None:
+                _template_cache = RecipeTemplateCache(
+                    threshold=float(os.getenv("RECIPE_TEMPLATE_SIMILARITY", DEFAULT_SIMILARITY_THRESHOLD))
+                )
+
+    return _template_cache
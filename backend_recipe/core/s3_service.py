@@ -5,25 +5,138 @@ Handles uploading, downloading, and managing recipe images in S3
 Uses boto3 for AWS operations
 """
 
+import asyncio
 import os
 import base64
+import binascii
+import functools
+import logging
 import re
-from typing import Optional, Tuple
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from collections import deque
 from io import BytesIO
 from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Upload/archive progress goes through logging, not print(): no stdout lock
+# contention between transfer threads, and nothing is formatted when disabled
+logger = logging.getLogger(__name__)
+
 # Try to import boto3, but make it optional for local dev
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig, create_transfer_manager
+    from botocore.config import Config
     from botocore.exceptions import ClientError, NoCredentialsError
+    from s3transfer.subscribers import BaseSubscriber
     BOTO3_AVAILABLE = True
 except ImportError:
     BOTO3_AVAILABLE = False
+    BaseSubscriber = object
     print("⚠️  boto3 not installed. Install with: pip install boto3")
 
+# SIMD base64 (pybase64) when available, stdlib otherwise; both skip
+# non-alphabet characters like b64decode(validate=False)
+try:
+    import pybase64
+    _b64decode = pybase64.b64decode
+    _b64decode_chunk = pybase64.b64decode
+except ImportError:
+    _b64decode = base64.b64decode
+    _b64decode_chunk = binascii.a2b_base64
+
+# Parallel uploads in upload_many (also the part concurrency for large objects)
+S3_UPLOAD_MAX_CONCURRENCY = int(os.getenv("S3_UPLOAD_MAX_CONCURRENCY", "10"))
+
+# Pooled keep-alive connections shared by all threads using the client
+# (botocore's default of 10 makes concurrent uploads queue for a connection)
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+
+# How long a key found missing skips its archive copy. Kept short because
+# other processes (API, workers) may create the object in the meantime
+S3_MISSING_KEY_TTL_SECONDS = 60
+
+# Objects at least this large go up as parallel multipart uploads (S3's minimum part size)
+S3_MULTIPART_THRESHOLD = 5 * 1024 * 1024
+
+# Characters replaced by "_" when sanitizing S3 key parts
+_RECIPE_NAME_RE = re.compile(r'[^a-z0-9]+')
+_EMAIL_RE = re.compile(r'[^a-z0-9_]+')
+_SESSION_ID_RE = re.compile(r'[^a-zA-Z0-9_]+')
+
+# ASCII fast path for recipe names: every byte outside [a-z0-9] becomes a
+# space, so bytes.split() drops the runs (and the ends) in one C pass
+_RECIPE_NAME_TABLE = bytes(
+    c if chr(c) in "abcdefghijklmnopqrstuvwxyz0123456789" else ord(" ")
+    for c in range(256)
+)
+
+# Base64 characters decoded per chunk in decode_b64_stream (multiple of 4)
+B64_DECODE_CHUNK = 64 * 1024
+
+
+def decode_b64_stream(image_base64: str) -> bytearray:
+    """
+    Decode a base64 string chunk by chunk into one preallocated buffer
+    
+    base64.b64decode first copies the whole str into an ASCII bytes object
+    and only then decodes it; decoding 64KB slices keeps just the output
+    buffer alive next to the str. Input with whitespace or without padding
+    is decoded in one piece instead.
+    
+    Raises:
+        binascii.Error: If image_base64 is not valid base64
+    """
+    length = len(image_base64)
+    if length % 4:
+        return bytearray(_b64decode(image_base64))
+    
+    padding = 2 if image_base64.endswith("==") else 1 if image_base64.endswith("=") else 0
+    decoded = bytearray(length // 4 * 3 - padding)
+    written = 0
+    try:
+        with memoryview(decoded) as view:
+            for start in range(0, length, B64_DECODE_CHUNK):
+                chunk = _b64decode_chunk(image_base64[start:start + B64_DECODE_CHUNK])
+                view[written:written + len(chunk)] = chunk
+                written += len(chunk)
+    except (binascii.Error, ValueError):
+        written = -1
+    
+    if written != len(decoded):
+        return bytearray(_b64decode(image_base64))
+    return decoded
+
+
+class _UploadDoneSubscriber(BaseSubscriber):
+    """TransferManager subscriber that reports each successful upload"""
+    
+    def __init__(self, callback: Callable[[str, str], None], s3_key: str, public_url: str):
+        self._callback = callback
+        self._s3_key = s3_key
+        self._public_url = public_url
+    
+    def on_done(self, future, **kwargs):
+        try:
+            future.result()
+        except Exception:
+            return  # Surfaced by upload_many
+        self._callback(self._s3_key, self._public_url)
+
+
+class _DoneEventSubscriber(BaseSubscriber):
+    """TransferManager subscriber that sets an event once an upload and its earlier subscribers are done"""
+    
+    def __init__(self, event: threading.Event):
+        self._event = event
+    
+    def on_done(self, future, **kwargs):
+        self._event.set()
+
 
 class S3Service:
     """
@@ -51,6 +164,14 @@ class S3Service:
         self.bucket_name = os.getenv("AWS_S3_BUCKET_NAME", "oldowan-recipe-images-2025")
         self.base_path = "Curated"
         
+        # Keys this process found missing -> monotonic expiry of that finding
+        # (archive skipped until then, or until this process uploads the key)
+        self._missing_keys: Dict[str, float] = {}
+        
+        # Shared TransferManager (lazy; see _get_transfer_manager)
+        self._transfer_manager = None
+        self._transfer_manager_lock = threading.Lock()
+        
         # Validate credentials
         if not self.aws_access_key or not self.aws_secret_key:
             raise ValueError(
@@ -63,10 +184,15 @@ class S3Service:
             's3',
             aws_access_key_id=self.aws_access_key,
             aws_secret_access_key=self.aws_secret_key,
-            region_name=self.aws_region
+            region_name=self.aws_region,
+            config=Config(
+                max_pool_connections=max(S3_MAX_POOL_CONNECTIONS, S3_UPLOAD_MAX_CONCURRENCY),
+                tcp_keepalive=True,
+                retries={'max_attempts': 3, 'mode': 'standard'}
+            )
         )
         
-        print(f"✅ S3 Service initialized - Bucket: {self.bucket_name}, Region: {self.aws_region}")
+        logger.info("S3 Service initialized - Bucket: %s, Region: %s", self.bucket_name, self.aws_region)
     
     # ========================================================================
     # Main Upload Methods
@@ -76,8 +202,9 @@ class S3Service:
         self,
         recipe_id: int,
         recipe_name: str,
-        image_base64: str,
-        archive_existing: bool = True
+        image_base64: Optional[str] = None,
+        archive_existing: bool = True,
+        image_bytes: Optional[bytes] = None
     ) -> str:
         """
         Upload main recipe cover image to S3
@@ -87,6 +214,7 @@ class S3Service:
             recipe_name: Recipe name (will be sanitized)
             image_base64: Base64 encoded image string
             archive_existing: If True, move existing image to archive/ folder
+            image_bytes: Raw image bytes (skips the base64 decode; use instead of image_base64)
             
         Returns:
             Public S3 URL of uploaded image
@@ -94,27 +222,25 @@ class S3Service:
         Raises:
             Exception: If upload fails
         """
-        # Generate S3 key
-        sanitized_name = self._sanitize_recipe_name(recipe_name)
-        folder_name = f"{sanitized_name}_{recipe_id}"
-        s3_key = f"{self.base_path}/{folder_name}/{sanitized_name}_main.jpg"
+        s3_key = self.main_image_key(recipe_id, recipe_name)
         
         # Archive existing image if requested
         if archive_existing:
             self._archive_existing_image(s3_key)
         
         # Upload to S3
-        public_url = self._upload_base64_to_s3(image_base64, s3_key)
+        public_url = self._upload_image(s3_key, image_base64, image_bytes)
         
-        print(f"   ✅ Uploaded main image: {public_url}")
+        logger.info("Uploaded main image: %s", public_url)
         return public_url
     
     def upload_recipe_ingredients_image(
         self,
         recipe_id: int,
         recipe_name: str,
-        image_base64: str,
-        archive_existing: bool = True
+        image_base64: Optional[str] = None,
+        archive_existing: bool = True,
+        image_bytes: Optional[bytes] = None
     ) -> str:
         """
         Upload ingredients image to S3
@@ -124,23 +250,21 @@ class S3Service:
             recipe_name: Recipe name (will be sanitized)
             image_base64: Base64 encoded image string
             archive_existing: If True, move existing image to archive/ folder
+            image_bytes: Raw image bytes (skips the base64 decode; use instead of image_base64)
             
         Returns:
             Public S3 URL of uploaded image
         """
-        # Generate S3 key
-        sanitized_name = self._sanitize_recipe_name(recipe_name)
-        folder_name = f"{sanitized_name}_{recipe_id}"
-        s3_key = f"{self.base_path}/{folder_name}/{sanitized_name}_ingredients.jpg"
+        s3_key = self.ingredients_image_key(recipe_id, recipe_name)
         
         # Archive existing image if requested
         if archive_existing:
             self._archive_existing_image(s3_key)
         
         # Upload to S3
-        public_url = self._upload_base64_to_s3(image_base64, s3_key)
+        public_url = self._upload_image(s3_key, image_base64, image_bytes)
         
-        print(f"   ✅ Uploaded ingredients image: {public_url}")
+        logger.info("Uploaded ingredients image: %s", public_url)
         return public_url
     
     def upload_recipe_step_image(
@@ -148,9 +272,10 @@ class S3Service:
         recipe_id: int,
         recipe_name: str,
         step_index: int,
-        image_base64: str,
+        image_base64: Optional[str] = None,
         archive_existing: bool = True,
-        step_type: str = "original"
+        step_type: str = "original",
+        image_bytes: Optional[bytes] = None
     ) -> str:
         """
         Upload step image to S3 with support for beginner/advanced variants
@@ -162,31 +287,218 @@ class S3Service:
             image_base64: Base64 encoded image string
             archive_existing: If True, move existing image to archive/ folder
             step_type: Type of step image - 'original', 'beginner', or 'advanced'
+            image_bytes: Raw image bytes (skips the base64 decode; use instead of image_base64)
             
         Returns:
             Public S3 URL of uploaded image
         """
-        # Generate S3 key based on step_type
+        s3_key = self.step_image_key(recipe_id, recipe_name, step_index, step_type)
+        
+        # Archive existing image if requested
+        if archive_existing:
+            self._archive_existing_image(s3_key)
+        
+        # Upload to S3
+        public_url = self._upload_image(s3_key, image_base64, image_bytes)
+        
+        logger.info("Uploaded step %s (%s) image: %s", step_index, step_type, public_url)
+        return public_url
+    
+    def main_image_key(self, recipe_id: int, recipe_name: str) -> str:
+        """S3 key for a recipe's main cover image"""
+        sanitized_name = self._sanitize_recipe_name(recipe_name)
+        return f"{self.base_path}/{sanitized_name}_{recipe_id}/{sanitized_name}_main.jpg"
+    
+    def ingredients_image_key(self, recipe_id: int, recipe_name: str) -> str:
+        """S3 key for a recipe's ingredients image"""
+        sanitized_name = self._sanitize_recipe_name(recipe_name)
+        return f"{self.base_path}/{sanitized_name}_{recipe_id}/{sanitized_name}_ingredients.jpg"
+    
+    def step_image_key(self, recipe_id: int, recipe_name: str, step_index: int, step_type: str = "original") -> str:
+        """
+        S3 key for a step image
+        
+        Args:
+            recipe_id: Recipe ID
+            recipe_name: Recipe name (will be sanitized)
+            step_index: Step number (1-based)
+            step_type: Type of step image - 'original', 'beginner', or 'advanced'
+        """
         sanitized_name = self._sanitize_recipe_name(recipe_name)
         folder_name = f"{sanitized_name}_{recipe_id}"
         
         if step_type == "beginner":
-            s3_key = f"{self.base_path}/{folder_name}/steps_beginner/step_{step_index}.jpg"
+            return f"{self.base_path}/{folder_name}/steps_beginner/step_{step_index}.jpg"
         elif step_type == "advanced":
-            s3_key = f"{self.base_path}/{folder_name}/steps_advanced/step_{step_index}.jpg"
+            return f"{self.base_path}/{folder_name}/steps_advanced/step_{step_index}.jpg"
         else:  # original or default
-            s3_key = f"{self.base_path}/{folder_name}/{sanitized_name}_step{step_index}.jpg"
+            return f"{self.base_path}/{folder_name}/{sanitized_name}_step{step_index}.jpg"
+    
+    def upload_many(
+        self,
+        items: Iterable[Tuple[str, bytes]],
+        on_uploaded: Optional[Callable[[str, str], None]] = None,
+        archive_existing: bool = True,
+        existing_keys: Optional[Set[str]] = None
+    ) -> List[str]:
+        """
+        Upload several images concurrently through the shared S3 TransferManager
         
-        # Archive existing image if requested
-        if archive_existing:
-            self._archive_existing_image(s3_key)
+        Items are submitted as they are pulled from the iterable, so a
+        generator that yields images as they are produced overlaps the
+        uploads with whatever produces them. Concurrent calls share the
+        manager's worker threads and pooled connections.
         
-        # Upload to S3
-        public_url = self._upload_base64_to_s3(image_base64, s3_key)
+        Args:
+            items: (s3_key, image_bytes) pairs
+            on_uploaded: Called with (s3_key, public_url) as each upload finishes
+                (runs on a transfer thread)
+            archive_existing: If True, move existing images to archive/ folders
+            existing_keys: Keys known to exist (e.g. from list_recipe_keys); when
+                given, other keys are treated as new and skip the archive copy
+            
+        Returns:
+            Public S3 URLs, in the order the items were produced
+            
+        Raises:
+            Exception: If any upload fails (after the others have finished)
+        """
+        manager = self._get_transfer_manager()
+        uploads = []
         
-        step_type_label = f" ({step_type})" if step_type != "original" else ""
-        print(f"   ✅ Uploaded step {step_index}{step_type_label} image: {public_url}")
-        return public_url
+        try:
+            for s3_key, image_bytes in items:
+                if archive_existing and (existing_keys is None or s3_key in existing_keys):
+                    self._archive_existing_image(s3_key)
+                
+                public_url = self._public_url(s3_key)
+                subscribers = [_UploadDoneSubscriber(self._mark_uploaded, s3_key, public_url)]
+                if on_uploaded:
+                    subscribers.append(_UploadDoneSubscriber(on_uploaded, s3_key, public_url))
+                # Last, so waiting on it also waits for the callbacks above
+                done = threading.Event()
+                subscribers.append(_DoneEventSubscriber(done))
+                future = manager.upload(
+                    BytesIO(image_bytes),
+                    self.bucket_name,
+                    s3_key,
+                    extra_args={'ContentType': 'image/jpeg'},
+                    subscribers=subscribers
+                )
+                uploads.append((public_url, future, done))
+        finally:
+            # Let uploads already in flight finish (with their on_uploaded
+            # callbacks), even if producing items failed
+            for _, _, done in uploads:
+                done.wait()
+        
+        public_urls = []
+        for public_url, future, _ in uploads:
+            try:
+                future.result()
+            except NoCredentialsError:
+                raise Exception("AWS credentials not found or invalid")
+            except ClientError as e:
+                raise Exception(f"S3 upload failed: {e}")
+            public_urls.append(public_url)
+        
+        logger.info("Uploaded %d images", len(public_urls))
+        return public_urls
+    
+    def upload_recipe_images_batch(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        main_image: Optional[Union[bytes, str]] = None,
+        ingredients_image: Optional[Union[bytes, str]] = None,
+        step_images: Optional[List[Union[bytes, str]]] = None,
+        step_type: str = "original",
+        archive_existing: bool = True
+    ) -> Dict[str, object]:
+        """
+        Upload a recipe's main, ingredients and step images concurrently
+        
+        Same keys as the upload_recipe_* methods, but all images go out
+        together through upload_many instead of one PUT after another.
+        
+        Args:
+            recipe_id: Recipe ID
+            recipe_name: Recipe name (will be sanitized)
+            main_image: Main image as raw bytes or a base64 string (skipped if None)
+            ingredients_image: Ingredients image as raw bytes or a base64 string (skipped if None)
+            step_images: Step images in step order (step 1 first) as raw bytes or base64 strings
+            step_type: Type of step images - 'original', 'beginner', or 'advanced'
+            archive_existing: If True, move existing images to archive/ folders
+            
+        Returns:
+            Dict with "main" and "ingredients" URLs (None if not uploaded) and
+            "steps", the step image URLs in step order
+        """
+        main_key = self.main_image_key(recipe_id, recipe_name)
+        ingredients_key = self.ingredients_image_key(recipe_id, recipe_name)
+        items = []
+        if main_image is not None:
+            items.append((main_key, main_image))
+        if ingredients_image is not None:
+            items.append((ingredients_key, ingredients_image))
+        step_keys = [
+            self.step_image_key(recipe_id, recipe_name, step_num, step_type)
+            for step_num in range(1, len(step_images or []) + 1)
+        ]
+        items.extend(zip(step_keys, step_images or []))
+        
+        existing_keys = self.list_recipe_keys(recipe_id, recipe_name) if archive_existing and items else None
+        keys = [s3_key for s3_key, _ in items]
+        pending = deque(items)
+        del items
+        
+        def decoded_items():
+            # Pop each payload as it is decoded, so this batch holds no reference
+            # to a base64 string once its bytes exist
+            while pending:
+                s3_key, image = pending.popleft()
+                yield s3_key, self._image_bytes(image)
+        
+        urls = dict(zip(
+            keys,
+            self.upload_many(
+                decoded_items(),
+                archive_existing=archive_existing,
+                existing_keys=existing_keys
+            )
+        ))
+        return {
+            "main": urls.get(main_key),
+            "ingredients": urls.get(ingredients_key),
+            "steps": [urls[s3_key] for s3_key in step_keys]
+        }
+    
+    # ========================================================================
+    # Async Upload Methods
+    # ========================================================================
+    
+    async def upload_recipe_main_image_async(self, recipe_id: int, recipe_name: str, **kwargs) -> str:
+        """Async variant of upload_recipe_main_image (does not block the event loop)"""
+        return await asyncio.to_thread(self.upload_recipe_main_image, recipe_id, recipe_name, **kwargs)
+    
+    async def upload_recipe_ingredients_image_async(self, recipe_id: int, recipe_name: str, **kwargs) -> str:
+        """Async variant of upload_recipe_ingredients_image (does not block the event loop)"""
+        return await asyncio.to_thread(self.upload_recipe_ingredients_image, recipe_id, recipe_name, **kwargs)
+    
+    async def upload_recipe_step_image_async(
+        self,
+        recipe_id: int,
+        recipe_name: str,
+        step_index: int,
+        **kwargs
+    ) -> str:
+        """
+        Async variant of upload_recipe_step_image (does not block the event loop)
+        
+        The PUT runs on a worker thread over the shared, pooled boto3 client,
+        so several of these can be awaited together with asyncio.gather.
+        """
+        return await asyncio.to_thread(self.upload_recipe_step_image, recipe_id, recipe_name, step_index, **kwargs)
     
     # ========================================================================
     # User-Generated Image Methods
@@ -198,7 +510,8 @@ class S3Service:
         session_id: str,
         dish_name: str,
         step_index: int,
-        image_base64: str
+        image_base64: Optional[str] = None,
+        image_bytes: Optional[bytes] = None
     ) -> str:
         """
         Upload user-generated step image to S3
@@ -211,6 +524,7 @@ class S3Service:
             dish_name: Name of the dish/recipe
             step_index: Step number (1-based)
             image_base64: Base64 encoded image string
+            image_bytes: Raw image bytes (skips the base64 decode; use instead of image_base64)
             
         Returns:
             Public S3 URL of uploaded image
@@ -224,14 +538,16 @@ class S3Service:
         s3_key = f"user_generated/{sanitized_email}/{sanitized_session}/{sanitized_dish}_step_{step_index}.jpg"
         
         # Upload to S3 (no archiving for user-generated images)
-        public_url = self._upload_base64_to_s3(image_base64, s3_key)
+        public_url = self._upload_image(s3_key, image_base64, image_bytes)
         
-        print(f"   ✅ Uploaded user-generated step {step_index} image: {public_url}")
+        logger.info("Uploaded user-generated step %s image: %s", step_index, public_url)
         return public_url
     
-    def _sanitize_email(self, email: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _sanitize_email(email: str) -> str:
         """
-        Sanitize email address for use in S3 keys
+        Sanitize email address for use in S3 keys (memoized; pure)
         
         Args:
             email: Email address
@@ -244,7 +560,7 @@ class S3Service:
         
         # Replace @ with _at_ and other special chars with underscores
         sanitized = sanitized.replace('@', '_at_')
-        sanitized = re.sub(r'[^a-z0-9_]+', '_', sanitized)
+        sanitized = _EMAIL_RE.sub('_', sanitized)
         
         # Remove leading/trailing underscores
         sanitized = sanitized.strip('_')
@@ -255,9 +571,11 @@ class S3Service:
         
         return sanitized
     
-    def _sanitize_session_id(self, session_id: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _sanitize_session_id(session_id: str) -> str:
         """
-        Sanitize session ID for use in S3 keys
+        Sanitize session ID for use in S3 keys (memoized; pure)
         
         Args:
             session_id: Session identifier
@@ -266,7 +584,7 @@ class S3Service:
             Sanitized session ID
         """
         # Remove any special characters, keep alphanumeric and underscores
-        sanitized = re.sub(r'[^a-zA-Z0-9_]+', '_', session_id)
+        sanitized = _SESSION_ID_RE.sub('_', session_id)
         
         # Remove leading/trailing underscores
         sanitized = sanitized.strip('_')
@@ -281,6 +599,26 @@ class S3Service:
     # Helper Methods
     # ========================================================================
     
+    def _upload_image(self, s3_key: str, image_base64: Optional[str], image_bytes: Optional[bytes]) -> str:
+        """Upload raw bytes when given, otherwise decode image_base64 once"""
+        if image_bytes is not None:
+            return self._upload_bytes_to_s3(image_bytes, s3_key)
+        if image_base64 is None:
+            raise ValueError("image_base64 or image_bytes is required")
+        return self._upload_base64_to_s3(image_base64, s3_key)
+    
+    def _image_bytes(self, image: Union[bytes, str]) -> bytes:
+        """Raw image bytes from raw bytes or a base64 string (a data: URI prefix is dropped)"""
+        if isinstance(image, str):
+            if image.startswith("data:"):
+                # "data:image/jpeg;base64,<payload>": only the short prefix is scanned
+                image = image.partition(",")[2]
+            try:
+                return decode_b64_stream(image)
+            except Exception as e:
+                raise Exception(f"Image upload error: {e}")
+        return image
+    
     def _upload_base64_to_s3(self, image_base64: str, s3_key: str) -> str:
         """
         Upload base64 encoded image to S3
@@ -292,20 +630,40 @@ class S3Service:
         Returns:
             Public S3 URL
         """
-        try:
-            # Decode base64 to bytes
-            image_bytes = base64.b64decode(image_base64)
+        return self._upload_bytes_to_s3(self._image_bytes(image_base64), s3_key)
+    
+    def _upload_bytes_to_s3(self, image_bytes: bytes, s3_key: str) -> str:
+        """
+        Upload raw image bytes to S3
+        
+        Args:
+            image_bytes: Image file contents
+            s3_key: Full S3 key path
             
+        Returns:
+            Public S3 URL
+        """
+        try:
             # Upload to S3 (without ACL - bucket should be configured for public read)
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=image_bytes,
-                ContentType='image/jpeg'
-            )
+            if len(image_bytes) >= S3_MULTIPART_THRESHOLD:
+                # Streamed from the buffer in parallel parts
+                self._get_transfer_manager().upload(
+                    BytesIO(image_bytes),
+                    self.bucket_name,
+                    s3_key,
+                    extra_args={'ContentType': 'image/jpeg'}
+                ).result()
+            else:
+                # One request; no need to hop to a transfer thread
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Body=image_bytes,
+                    ContentType='image/jpeg'
+                )
             
-            # Generate public URL
-            public_url = f"https://{self.bucket_name}.s3.{self.aws_region}.amazonaws.com/{s3_key}"
+            public_url = self._public_url(s3_key)
+            self._mark_uploaded(s3_key, public_url)
             return public_url
             
         except NoCredentialsError:
@@ -315,20 +673,51 @@ class S3Service:
         except Exception as e:
             raise Exception(f"Image upload error: {e}")
     
+    def _get_transfer_manager(self):
+        """TransferManager shared by every upload (threads and connections stay warm)"""
+        if self._transfer_manager is None:
+            with self._transfer_manager_lock:
+                if self._transfer_manager is None:
+                    self._transfer_manager = create_transfer_manager(self.s3_client, self._transfer_config())
+        return self._transfer_manager
+    
+    def _transfer_config(self) -> "TransferConfig":
+        """Transfer settings for multipart / concurrent uploads"""
+        return TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            max_concurrency=S3_UPLOAD_MAX_CONCURRENCY,
+            use_threads=True
+        )
+    
+    def _public_url(self, s3_key: str) -> str:
+        """Public URL for an S3 key (bucket is configured for public read)"""
+        return f"https://{self.bucket_name}.s3.{self.aws_region}.amazonaws.com/{s3_key}"
+    
+    def _mark_uploaded(self, s3_key: str, public_url: Optional[str] = None):
+        """Forget that s3_key was missing (it exists now, so the next upload archives it)"""
+        self._missing_keys.pop(s3_key, None)
+    
     def _archive_existing_image(self, s3_key: str) -> bool:
         """
         Move existing image to archive/ folder with timestamp
         
+        Keys found missing by this process within the last
+        S3_MISSING_KEY_TTL_SECONDS are skipped without a request (e.g. when
+        an upload is retried after a failure).
+        
         Args:
             s3_key: S3 key of existing image
             
         Returns:
             True if archived, False if image doesn't exist
         """
+        expires_at = self._missing_keys.get(s3_key)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                return False
+            self._missing_keys.pop(s3_key, None)
+        
         try:
-            # Check if image exists
-            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
-            
             # Generate archive key with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             path_parts = s3_key.rsplit('/', 1)
@@ -337,27 +726,30 @@ class S3Service:
             filename_without_ext = filename.rsplit('.', 1)[0]
             archive_key = f"{folder}/archive/{filename_without_ext}_{timestamp}.jpg"
             
-            # Copy to archive
+            # Copy to archive (no HEAD first: a missing source fails the copy with 404)
             self.s3_client.copy_object(
                 Bucket=self.bucket_name,
                 CopySource={'Bucket': self.bucket_name, 'Key': s3_key},
                 Key=archive_key
             )
             
-            print(f"   📦 Archived existing image to: {archive_key}")
+            logger.info("Archived existing image to: %s", archive_key)
             return True
             
         except ClientError as e:
-            if e.response['Error']['Code'] == '404':
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
                 # Image doesn't exist, no need to archive
+                self._missing_keys[s3_key] = time.monotonic() + S3_MISSING_KEY_TTL_SECONDS
                 return False
             else:
-                print(f"   ⚠️  Archive warning: {e}")
+                logger.warning("Archive warning: %s", e)
                 return False
     
-    def _sanitize_recipe_name(self, recipe_name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _sanitize_recipe_name(recipe_name: str) -> str:
         """
-        Sanitize recipe name for use in S3 keys
+        Sanitize recipe name for use in S3 keys (memoized; every key of a recipe needs it)
         
         Args:
             recipe_name: Original recipe name
@@ -368,11 +760,15 @@ class S3Service:
         # Convert to lowercase
         name = recipe_name.lower()
         
-        # Replace spaces and special chars with underscores
-        name = re.sub(r'[^a-z0-9]+', '_', name)
-        
-        # Remove leading/trailing underscores
-        name = name.strip('_')
+        if name.isascii():
+            # Same result as the regex path below, without the regex engine
+            name = b"_".join(name.encode("ascii").translate(_RECIPE_NAME_TABLE).split()).decode("ascii")
+        else:
+            # Replace spaces and special chars with underscores
+            name = _RECIPE_NAME_RE.sub('_', name)
+            
+            # Remove leading/trailing underscores
+            name = name.strip('_')
         
         # Limit length to 50 characters
         if len(name) > 50:
@@ -380,6 +776,28 @@ class S3Service:
         
         return name
     
+    def list_recipe_keys(self, recipe_id: int, recipe_name: str) -> Optional[Set[str]]:
+        """
+        Every key under a recipe's folder, from ListObjectsV2
+        
+        One (paginated) listing answers "does this image exist?" for all of a
+        recipe's images, instead of a request per key.
+        
+        Returns:
+            Set of S3 keys, or None if the bucket can't be listed
+        """
+        sanitized_name = self._sanitize_recipe_name(recipe_name)
+        prefix = f"{self.base_path}/{sanitized_name}_{recipe_id}/"
+        keys = set()
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+                keys.update(obj['Key'] for obj in page.get('Contents', []))
+        except ClientError as e:
+            logger.warning("Could not list %s: %s", prefix, e)
+            return None
+        return keys
+    
     def check_image_exists(self, s3_key: str) -> bool:
         """
         Check if an image exists in S3
@@ -408,10 +826,10 @@ class S3Service:
         """
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
-            print(f"   🗑️  Deleted: {s3_key}")
+            logger.info("Deleted: %s", s3_key)
             return True
         except ClientError as e:
-            print(f"   ❌ Delete failed: {e}")
+            logger.error("Delete failed: %s", e)
             return False
     
     def get_public_url(self, recipe_id: int, recipe_name: str, image_type: str = "main", step_index: int = None) -> str:
@@ -447,10 +865,13 @@ class S3Service:
 # ============================================================================
 
 _s3_service_instance = None
+_s3_service_lock = threading.Lock()
 
 def get_s3_service() -> S3Service:
-    """Get or create singleton S3 service instance"""
+    """Get or create singleton S3 service instance (safe to call from several threads)"""
     global _s3_service_instance
     if _s3_service_instance is None:
-        _s3_service_instance = S3Service()
+        with _s3_service_lock:
+            if _s3_service_instance is None:
+                _s3_service_instance = S3Service()
     return _s3_service_instance
@@ -13,6 +13,46 @@ from typing import List, Optional, Dict, Tuple
 from core.cumulative_state import CumulativeRecipeState
 
 
+# Constant parts of the cumulative-state step prompt (around the negative prompt)
+_CUMULATIVE_MID = "\n\nIMPORTANT CONSTRAINTS:\n"
+
+_CUMULATIVE_SUFFIX = (
+    "\n\n"
+    "CRITICAL REQUIREMENTS (STRICTLY ENFORCE):\n"
+    "1. IMAGE SIZE & ORIENTATION: MUST be HORIZONTAL format, aspect ratio 1024x680 pixels (landscape orientation)\n"
+    "2. NO TEXT RULE: ABSOLUTELY NO text, step numbers, labels, captions, watermarks, or any written elements\n"
+    "3. Show the cooking action clearly and unambiguously\n"
+    "4. Professional food photography style with warm lighting\n"
+    "5. Output: Horizontal landscape image (1024x680), completely text-free."
+)
+
+# Constant parts of the plain (non-cumulative) step prompt, built once at import;
+# only the recipe name and step text vary
+_FALLBACK_PREFIX = "Generate a clear instructional cooking photo for "
+
+_FALLBACK_MID = ".\n\nStep: "
+
+_FALLBACK_SUFFIX = """
+
+CRITICAL REQUIREMENTS (STRICTLY ENFORCE):
+1. IMAGE SIZE & ORIENTATION: MUST be HORIZONTAL format, aspect ratio 1024x680 pixels (landscape orientation)
+2. NO TEXT RULE: ABSOLUTELY NO text, step numbers, labels, captions, watermarks, or any written elements
+3. INSTRUCTIONAL CLARITY: Show the cooking action clearly and unambiguously
+
+The image should:
+- Clearly demonstrate the action described in the step
+- Show hands/tools performing the action in a natural way
+- Use good lighting to show details clearly
+- Have an instructional, how-to photography style
+- Be shot from an angle that shows the process clearly
+- Include relevant ingredients/tools in frame
+- Frame composition should be HORIZONTAL (wider than tall)
+
+STRICTLY FORBIDDEN: Any text, step numbers, labels, ingredient names, measurements, captions, UI elements, overlays, watermarks, or written elements of any kind.
+
+Output: Horizontal landscape image (1024x680), instructional photography style, clear and practical, completely text-free."""
+
+
 class StepImagePromptGenerator:
     """
     Centralized generator for step image prompts
@@ -31,6 +71,9 @@ class StepImagePromptGenerator:
         self.recipe_name = recipe_name
         self.ingredients = ingredients or []
         
+        # Plain prompt up to the step text (fixed for this recipe)
+        self._fallback_head = _FALLBACK_PREFIX + recipe_name + _FALLBACK_MID
+        
         # Lazy load LLM if not provided
         if llm is None:
             from config import llm as config_llm
@@ -71,45 +114,24 @@ class StepImagePromptGenerator:
             # Format for Gemini (concatenate positive and negative)
             # Note: Gemini doesn't have separate negative prompt field,
             # so we include it in the main prompt
-            prompt = (
-                f"{prompt_data['positive']}\n\n"
-                f"IMPORTANT CONSTRAINTS:\n{prompt_data['negative']}\n\n"
-                f"CRITICAL REQUIREMENTS (STRICTLY ENFORCE):\n"
-                f"1. IMAGE SIZE & ORIENTATION: MUST be HORIZONTAL format, aspect ratio 1024x680 pixels (landscape orientation)\n"
-                f"2. NO TEXT RULE: ABSOLUTELY NO text, step numbers, labels, captions, watermarks, or any written elements\n"
-                f"3. Show the cooking action clearly and unambiguously\n"
-                f"4. Professional food photography style with warm lighting\n"
-                f"5. Output: Horizontal landscape image (1024x680), completely text-free."
-            )
+            prompt = f"{prompt_data['positive']}{_CUMULATIVE_MID}{prompt_data['negative']}{_CUMULATIVE_SUFFIX}"
             
             metadata = prompt_data.get("metadata", {})
             return prompt, metadata
         else:
             # Fallback to simple prompt (for backward compatibility)
-            prompt = f"""Generate a clear instructional cooking photo for {self.recipe_name}.
-
-Step: {step_description}
-
-CRITICAL REQUIREMENTS (STRICTLY ENFORCE):
-1. IMAGE SIZE & ORIENTATION: MUST be HORIZONTAL format, aspect ratio 1024x680 pixels (landscape orientation)
-2. NO TEXT RULE: ABSOLUTELY NO text, step numbers, labels, captions, watermarks, or any written elements
-3. INSTRUCTIONAL CLARITY: Show the cooking action clearly and unambiguously
-
-The image should:
-- Clearly demonstrate the action described in the step
-- Show hands/tools performing the action in a natural way
-- Use good lighting to show details clearly
-- Have an instructional, how-to photography style
-- Be shot from an angle that shows the process clearly
-- Include relevant ingredients/tools in frame
-- Frame composition should be HORIZONTAL (wider than tall)
-
-STRICTLY FORBIDDEN: Any text, step numbers, labels, ingredient names, measurements, captions, UI elements, overlays, watermarks, or written elements of any kind.
-
-Output: Horizontal landscape image (1024x680), instructional photography style, clear and practical, completely text-free."""
+            prompt = self._fallback_head + step_description + _FALLBACK_SUFFIX
             
             return prompt, {"fallback": True, "step_index": step_index}
     
+    def state_snapshot(self) -> Dict:
+        """Serializable cumulative state after the steps prompted so far (see restore_state)"""
+        return self.cumulative_state.snapshot()
+    
+    def restore_state(self, snapshot: Dict):
+        """Resume cumulative state from state_snapshot() instead of replaying earlier steps"""
+        self.cumulative_state.restore(snapshot)
+    
     def reset(self):
         """Reset cumulative state (useful when starting a new recipe)"""
         self.cumulative_state.reset()
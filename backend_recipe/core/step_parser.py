@@ -5,12 +5,59 @@ Converts free-text recipe steps into structured StepAction objects
 
 import re
 import json
+import asyncio
+import functools
+import threading
 from typing import List, Dict, Tuple, Optional
 from langchain.chains import LLMChain
 from langchain_core.prompts import PromptTemplate
 
 from .visual_state_models import StepAction
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+def _is_word_char(char: str) -> bool:
+    """True for characters that \\w matches (an empty string is a non-word edge)"""
+    return bool(char) and (char.isalnum() or char == "_")
+
+
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    """One alternation regex matching any keyword as a plain substring"""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# Pan states in priority order, each a regex alternation over its cues
+_PAN_STATE_PATTERNS = [
+    (state, re.compile("|".join(patterns)))
+    for state, patterns in {
+        "oil shimmering": ["oil.*hot", "oil.*shimmer", "heat.*oil"],
+        "ingredients browning": ["brown", "golden", "carameliz"],
+        "sauce thickening": ["thick", "reduce", "coating"],
+        "mixture simmering": ["simmer", "bubble", "gentle boil"],
+        "dry roasting": ["dry roast", "no oil", "without oil"]
+    }.items()
+]
+
+_REMOVAL_RE = _keyword_re(["remove", "take out", "drain", "discard"])
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Text right before / after an ingredient that marks it as being added
+_ADD_CONTEXT_RE = re.compile(r"(?:add(?: the)?|put|pour|place|throw in|mix in|stir in) $")
+_ADD_FOLLOW_RE = re.compile(r" and|,")
+_ADD_CONTEXT_WINDOW = len("throw in ")
+
+# Parsed steps shared by every parser in the process, keyed by
+# (normalized step text, sorted ingredients); oldest entries are dropped first
+PARSE_CACHE_SIZE = 4096
+_parse_cache: Dict[Tuple[str, Tuple[str, ...]], StepAction] = {}
+_parse_cache_lock = threading.Lock()
+
 
 class DeterministicStepParser:
     """Parse recipe steps into structured actions with high confidence"""
@@ -36,6 +83,14 @@ class DeterministicStepParser:
         "melting": ["melted", "melting"]
     }
     
+    # Compiled once per category; checked in dict order so the first category wins
+    _ACTION_PATTERNS = [
+        (action, _keyword_re(keywords)) for action, keywords in COOKING_ACTIONS.items()
+    ]
+    _STATE_PATTERNS = [
+        (state, _keyword_re(indicators)) for state, indicators in STATE_INDICATORS.items()
+    ]
+    
     def __init__(self, llm, all_ingredients: List[str]):
         """
         Initialize parser with LLM and known ingredients
@@ -46,18 +101,65 @@ class DeterministicStepParser:
         """
         self.llm = llm
         self.all_ingredients = [ing.lower() for ing in all_ingredients]
-        self.ingredient_patterns = self._build_ingredient_patterns()
+        self._ingredients_key = tuple(sorted(self.all_ingredients))
+        # Shared by every parser built for the same ingredient list
+        self.ingredient_patterns = self._build_ingredient_patterns(self._ingredients_key)
+        self._aho = self._build_ingredient_automaton(self._ingredients_key)
     
-    def _build_ingredient_patterns(self) -> List[Tuple[str, re.Pattern]]:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _build_ingredient_patterns(ingredients: Tuple[str, ...]) -> Tuple[Tuple[str, re.Pattern], ...]:
         """Build regex patterns for ingredient detection"""
         patterns = []
-        for ingredient in self.all_ingredients:
+        for ingredient in ingredients:
             # Create pattern that matches ingredient with word boundaries
             # Handle multi-word ingredients
             escaped = re.escape(ingredient)
             pattern = re.compile(r'\b' + escaped + r'\b', re.IGNORECASE)
             patterns.append((ingredient, pattern))
-        return sorted(patterns, key=lambda x: len(x[0]), reverse=True)  # Longest first
+        return tuple(sorted(patterns, key=lambda x: len(x[0]), reverse=True))  # Longest first
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _build_ingredient_automaton(ingredients: Tuple[str, ...]):
+        """Build one Aho-Corasick automaton over all ingredients (None without pyahocorasick)"""
+        if not AHOCORASICK_AVAILABLE or not ingredients:
+            return None
+        automaton = ahocorasick.Automaton()
+        for ingredient in filter(None, ingredients):
+            automaton.add_word(ingredient, (len(ingredient), ingredient))
+        automaton.make_automaton()
+        return automaton
+    
+    def _find_ingredients(self, step_text: str, step_lower: str) -> List[str]:
+        """
+        Ingredients mentioned in a step as whole words, longest first
+        
+        Args:
+            step_text: The recipe step text
+            step_lower: The same text lowercased
+            
+        Returns:
+            Matching ingredients in ingredient_patterns order
+        """
+        if self._aho is None:
+            return [
+                ingredient for ingredient, pattern in self.ingredient_patterns
+                if pattern.search(step_text)
+            ]
+        
+        # One linear pass finds every ingredient; edges mirror the regex \b checks
+        hits = set()
+        for end, (length, ingredient) in self._aho.iter(step_lower):
+            start = end - length + 1
+            if (
+                _is_word_char(step_lower[start - 1:start]) != _is_word_char(ingredient[0])
+                and _is_word_char(step_lower[end + 1:end + 2]) != _is_word_char(ingredient[-1])
+            ):
+                hits.add(ingredient)
+        if not hits:
+            return []
+        return [ingredient for ingredient, _ in self.ingredient_patterns if ingredient in hits]
     
     def parse_step(self, step_text: str, step_number: int) -> StepAction:
         """
@@ -70,23 +172,145 @@ class DeterministicStepParser:
         Returns:
             StepAction object with parsed information
         """
+        cache_key = self._cache_key(step_text)
+        cached = self._cached_parse(cache_key, step_text, step_number)
+        if cached is not None:
+            return cached
+        
         # Try rule-based parsing first
         action = self._rule_based_parse(step_text, step_number)
         
         # If confidence is low, enhance with LLM
         if action.confidence < 0.7:
+            initial = action
             action = self._llm_enhanced_parse(step_text, step_number, action)
+            if action is initial:
+                return action  # LLM failed; retry on the next occurrence
         
+        self._store_parse(cache_key, action)
         return action
     
+    def parse_steps(self, steps: List[str], start_number: int = 0) -> List[StepAction]:
+        """
+        Parse every step of a recipe, enhancing all low-confidence steps in one LLM call
+        
+        Args:
+            steps: The recipe step texts in order
+            start_number: Step number of the first step
+            
+        Returns:
+            StepAction objects, one per step
+        """
+        actions, cache_keys, low_confidence = self._rule_parse_steps(steps, start_number)
+        
+        if low_confidence:
+            enhanced = self._llm_enhanced_parse_batch([actions[i] for i in low_confidence])
+            self._merge_enhanced(actions, cache_keys, low_confidence, enhanced)
+        
+        return actions
+    
+    async def parse_steps_async(
+        self,
+        steps: List[str],
+        start_number: int = 0,
+        max_concurrency: Optional[int] = None
+    ) -> List[StepAction]:
+        """
+        Parse every step of a recipe, enhancing low-confidence steps with concurrent LLM calls
+        
+        For backends that cannot answer a batched prompt (see parse_steps):
+        one request per step, awaited together so the enhancement pass takes
+        about as long as its slowest call.
+        
+        Args:
+            steps: The recipe step texts in order
+            start_number: Step number of the first step
+            max_concurrency: Maximum LLM calls in flight (None for no limit)
+            
+        Returns:
+            StepAction objects, one per step
+        """
+        actions, cache_keys, low_confidence = self._rule_parse_steps(steps, start_number)
+        
+        if not low_confidence:
+            return actions
+        
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        
+        async def enhance(initial: StepAction) -> StepAction:
+            if semaphore is None:
+                return await self._llm_enhanced_parse_async(initial.raw_text, initial.step_number, initial)
+            async with semaphore:
+                return await self._llm_enhanced_parse_async(initial.raw_text, initial.step_number, initial)
+        
+        enhanced = await asyncio.gather(*(enhance(actions[i]) for i in low_confidence))
+        self._merge_enhanced(actions, cache_keys, low_confidence, enhanced)
+        
+        return actions
+    
+    def _rule_parse_steps(self, steps: List[str], start_number: int):
+        """
+        Cached or rule-based parse of every step
+        
+        Returns:
+            Tuple of (actions, cache keys, offsets of uncached low-confidence steps)
+        """
+        actions: List[StepAction] = []
+        cache_keys = []
+        low_confidence = []
+        for offset, step_text in enumerate(steps):
+            cache_key = self._cache_key(step_text)
+            cache_keys.append(cache_key)
+            action = self._cached_parse(cache_key, step_text, start_number + offset)
+            if action is None:
+                action = self._rule_based_parse(step_text, start_number + offset)
+                if action.confidence < 0.7:
+                    low_confidence.append(offset)
+                else:
+                    self._store_parse(cache_key, action)
+            actions.append(action)
+        return actions, cache_keys, low_confidence
+    
+    def _merge_enhanced(self, actions, cache_keys, low_confidence, enhanced):
+        """Put LLM-enhanced parses in place and cache them (failed ones stay uncached)"""
+        for offset, action in zip(low_confidence, enhanced):
+            if action is not actions[offset]:
+                self._store_parse(cache_keys[offset], action)
+                actions[offset] = action
+    
+    def _cache_key(self, step_text: str) -> Tuple[str, Tuple[str, ...]]:
+        """Parse cache key: whitespace-collapsed lowercase text plus the ingredient list"""
+        return _WHITESPACE_RE.sub(" ", step_text.strip().lower()), self._ingredients_key
+    
+    @staticmethod
+    def _cached_parse(cache_key, step_text: str, step_number: int) -> Optional[StepAction]:
+        """Copy of a cached parse for this step, or None"""
+        with _parse_cache_lock:
+            cached = _parse_cache.get(cache_key)
+        if cached is None:
+            return None
+        # Only the step number and original text differ between repeats
+        return cached.model_copy(
+            update={"step_number": step_number, "raw_text": step_text},
+            deep=True
+        )
+    
+    @staticmethod
+    def _store_parse(cache_key, action: StepAction):
+        """Remember a parse, dropping the oldest entry when the cache is full"""
+        with _parse_cache_lock:
+            if len(_parse_cache) >= PARSE_CACHE_SIZE:
+                _parse_cache.pop(next(iter(_parse_cache)))
+            _parse_cache[cache_key] = action.model_copy(deep=True)
+    
     def _rule_based_parse(self, step_text: str, step_number: int) -> StepAction:
         """Rule-based parsing using patterns and heuristics"""
         step_lower = step_text.lower()
         
         # Detect action type
         action_type = "cook"  # default
-        for action, keywords in self.COOKING_ACTIONS.items():
-            if any(keyword in step_lower for keyword in keywords):
+        for action, pattern in self._ACTION_PATTERNS:
+            if pattern.search(step_lower):
                 action_type = action
                 break
         
@@ -94,27 +318,29 @@ class DeterministicStepParser:
         ingredients_added = []
         ingredients_removed = []
         
+        mentioned = self._find_ingredients(step_text, step_lower)
+        
         # Check for removal keywords
-        if any(word in step_lower for word in ["remove", "take out", "drain", "discard"]):
+        if _REMOVAL_RE.search(step_lower):
             # This is a removal step
-            for ingredient, pattern in self.ingredient_patterns:
-                if pattern.search(step_text):
-                    ingredients_removed.append(ingredient)
+            ingredients_removed.extend(mentioned)
         else:
             # Check for added ingredients
-            for ingredient, pattern in self.ingredient_patterns:
-                if pattern.search(step_text):
-                    # Check if it's being added (not just mentioned)
-                    if self._is_ingredient_being_added(step_text, ingredient):
-                        ingredients_added.append(ingredient)
+            for ingredient in mentioned:
+                # Check if it's being added (not just mentioned)
+                if self._is_ingredient_being_added(step_text, ingredient):
+                    ingredients_added.append(ingredient)
         
         # Detect visual changes
         visible_change = {}
-        for ingredient in ingredients_added:
-            for state, indicators in self.STATE_INDICATORS.items():
-                if any(indicator in step_lower for indicator in indicators):
-                    visible_change[ingredient] = state
-                    break
+        if ingredients_added:
+            # The indicator depends only on the step, so every added ingredient shares it
+            state = next(
+                (state for state, pattern in self._STATE_PATTERNS if pattern.search(step_lower)),
+                None
+            )
+            if state:
+                visible_change = dict.fromkeys(ingredients_added, state)
         
         # Detect pan state
         pan_state = self._detect_pan_state(step_text)
@@ -140,36 +366,26 @@ class DeterministicStepParser:
         step_lower = step_text.lower()
         ingredient_lower = ingredient.lower()
         
-        # Patterns that indicate adding
-        add_patterns = [
-            f"add {ingredient_lower}",
-            f"add the {ingredient_lower}",
-            f"put {ingredient_lower}",
-            f"pour {ingredient_lower}",
-            f"place {ingredient_lower}",
-            f"throw in {ingredient_lower}",
-            f"mix in {ingredient_lower}",
-            f"stir in {ingredient_lower}",
-            f"{ingredient_lower} and",
-            f"{ingredient_lower},",
-        ]
+        # Probe the text around each occurrence: an add verb right before it
+        # ("add the onion") or a list continuation right after ("onion and")
+        start = step_lower.find(ingredient_lower)
+        while start != -1:
+            end = start + len(ingredient_lower)
+            if (
+                _ADD_FOLLOW_RE.match(step_lower, end)
+                or _ADD_CONTEXT_RE.search(step_lower, max(0, start - _ADD_CONTEXT_WINDOW), start)
+            ):
+                return True
+            start = step_lower.find(ingredient_lower, start + 1)
         
-        return any(pattern in step_lower for pattern in add_patterns)
+        return False
     
     def _detect_pan_state(self, step_text: str) -> Optional[str]:
         """Detect the state of the pan/cooking vessel"""
         step_lower = step_text.lower()
         
-        states = {
-            "oil shimmering": ["oil.*hot", "oil.*shimmer", "heat.*oil"],
-            "ingredients browning": ["brown", "golden", "carameliz"],
-            "sauce thickening": ["thick", "reduce", "coating"],
-            "mixture simmering": ["simmer", "bubble", "gentle boil"],
-            "dry roasting": ["dry roast", "no oil", "without oil"]
-        }
-        
-        for state, patterns in states.items():
-            if any(re.search(pattern, step_lower) for pattern in patterns):
+        for state, pattern in _PAN_STATE_PATTERNS:
+            if pattern.search(step_lower):
                 return state
         
         return None
@@ -209,7 +425,32 @@ class DeterministicStepParser:
         initial_parse: StepAction
     ) -> StepAction:
         """Use LLM to enhance parsing for complex steps"""
-        
+        try:
+            result = self._enhance_chain().run(**self._enhance_inputs(step_text, initial_parse))
+            
+            # Parse JSON response
+            return self._action_from_llm(json.loads(result), initial_parse)
+            
+        except Exception as e:
+            print(f"LLM parsing failed: {e}, using initial parse")
+            return initial_parse
+    
+    async def _llm_enhanced_parse_async(
+        self,
+        step_text: str,
+        step_number: int,
+        initial_parse: StepAction
+    ) -> StepAction:
+        """Async variant of _llm_enhanced_parse (awaits the LLM instead of blocking)"""
+        try:
+            result = await self._enhance_chain().arun(**self._enhance_inputs(step_text, initial_parse))
+            return self._action_from_llm(json.loads(result), initial_parse)
+        except Exception as e:
+            print(f"LLM parsing failed: {e}, using initial parse")
+            return initial_parse
+    
+    def _enhance_chain(self) -> LLMChain:
+        """Chain that asks the LLM to re-parse a single step"""
         prompt = PromptTemplate(
             template="""Parse this cooking step into structured information.
 
@@ -238,41 +479,102 @@ Be very precise about which ingredients are actually being added vs just mention
             ]
         )
         
+        return LLMChain(llm=self.llm, prompt=prompt)
+    
+    def _enhance_inputs(self, step_text: str, initial_parse: StepAction) -> Dict[str, str]:
+        """Prompt inputs for _enhance_chain"""
+        return {
+            "step_text": step_text,
+            "all_ingredients": ", ".join(self.all_ingredients),
+            "action_type": initial_parse.action_type,
+            "ingredients_added": ", ".join(initial_parse.ingredients_added),
+            "ingredients_removed": ", ".join(initial_parse.ingredients_removed)
+        }
+    
+    def _llm_enhanced_parse_batch(self, initial_parses: List[StepAction]) -> List[StepAction]:
+        """
+        Enhance several low-confidence steps with a single LLM call
+        
+        Args:
+            initial_parses: Rule-based parses of the steps to enhance
+            
+        Returns:
+            One StepAction per input; the initial parse wherever the LLM failed
+        """
+        if len(initial_parses) == 1:
+            initial = initial_parses[0]
+            return [self._llm_enhanced_parse(initial.raw_text, initial.step_number, initial)]
+        
+        prompt = PromptTemplate(
+            template="""Parse each of these cooking steps into structured information.
+
+Available ingredients: {all_ingredients}
+
+Steps with their initial parse:
+{steps}
+
+Return a JSON array with exactly one object per step, in the same order:
+[
+    {{
+        "action_type": "one of: add, fry, saute, cook, simmer, remove, mix, prepare",
+        "ingredients_added": ["list of ingredients being added to the pan"],
+        "ingredients_removed": ["list of ingredients being removed from the pan"],
+        "visible_change": {{"ingredient": "state change like 'browning' or 'softening'"}},
+        "pan_state": "description of how the pan/contents look",
+        "confidence": 0.0-1.0
+    }}
+]
+
+Be very precise about which ingredients are actually being added vs just mentioned.""",
+            input_variables=["all_ingredients", "steps"]
+        )
+        
         chain = LLMChain(llm=self.llm, prompt=prompt)
+        steps = "\n".join(
+            f'{i}. "{initial.raw_text}" '
+            f"(action: {initial.action_type}; "
+            f"added: {', '.join(initial.ingredients_added)}; "
+            f"removed: {', '.join(initial.ingredients_removed)})"
+            for i, initial in enumerate(initial_parses, 1)
+        )
         
         try:
-            result = chain.run(
-                step_text=step_text,
-                all_ingredients=", ".join(self.all_ingredients),
-                action_type=initial_parse.action_type,
-                ingredients_added=", ".join(initial_parse.ingredients_added),
-                ingredients_removed=", ".join(initial_parse.ingredients_removed)
-            )
-            
-            # Parse JSON response
-            parsed = json.loads(result)
-            
-            # Validate ingredients against known list
-            valid_added = [
-                ing for ing in parsed.get("ingredients_added", [])
-                if ing.lower() in self.all_ingredients
-            ]
-            valid_removed = [
-                ing for ing in parsed.get("ingredients_removed", [])
-                if ing.lower() in self.all_ingredients
-            ]
-            
-            return StepAction(
-                step_number=step_number,
-                action_type=parsed.get("action_type", initial_parse.action_type),
-                ingredients_added=valid_added,
-                ingredients_removed=valid_removed,
-                visible_change=parsed.get("visible_change", {}),
-                pan_state_text=parsed.get("pan_state"),
-                confidence=parsed.get("confidence", 0.8),
-                raw_text=step_text
-            )
-            
+            result = chain.run(all_ingredients=", ".join(self.all_ingredients), steps=steps)
+            parsed_steps = json.loads(result)
+            if not isinstance(parsed_steps, list) or len(parsed_steps) != len(initial_parses):
+                raise ValueError(f"expected {len(initial_parses)} parses")
         except Exception as e:
-            print(f"LLM parsing failed: {e}, using initial parse")
-            return initial_parse
+            print(f"Batched LLM parsing failed: {e}, using initial parses")
+            return list(initial_parses)
+        
+        actions = []
+        for parsed, initial in zip(parsed_steps, initial_parses):
+            try:
+                actions.append(self._action_from_llm(parsed, initial))
+            except Exception as e:
+                print(f"LLM parsing failed for step {initial.step_number}: {e}, using initial parse")
+                actions.append(initial)
+        return actions
+    
+    def _action_from_llm(self, parsed: Dict, initial_parse: StepAction) -> StepAction:
+        """Build a StepAction from an LLM parse, keeping only known ingredients"""
+        # Validate ingredients against known list
+        valid_added = [
+            ing for ing in parsed.get("ingredients_added", [])
+            if ing.lower() in self.all_ingredients
+        ]
+        valid_removed = [
+            ing for ing in parsed.get("ingredients_removed", [])
+            if ing.lower() in self.all_ingredients
+        ]
+        
+        return StepAction(
+            step_number=initial_parse.step_number,
+            action_type=parsed.get("action_type", initial_parse.action_type),
+            ingredients_added=valid_added,
+            ingredients_removed=valid_removed,
+            visible_change=parsed.get("visible_change", {}),
+            pan_state_text=parsed.get("pan_state"),
+            confidence=parsed.get("confidence", 0.8),
+            raw_text=initial_parse.raw_text
+        )
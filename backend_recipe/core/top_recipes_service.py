@@ -5,15 +5,35 @@ Database operations for top_recipes table in Supabase PostgreSQL
 """
 
 import os
+import base64
+import gzip
 import json
-import psycopg
+import threading
+import time
 from psycopg.rows import dict_row
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from psycopg.types.json import set_json_loads
+from psycopg_pool import ConnectionPool
+from typing import Any, List, Dict, Optional, Tuple
+from dataclasses import dataclass, fields
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# orjson when available (update_recipe re-serializes growing image lists and
+# row_to_recipe parses text JSON columns), stdlib otherwise
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps(data: Any) -> str:
+        return orjson.dumps(data).decode("utf-8")
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(data: Any) -> str:
+        return json.dumps(data)
+
 
 @dataclass
 class TopRecipe:
@@ -71,137 +91,122 @@ class TopRecipeSummary:
     dietary_tags: List[str]
 
 
+# Process-wide connection pool (created on first use)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _configure_connection(conn):
+    """Decode json/jsonb columns with the module's loader (orjson when installed)"""
+    set_json_loads(_json_loads, conn)
+
+
+def _get_pool() -> ConnectionPool:
+    """
+    Get or create the Supabase connection pool
+    
+    Env vars:
+        SUPABASE_POOL_MIN_SIZE: Connections kept open (default: 2)
+        SUPABASE_POOL_MAX_SIZE: Upper bound on open connections (default: 10)
+    """
+    global _pool
+    
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                supabase_url = os.environ.get("SUPABASE_OG_URL")
+                if not supabase_url:
+                    raise ValueError("SUPABASE_OG_URL not found in environment variables")
+                _pool = ConnectionPool(
+                    supabase_url,
+                    min_size=int(os.getenv("SUPABASE_POOL_MIN_SIZE", "2")),
+                    max_size=int(os.getenv("SUPABASE_POOL_MAX_SIZE", "10")),
+                    # No server-side prepared statements: they break behind
+                    # Supabase's transaction-mode pooler once connections are reused
+                    kwargs={"row_factory": dict_row, "prepare_threshold": None},
+                    configure=_configure_connection,
+                    check=ConnectionPool.check_connection,
+                    open=True
+                )
+    
+    return _pool
+
+
 def get_supabase_connection():
-    """Get Supabase PostgreSQL connection"""
-    supabase_url = os.environ.get("SUPABASE_OG_URL")
-    if not supabase_url:
-        raise ValueError("SUPABASE_OG_URL not found in environment variables")
-    return psycopg.connect(supabase_url, row_factory=dict_row)
+    """
+    Borrow a Supabase PostgreSQL connection from the pool
+    
+    Use as a context manager; the connection goes back to the pool on exit
+    (an open transaction is committed, or rolled back on an exception).
+    """
+    return _get_pool().connection()
+
+
+def close_supabase_pool():
+    """Close the pool's connections (e.g. on application shutdown)"""
+    global _pool
+    
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+# JSON columns; jsonb arrives already decoded, older text columns are parsed here.
+# List columns fall back to [], the rest to None
+_JSON_LIST_FIELDS = (
+    'tastes', 'meal_types', 'dietary_tags', 'ingredients', 'steps', 'step_image_urls'
+)
+_JSON_OPTIONAL_FIELDS = (
+    'steps_beginner', 'steps_advanced', 'steps_beginner_images', 'steps_advanced_images'
+)
+
+
+def _parse_json_field(value: Any, default: Any) -> Any:
+    """Decode a JSON column stored as text (default if NULL or unparseable)"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        try:
+            return _json_loads(value)
+        except ValueError:
+            return default
+    return value
 
 
 def row_to_recipe(row: dict) -> TopRecipe:
     """Convert database row dict to TopRecipe object"""
-    try:
-        # Helper function to safely get values
-        def safe_get(key, default=None):
-            value = row.get(key, default)
-            # Handle JSON string conversion if needed
-            if isinstance(value, str) and (value.startswith('[') or value.startswith('{')):
-                try:
-                    return json.loads(value)
-                except:
-                    pass
-            return value
-        
-        # Parse JSON fields if they're strings
-        tastes = safe_get('tastes', [])
-        if isinstance(tastes, str):
-            try:
-                tastes = json.loads(tastes)
-            except:
-                tastes = []
-        
-        meal_types = safe_get('meal_types', [])
-        if isinstance(meal_types, str):
-            try:
-                meal_types = json.loads(meal_types)
-            except:
-                meal_types = []
-        
-        dietary_tags = safe_get('dietary_tags', [])
-        if isinstance(dietary_tags, str):
-            try:
-                dietary_tags = json.loads(dietary_tags)
-            except:
-                dietary_tags = []
-        
-        ingredients = safe_get('ingredients', [])
-        if isinstance(ingredients, str):
-            try:
-                ingredients = json.loads(ingredients)
-            except:
-                ingredients = []
-        
-        steps = safe_get('steps', [])
-        if isinstance(steps, str):
-            try:
-                steps = json.loads(steps)
-            except:
-                steps = []
-        
-        step_image_urls = safe_get('step_image_urls', [])
-        if isinstance(step_image_urls, str):
-            try:
-                step_image_urls = json.loads(step_image_urls)
-            except:
-                step_image_urls = []
-        
-        # Parse step-by-step guide fields
-        steps_beginner = safe_get('steps_beginner', None)
-        if isinstance(steps_beginner, str):
-            try:
-                steps_beginner = json.loads(steps_beginner)
-            except:
-                steps_beginner = None
-        
-        steps_advanced = safe_get('steps_advanced', None)
-        if isinstance(steps_advanced, str):
-            try:
-                steps_advanced = json.loads(steps_advanced)
-            except:
-                steps_advanced = None
-        
-        steps_beginner_images = safe_get('steps_beginner_images', None)
-        if isinstance(steps_beginner_images, str):
-            try:
-                steps_beginner_images = json.loads(steps_beginner_images)
-            except:
-                steps_beginner_images = None
-        
-        steps_advanced_images = safe_get('steps_advanced_images', None)
-        if isinstance(steps_advanced_images, str):
-            try:
-                steps_advanced_images = json.loads(steps_advanced_images)
-            except:
-                steps_advanced_images = None
-        
-        return TopRecipe(
-            id=row['id'],
-            name=row.get('name', 'Unknown Recipe'),
-            description=row.get('description'),
-            region=row.get('region'),
-            tastes=tastes if tastes else [],
-            meal_types=meal_types if meal_types else [],
-            dietary_tags=dietary_tags if dietary_tags else [],
-            difficulty=row.get('difficulty'),
-            prep_time_minutes=row.get('prep_time_minutes'),
-            cook_time_minutes=row.get('cook_time_minutes'),
-            total_time_minutes=row.get('total_time_minutes'),
-            servings=row.get('servings'),
-            calories=row.get('calories'),
-            ingredients=ingredients if ingredients else [],
-            steps=steps if steps else [],
-            image_url=row.get('image_url'),
-            step_image_urls=step_image_urls if step_image_urls else [],
-            popularity_score=float(row.get('popularity_score', 0) or 0),
-            rating=float(row.get('rating', 0) or 0),
-            source=row.get('source', 'api'),
-            created_at=str(row['created_at']) if row.get('created_at') else None,
-            updated_at=str(row['updated_at']) if row.get('updated_at') else None,
-            # New fields
-            ingredients_image=row.get('ingredients_image'),
-            steps_beginner=steps_beginner,
-            steps_advanced=steps_advanced,
-            steps_beginner_images=steps_beginner_images,
-            steps_advanced_images=steps_advanced_images,
-            ingredient_image_urls=row.get('ingredient_image_urls') if row.get('ingredient_image_urls') else None,
-            validation_status=row.get('validation_status'),
-            data_quality_score=row.get('data_quality_score'),
-            is_complete=row.get('is_complete'),
-            last_validated_at=str(row['last_validated_at']) if row.get('last_validated_at') else None
-        )
-    except Exception as e:
-        raise
+    # Each text JSON column is parsed exactly once
+    lists = {field: _parse_json_field(row.get(field), None) or [] for field in _JSON_LIST_FIELDS}
+    optional = {field: _parse_json_field(row.get(field), None) for field in _JSON_OPTIONAL_FIELDS}
+    
+    return TopRecipe(
+        id=row['id'],
+        name=row.get('name', 'Unknown Recipe'),
+        description=row.get('description'),
+        region=row.get('region'),
+        difficulty=row.get('difficulty'),
+        prep_time_minutes=row.get('prep_time_minutes'),
+        cook_time_minutes=row.get('cook_time_minutes'),
+        total_time_minutes=row.get('total_time_minutes'),
+        servings=row.get('servings'),
+        calories=row.get('calories'),
+        image_url=row.get('image_url'),
+        popularity_score=float(row.get('popularity_score', 0) or 0),
+        rating=float(row.get('rating', 0) or 0),
+        source=row.get('source', 'api'),
+        created_at=str(row['created_at']) if row.get('created_at') else None,
+        updated_at=str(row['updated_at']) if row.get('updated_at') else None,
+        # New fields
+        ingredients_image=row.get('ingredients_image'),
+        ingredient_image_urls=row.get('ingredient_image_urls') or None,
+        validation_status=row.get('validation_status'),
+        data_quality_score=row.get('data_quality_score'),
+        is_complete=row.get('is_complete'),
+        last_validated_at=str(row['last_validated_at']) if row.get('last_validated_at') else None,
+        **lists,
+        **optional
+    )
 
 
 def row_to_recipe_summary(row: dict) -> TopRecipeSummary:
@@ -223,6 +228,13 @@ def row_to_recipe_summary(row: dict) -> TopRecipeSummary:
     )
 
 
+# Largest page the public listing endpoint serves (internal callers that
+# fetch everything pass larger limits, which are not capped), and rows per
+# server-side cursor fetch
+TOP_RECIPES_MAX_LIMIT = 100
+TOP_RECIPES_STREAM_BATCH = 50
+
+
 def get_top_recipes(
     region: Optional[str] = None,
     difficulty: Optional[str] = None,
@@ -238,9 +250,6 @@ def get_top_recipes(
     detailed: bool = True
 ) -> Tuple[List[TopRecipe] | List[TopRecipeSummary], int]:
     """Get top recipes with flexible filtering and pagination"""
-    conn = get_supabase_connection()
-    cursor = conn.cursor()
-    
     conditions = []
     params = []
     
@@ -274,11 +283,6 @@ def get_top_recipes(
     
     where_clause = " AND ".join(conditions) if conditions else "TRUE"
     
-    count_query = f"SELECT COUNT(*) FROM top_recipes WHERE {where_clause}"
-    cursor.execute(count_query, params)
-    result = cursor.fetchone()
-    total_count = result['count'] if result else 0
-    
     allowed_sort_columns = [
         'popularity_score', 'rating', 'total_time_minutes', 
         'calories', 'servings', 'created_at', 'name'
@@ -290,33 +294,53 @@ def get_top_recipes(
     if sort_order not in ['ASC', 'DESC']:
         sort_order = 'DESC'
     
+    # The window count rides along with the page, so one query gives both;
+    # id breaks sort ties so pages never overlap
+    # (and matches the (column, id) indexes in supabase_top_recipes_setup.sql)
     if detailed:
         select_query = f"""
-            SELECT * FROM top_recipes
+            SELECT *, COUNT(*) OVER() AS __total FROM top_recipes
             WHERE {where_clause}
-            ORDER BY {sort_by} {sort_order}
+            ORDER BY {sort_by} {sort_order}, id {sort_order}
             LIMIT %s OFFSET %s
         """
     else:
         select_query = f"""
             SELECT id, name, description, region, difficulty, total_time_minutes,
                    servings, calories, image_url, rating, popularity_score,
-                   meal_types, dietary_tags
+                   meal_types, dietary_tags, COUNT(*) OVER() AS __total
             FROM top_recipes
             WHERE {where_clause}
-            ORDER BY {sort_by} {sort_order}
+            ORDER BY {sort_by} {sort_order}, id {sort_order}
             LIMIT %s OFFSET %s
         """
     
-    params.extend([limit, offset])
-    cursor.execute(select_query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    
-    if detailed:
-        recipes = [row_to_recipe(row) for row in rows]
-    else:
-        recipes = [row_to_recipe_summary(row) for row in rows]
+    to_recipe = row_to_recipe if detailed else row_to_recipe_summary
+    recipes = []
+    total_count = 0
+    
+    with get_supabase_connection() as conn:
+        # Pages larger than one fetch batch stream through a server-side cursor,
+        # so rows are converted as they arrive instead of held all at once
+        # (smaller pages skip the extra DECLARE/FETCH round trip)
+        if limit > TOP_RECIPES_STREAM_BATCH:
+            cursor = conn.cursor(name="top_recipes_stream")
+            cursor.itersize = TOP_RECIPES_STREAM_BATCH
+        else:
+            cursor = conn.cursor()
+        
+        with cursor:
+            cursor.execute(select_query, [*params, limit, offset])
+            for row in cursor:
+                total_count = row.pop('__total')
+                recipes.append(to_recipe(row))
+        
+        if not recipes and offset:
+            # Page past the end: no row carries the total, so count separately
+            with conn.cursor() as count_cursor:
+                count_cursor.execute(f"SELECT COUNT(*) FROM top_recipes WHERE {where_clause}", params)
+                result = count_cursor.fetchone()
+                total_count = result['count'] if result else 0
     
     return recipes, total_count
 
@@ -324,12 +348,9 @@ def get_top_recipes(
 def get_recipe_by_id(recipe_id: int) -> Optional[TopRecipe]:
     """Get a single recipe by ID"""
     try:
-        conn = get_supabase_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM top_recipes WHERE id = %s", (recipe_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with get_supabase_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT * FROM top_recipes WHERE id = %s", (recipe_id,))
+            row = cursor.fetchone()
         
         if not row:
             return None
@@ -343,7 +364,16 @@ def get_recipe_by_id(recipe_id: int) -> Optional[TopRecipe]:
         raise
 
 
-def insert_recipe(
+# Columns written by insert_recipe/bulk_insert_recipes, in _recipe_insert_row order
+_INSERT_COLUMNS = (
+    'name', 'description', 'region', 'tastes', 'meal_types', 'dietary_tags',
+    'difficulty', 'prep_time_minutes', 'cook_time_minutes', 'total_time_minutes',
+    'servings', 'calories', 'ingredients', 'steps', 'image_url', 'step_image_urls',
+    'rating', 'popularity_score', 'source'
+)
+
+
+def _recipe_insert_row(
     name: str,
     description: Optional[str] = None,
     region: Optional[str] = None,
@@ -363,60 +393,122 @@ def insert_recipe(
     rating: float = 0.0,
     popularity_score: float = 0.0,
     source: str = 'api'
-) -> int:
-    """Insert a new recipe into the database"""
-    conn = get_supabase_connection()
-    cursor = conn.cursor()
-    
-    tastes = tastes or []
-    meal_types = meal_types or []
-    dietary_tags = dietary_tags or []
-    ingredients = ingredients or []
+) -> Tuple:
+    """Column values for one new recipe, in _INSERT_COLUMNS order"""
     steps = steps or []
-    step_image_urls = step_image_urls or []
-    
-    while len(step_image_urls) < len(steps):
-        step_image_urls.append('')
-    step_image_urls = step_image_urls[:len(steps)]
-    
-    cursor.execute("""
-        INSERT INTO top_recipes (
-            name, description, region, tastes, meal_types, dietary_tags,
-            difficulty, prep_time_minutes, cook_time_minutes, total_time_minutes,
-            servings, calories, ingredients, steps, image_url, step_image_urls,
-            rating, popularity_score, source
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        )
-        RETURNING id
-    """, (
+    
+    # One image slot per step ('' where there is no image yet)
+    step_image_urls = list(step_image_urls or [])[:len(steps)]
+    step_image_urls.extend([''] * (len(steps) - len(step_image_urls)))
+    
+    return (
         name, description, region,
-        json.dumps(tastes),
-        meal_types,
-        dietary_tags,
+        json.dumps(tastes or []),
+        meal_types or [],
+        dietary_tags or [],
         difficulty, prep_time_minutes, cook_time_minutes, total_time_minutes,
         servings, calories,
-        json.dumps(ingredients),
+        json.dumps(ingredients or []),
         steps,
         image_url,
         step_image_urls,
         rating, popularity_score, source
-    ))
+    )
+
+
+def insert_recipe(
+    name: str,
+    description: Optional[str] = None,
+    region: Optional[str] = None,
+    tastes: List[Dict[str, int]] = None,
+    meal_types: List[str] = None,
+    dietary_tags: List[str] = None,
+    difficulty: Optional[str] = None,
+    prep_time_minutes: Optional[int] = None,
+    cook_time_minutes: Optional[int] = None,
+    total_time_minutes: Optional[int] = None,
+    servings: Optional[int] = None,
+    calories: Optional[int] = None,
+    ingredients: List[Dict[str, str]] = None,
+    steps: List[str] = None,
+    image_url: Optional[str] = None,
+    step_image_urls: List[str] = None,
+    rating: float = 0.0,
+    popularity_score: float = 0.0,
+    source: str = 'api'
+) -> int:
+    """Insert a new recipe into the database"""
+    row = _recipe_insert_row(
+        name=name, description=description, region=region, tastes=tastes,
+        meal_types=meal_types, dietary_tags=dietary_tags, difficulty=difficulty,
+        prep_time_minutes=prep_time_minutes, cook_time_minutes=cook_time_minutes,
+        total_time_minutes=total_time_minutes, servings=servings, calories=calories,
+        ingredients=ingredients, steps=steps, image_url=image_url,
+        step_image_urls=step_image_urls, rating=rating,
+        popularity_score=popularity_score, source=source
+    )
     
-    result = cursor.fetchone()
-    recipe_id = result['id'] if result else None
-    conn.commit()
-    conn.close()
+    with get_supabase_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO top_recipes ({', '.join(_INSERT_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(_INSERT_COLUMNS))})
+            RETURNING id
+        """, row)
+        
+        result = cursor.fetchone()
+        recipe_id = result['id'] if result else None
+        conn.commit()
     
+    invalidate_filter_options()
     return recipe_id
 
 
+# Columns that get_filter_options reports on
+FILTER_FIELDS = {'region', 'difficulty', 'meal_types', 'dietary_tags'}
+
+
+def bulk_insert_recipes(recipes: List[Dict]) -> int:
+    """
+    Insert many recipes with a single COPY (much faster than one INSERT per row)
+    
+    Args:
+        recipes: Dicts of insert_recipe keyword arguments ('name' is required)
+        
+    Returns:
+        Number of recipes inserted
+    """
+    if not recipes:
+        return 0
+    
+    with get_supabase_connection() as conn, conn.cursor() as cursor:
+        with cursor.copy(f"COPY top_recipes ({', '.join(_INSERT_COLUMNS)}) FROM STDIN") as copy:
+            for recipe in recipes:
+                copy.write_row(_recipe_insert_row(**recipe))
+        conn.commit()
+    
+    invalidate_filter_options()
+    return len(recipes)
+
+
+# Columns update_recipe may set (field names are interpolated into the SQL)
+_UPDATABLE_FIELDS = frozenset(
+    field.name for field in fields(TopRecipe)
+) - {'id', 'created_at', 'updated_at'}
+
+
 def update_recipe(recipe_id: int, **kwargs) -> bool:
     """
     Update specific fields of an existing recipe.
     Accepts any combination of fields as keyword arguments.
     Pass None to clear/remove a field value.
+    
+    Raises:
+        ValueError: If a field is not an updatable top_recipes column
     """
+    unknown = set(kwargs) - _UPDATABLE_FIELDS
+    if unknown:
+        raise ValueError(f"Cannot update fields: {', '.join(sorted(unknown))}")
+    
     updates = []
     params = []
     
@@ -431,7 +523,7 @@ def update_recipe(recipe_id: int, **kwargs) -> bool:
     for field, value in kwargs.items():
         # Serialize JSON fields
         if field in json_fields and value is not None:
-            value = json.dumps(value)
+            value = _json_dumps(value)
         
         # Add to update query
         updates.append(f"{field} = %s")
@@ -442,55 +534,163 @@ def update_recipe(recipe_id: int, **kwargs) -> bool:
     
     params.append(recipe_id)
     
-    conn = get_supabase_connection()
-    cursor = conn.cursor()
-    
     query = f"UPDATE top_recipes SET {', '.join(updates)} WHERE id = %s"
-    cursor.execute(query, params)
     
-    rows_affected = cursor.rowcount
-    conn.commit()
-    conn.close()
+    with get_supabase_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(query, params)
+        rows_affected = cursor.rowcount
+        conn.commit()
     
+    if rows_affected and FILTER_FIELDS.intersection(kwargs):
+        invalidate_filter_options()
     return rows_affected > 0
 
 
-def delete_recipe(recipe_id: int) -> bool:
-    """Delete a recipe by ID"""
-    conn = get_supabase_connection()
-    cursor = conn.cursor()
+# JSON array columns that append_recipe_json_items may extend
+JSON_ARRAY_FIELDS = {
+    'step_image_urls', 'steps_beginner_images', 'steps_advanced_images',
+    'ingredient_image_urls'
+}
+
+
+def append_recipe_json_items(recipe_id: int, field: str, items: List, expected_length: int) -> bool:
+    """
+    Append items to a JSON array column, sending only the new items.
     
-    cursor.execute("DELETE FROM top_recipes WHERE id = %s", (recipe_id,))
+    The append only happens if the stored array currently has expected_length
+    entries (NULL counts as empty), so a caller whose view of the row is out
+    of date gets False back and can fall back to a full update_recipe write.
     
-    rows_affected = cursor.rowcount
-    conn.commit()
-    conn.close()
+    Returns:
+        True if the row was updated
+    """
+    if field not in JSON_ARRAY_FIELDS:
+        raise ValueError(f"Not a JSON array field: {field}")
+    
+    # Works for jsonb and text columns (jsonb -> text is an assignment cast);
+    # a stored non-array (e.g. a double-encoded string) never matches
+    current = f"COALESCE({field}::jsonb, '[]'::jsonb)"
+    query = f"""
+        UPDATE top_recipes
+        SET {field} = {current} || %s::jsonb
+        WHERE id = %s
+          AND CASE WHEN jsonb_typeof({current}) = 'array'
+                   THEN jsonb_array_length({current}) END = %s
+    """
+    with get_supabase_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(query, (_json_dumps(items), recipe_id, expected_length))
+        rows_affected = cursor.rowcount
+        conn.commit()
     
     return rows_affected > 0
 
 
-def get_filter_options() -> Dict[str, List[str]]:
-    """Get all available filter options"""
-    conn = get_supabase_connection()
-    cursor = conn.cursor()
+# Step-image cumulative state snapshots larger than this are stored gzipped
+STATE_SNAPSHOT_GZIP_THRESHOLD = 8 * 1024
+
+
+def save_step_state_snapshot(recipe_id: int, step_type: str, snapshot: Dict) -> bool:
+    """
+    Store the cumulative prompt state for one step type's images
     
-    cursor.execute("SELECT DISTINCT region FROM top_recipes WHERE region IS NOT NULL ORDER BY region")
-    regions = [row['region'] for row in cursor.fetchall()]
+    Kept in the steps_state_snapshots JSONB column as {step_type: snapshot};
+    payloads over STATE_SNAPSHOT_GZIP_THRESHOLD bytes are stored as
+    {"gzip": <base64 gzip of the JSON>}.
     
-    cursor.execute("SELECT DISTINCT difficulty FROM top_recipes WHERE difficulty IS NOT NULL ORDER BY difficulty")
-    difficulties = [row['difficulty'] for row in cursor.fetchall()]
+    Returns:
+        True if the row was updated
+    """
+    payload = _json_dumps(snapshot)
+    if len(payload) > STATE_SNAPSHOT_GZIP_THRESHOLD:
+        payload = _json_dumps({
+            "gzip": base64.b64encode(gzip.compress(payload.encode("utf-8"))).decode("ascii")
+        })
+    
+    with get_supabase_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            UPDATE top_recipes
+            SET steps_state_snapshots = jsonb_set(
+                COALESCE(steps_state_snapshots, '{}'::jsonb), %s, %s::jsonb
+            )
+            WHERE id = %s
+        """, ([step_type], payload, recipe_id))
+        rows_affected = cursor.rowcount
+        conn.commit()
+    
+    return rows_affected > 0
+
+
+def get_step_state_snapshot(recipe_id: int, step_type: str) -> Optional[Dict]:
+    """Cumulative prompt state saved by save_step_state_snapshot (None if there is none)"""
+    with get_supabase_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT steps_state_snapshots -> %s AS snapshot FROM top_recipes WHERE id = %s",
+            (step_type, recipe_id)
+        )
+        row = cursor.fetchone()
     
-    cursor.execute("SELECT DISTINCT unnest(meal_types) as meal_type FROM top_recipes ORDER BY meal_type")
-    meal_types = [row['meal_type'] for row in cursor.fetchall() if row['meal_type']]
+    snapshot = row["snapshot"] if row else None
+    if isinstance(snapshot, dict) and "gzip" in snapshot:
+        snapshot = json.loads(gzip.decompress(base64.b64decode(snapshot["gzip"])))
+    return snapshot
+
+
+def delete_recipe(recipe_id: int) -> bool:
+    """Delete a recipe by ID"""
+    with get_supabase_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("DELETE FROM top_recipes WHERE id = %s", (recipe_id,))
+        rows_affected = cursor.rowcount
+        conn.commit()
     
-    cursor.execute("SELECT DISTINCT unnest(dietary_tags) as dietary_tag FROM top_recipes ORDER BY dietary_tag")
-    dietary_tags = [row['dietary_tag'] for row in cursor.fetchall() if row['dietary_tag']]
+    if rows_affected:
+        invalidate_filter_options()
+    return rows_affected > 0
+
+
+# Filter options change only when recipes do; cached for this many seconds
+# and invalidated by insert_recipe/update_recipe/delete_recipe
+FILTER_OPTIONS_TTL_SECONDS = int(os.getenv("FILTER_OPTIONS_TTL_SECONDS", "300"))
+_filter_options_cache: Optional[Tuple[float, Dict[str, List[str]]]] = None
+
+
+def invalidate_filter_options():
+    """Drop the cached filter options so the next call re-reads them"""
+    global _filter_options_cache
+    _filter_options_cache = None
+
+
+def get_filter_options() -> Dict[str, List[str]]:
+    """Get all available filter options"""
+    global _filter_options_cache
     
-    conn.close()
+    cached = _filter_options_cache
+    if cached and cached[0] > time.monotonic():
+        return {key: list(values) for key, values in cached[1].items()}
     
-    return {
-        'regions': regions,
-        'difficulties': difficulties,
-        'meal_types': meal_types,
-        'dietary_tags': dietary_tags
+    options = {
+        'regions': [],
+        'difficulties': [],
+        'meal_types': [],
+        'dietary_tags': []
     }
+    
+    # One round trip for all four option lists, each distinct and sorted in the database
+    with get_supabase_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT k, v FROM (
+                SELECT DISTINCT 'regions' AS k, region AS v FROM top_recipes WHERE region IS NOT NULL
+                UNION ALL
+                SELECT DISTINCT 'difficulties', difficulty FROM top_recipes WHERE difficulty IS NOT NULL
+                UNION ALL
+                SELECT DISTINCT 'meal_types', unnest(meal_types) FROM top_recipes
+                UNION ALL
+                SELECT DISTINCT 'dietary_tags', unnest(dietary_tags) FROM top_recipes
+            ) AS options
+            ORDER BY k, v
+        """)
+        for row in cursor:
+            if row['v']:
+                options[row['k']].append(row['v'])
+    
+    _filter_options_cache = (time.monotonic() + FILTER_OPTIONS_TTL_SECONDS, options)
+    return {key: list(values) for key, values in options.items()}
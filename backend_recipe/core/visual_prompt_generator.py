@@ -211,16 +211,19 @@ class EnhancedImageGenerator:
     def _combine_prompts_for_gemini(self, prompts: Dict[str, str]) -> str:
         """Combine positive and negative prompts for Gemini API"""
         
-        combined = f"""{prompts['positive']}
-
-STRICT REQUIREMENTS - MUST NOT SHOW:
-{prompts['negative']}
-
-{prompts['style_suffix']}
-"""
+        parts = []
         
         # Add note if present
         if 'note' in prompts:
-            combined = f"[{prompts['note']}]\n\n{combined}"
+            parts.append(f"[{prompts['note']}]\n\n")
+        
+        parts.extend([
+            prompts['positive'],
+            "\n\nSTRICT REQUIREMENTS - MUST NOT SHOW:\n",
+            prompts['negative'],
+            "\n\n",
+            prompts['style_suffix'],
+            "\n"
+        ])
         
-        return combined
+        return "".join(parts)
@@ -54,6 +54,17 @@ class StepAction(BaseModel):
     raw_text: str = ""  # Original step text for reference
 
 
+class EnhancedStateSnapshot(BaseModel):
+    """Serializable snapshot of an EnhancedCumulativeState"""
+    recipe_name: str
+    all_ingredients: List[str]
+    current_state: VisualState
+    state_history: List[VisualState] = Field(default_factory=list)
+    actions_history: List[StepAction] = Field(default_factory=list)
+    step_confidences: Dict[int, float] = Field(default_factory=dict)
+    state_prompts: Dict[str, str] = Field(default_factory=dict)
+
+
 class RecipeVisualStateManager:
     """Manages the visual state throughout a recipe"""
     
@@ -335,15 +335,15 @@ Return ONLY the JSON array, no other text."""
     return prompt
 
 
+# Body of a reply with an optional leading ```json / ``` and trailing ``` fence
+_FENCE_RE = re.compile(r"^(?:```(?:json)?)?\s*(.*?)\s*(?:```)?$", re.DOTALL)
+
+
 def parse_gemini_response(response_text: str) -> Optional[List[Dict]]:
     """Parse Gemini response and extract JSON array."""
     try:
         # Remove markdown code blocks if present
-        text = response_text.strip()
-        text = re.sub(r'^```json\s*', '', text)
-        text = re.sub(r'^```\s*', '', text)
-        text = re.sub(r'\s*```$', '', text)
-        text = text.strip()
+        text = _FENCE_RE.match(response_text.strip()).group(1)
         
         # Parse JSON
         recipes = json.loads(text)
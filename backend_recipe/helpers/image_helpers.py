@@ -2,7 +2,8 @@
 Image API Helpers - Shared utilities for image generation endpoints
 """
 
-from typing import Dict, Tuple
+import re
+from typing import Dict, List, Tuple
 from fastapi import HTTPException
 
 from config import user_sessions
@@ -60,3 +61,25 @@ def update_session_history(session: Dict, current_index: int, description: str):
     if session["recipe_history"] and session["recipe_history"][-1]["step_number"] == current_index:
         session["recipe_history"][-1]["image_generated"] = True
         session["recipe_history"][-1]["image_prompt"] = description
+
+
+def extract_session_ingredients(session: Dict) -> List[str]:
+    """
+    Extract ingredient names from the session's parsed recipe
+    
+    Args:
+        session: User session dictionary
+        
+    Returns:
+        List of ingredient names (empty if no parsed recipe)
+    """
+    recipe_ingredients = []
+    recipe_data = session.get("parsed_recipe")
+    if recipe_data and "ingredients" in recipe_data:
+        ingredients_lines = recipe_data["ingredients"].strip().split('\n')
+        for line in ingredients_lines:
+            # Extract ingredient name (before quantities/measurements)
+            ingredient_match = re.search(r'-\s*([^-\d]+?)(?:\s*[-\d]|$)', line)
+            if ingredient_match:
+                recipe_ingredients.append(ingredient_match.group(1).strip())
+    return recipe_ingredients
@@ -100,6 +100,8 @@ async def lifespan(app: FastAPI):
     
     # Clean up resources on shutdown
     print("🛑 Shutting down Recipe Recommender API...")
+    from core.top_recipes_service import close_supabase_pool
+    close_supabase_pool()
 
 # ============================================================
 # FastAPI App Setup
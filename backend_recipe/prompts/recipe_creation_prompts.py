@@ -2,17 +2,21 @@
 Recipe Creation Prompts
 ========================
 Prompts for generating complete recipes from scratch
+
+Text prompts keep their static instructions first and the per-recipe fields
+last, so repeat calls share a long identical prefix that the model
+provider's implicit prompt cache can reuse.
 """
 
+from string import Formatter
+from typing import Tuple, Union
+
 # ============================================================================
 # Recipe Name Generation
 # ============================================================================
 
 RECIPE_NAME_PROMPT = """You are a culinary expert. Given a dish name, format it as a proper, appealing recipe name.
 
-Dish Name: {dish_name}
-Region: {region}
-
 Return ONLY the formatted recipe name, nothing else. Make it:
 - Properly capitalized
 - Clear and appealing
@@ -24,6 +28,9 @@ Examples:
 - Input: "pasta carbonara" → Output: "Classic Carbonara Pasta"
 - Input: "chicken biryani" → Output: "Hyderabadi Chicken Biryani"
 
+Dish Name: {dish_name}
+Region: {region}
+
 Your formatted recipe name:"""
 
 
@@ -33,9 +40,6 @@ Your formatted recipe name:"""
 
 RECIPE_DESCRIPTION_PROMPT = """You are a culinary expert. Write an appealing, informative description for this recipe.
 
-Recipe Name: {recipe_name}
-Region: {region}
-
 Write a 2-3 sentence description that:
 - Describes the dish's key flavors and characteristics
 - Mentions what makes it special or unique
@@ -44,6 +48,9 @@ Write a 2-3 sentence description that:
 
 Return ONLY the description text, nothing else.
 
+Recipe Name: {recipe_name}
+Region: {region}
+
 Your description:"""
 
 
@@ -53,9 +60,6 @@ Your description:"""
 
 INGREDIENTS_LIST_PROMPT = """You are a culinary expert. Generate a complete, authentic ingredients list for this recipe.
 
-Recipe Name: {recipe_name}
-Region: {region}
-
 Return a JSON array of ingredient objects. Each object must have:
 - "ingredient": name of the ingredient
 - "quantity": amount needed (with units)
@@ -77,6 +81,9 @@ Example format:
   {{"ingredient": "Garam masala", "quantity": "1 tsp", "notes": ""}}
 ]
 
+Recipe Name: {recipe_name}
+Region: {region}
+
 Your ingredients list (JSON only):"""
 
 
@@ -86,13 +93,7 @@ Your ingredients list (JSON only):"""
 
 STEPS_PROMPT = """You are a culinary expert. Generate detailed cooking steps for this recipe.
 
-Recipe Name: {recipe_name}
-Ingredients:
-{ingredients}
-
-Level: {level}
-
-Generate steps appropriate for a {level} cook:
+Generate steps appropriate for the cook's level (given below):
 - BEGINNER: Simple, detailed, explain techniques, smaller sub-steps
 - ADVANCED: Concise, assume knowledge, combine related actions
 
@@ -117,9 +118,92 @@ Example format:
   "Reduce heat to medium. Add ginger-garlic paste and cook for 30 seconds until fragrant."
 ]
 
+Recipe Name: {recipe_name}
+Ingredients:
+{ingredients}
+
+Level: {level}
+
 Your {level} steps (JSON only):"""
 
 
+STEPS_BOTH_PROMPT = """You are a culinary expert. Generate detailed cooking steps for this recipe at two skill levels.
+
+Generate two separate step lists:
+- BEGINNER: Simple, detailed, explain techniques, smaller sub-steps
+- ADVANCED: Concise, assume knowledge, combine related actions
+
+Each step should:
+- Be a clear, actionable instruction
+- Start with a verb (e.g., "Heat", "Add", "Mix", "Cook")
+- Include timing and temperature when relevant
+- Be 1-3 sentences long
+- Focus on one main action
+
+Requirements (for each level):
+- Include 8-15 steps total
+- Cover all major stages: prep, cooking, finishing
+- Be in logical chronological order
+- Include important tips inline (e.g., "until golden brown")
+
+Return a JSON object with two arrays of step strings:
+{{
+  "beginner": [
+    "Heat 2 tablespoons of oil in a large pan over medium-high heat until shimmering.",
+    "Add the cubed paneer and cook for 2-3 minutes per side until golden brown. Remove and set aside."
+  ],
+  "advanced": [
+    "Sear the paneer in hot oil until golden on all sides; set aside.",
+    "Char the peppers and onions, then bloom the ginger-garlic paste for 30 seconds."
+  ]
+}}
+
+Recipe Name: {recipe_name}
+Ingredients:
+{ingredients}
+
+Your beginner and advanced steps (JSON only):"""
+
+
+# ============================================================================
+# Adaptation Prompts (edit a similar recipe's output instead of regenerating)
+# ============================================================================
+
+INGREDIENTS_ADAPT_PROMPT = """You are a culinary expert. Adapt an existing ingredients list from a similar recipe to a new recipe.
+
+Keep ingredients that still belong, substitute or remove the ones that don't, and add anything the new recipe needs.
+Keep the same JSON format: an array of objects with "ingredient", "quantity" and "notes" (notes can be an empty string).
+The result must be a complete, authentic list of 8-15 specific ingredients with realistic quantities,
+main ingredients first, then spices/seasonings.
+
+Similar recipe: {old_dish}
+Its ingredients:
+{old_ingredients}
+
+New recipe: {new_dish}
+Region: {region}
+
+Your adapted ingredients list (JSON only):"""
+
+
+STEPS_ADAPT_PROMPT = """You are a culinary expert. Adapt the beginner and advanced cooking steps of a similar recipe to a new recipe.
+
+Rewrite, add or remove steps so they match the new recipe and its ingredients exactly; keep what still applies.
+Each step starts with a verb, is 1-3 sentences, and includes timing and temperature when relevant.
+BEGINNER steps are simple and detailed; ADVANCED steps are concise and combine related actions. 8-15 steps per level.
+Return the same JSON format: {{"beginner": [...], "advanced": [...]}}
+
+Similar recipe: {old_dish}
+Its steps:
+{old_steps}
+
+New recipe: {new_dish}
+Ingredients:
+{ingredients}
+
+Your adapted beginner and advanced steps (JSON only):"""
+
+
 # ============================================================================
 # Image Generation Prompts
 # ============================================================================
@@ -206,15 +290,13 @@ REMEMBER: Horizontal 1024x680 format, NO TEXT of any kind, focus on making the d
 
 RECIPE_METADATA_PROMPT = """You are a culinary expert. Generate realistic metadata for this recipe.
 
-Recipe Name: {recipe_name}
-Region: {region}
-
 Return a JSON object with these fields:
 {{
   "prep_time_minutes": <realistic prep time in minutes>,
   "cook_time_minutes": <realistic cook time in minutes>,
   "calories": <estimated calories per serving, be realistic>,
   "rating": <estimated rating from 3.5 to 5.0>,
+  "difficulty": "<Easy, Medium or Hard>",
   "tastes": ["<primary taste>", "<secondary taste>"],
   "meal_types": ["<applicable meal type(s)>"],
   "dietary_tags": ["<applicable dietary tags>"]
@@ -228,11 +310,108 @@ Guidelines:
   * 4.5-5.0: Exceptional, popular, well-loved dishes
   * 4.0-4.4: Very good, solid traditional recipes
   * 3.5-3.9: Good, less common or acquired taste
+- DIFFICULTY: Exactly one of "Easy", "Medium", "Hard":
+  * Easy: Few steps, basic techniques, little active attention
+  * Medium: Several components or techniques, moderate timing
+  * Hard: Advanced techniques, precise timing, or many components
 - TASTES: Choose 2-3 primary tastes from: "Sweet", "Spicy", "Savory", "Sour", "Tangy", "Mild", "Rich", "Bitter", "Umami"
 - MEAL_TYPES: Choose 1-2 from: "Breakfast", "Lunch", "Dinner", "Snack", "Dessert", "Appetizer"
 - DIETARY_TAGS: Choose applicable tags from: "Vegetarian", "Vegan", "Non-Vegetarian", "Gluten-Free", "Dairy-Free", "Nut-Free", "Low-Carb", "High-Protein", "Keto-Friendly", "Paleo"
 
-Be realistic and authentic to the {region} cuisine.
+Return ONLY valid JSON, no markdown code blocks, no explanation.
+
+Recipe Name: {recipe_name}
+Region: {region}
+
+Be realistic and authentic to the {region} cuisine."""
+
+
+
+# ============================================================================
+# Full Recipe Generation (single call)
+# ============================================================================
+
+FULL_RECIPE_PROMPT = """You are a culinary expert. Create a complete, authentic recipe for this dish.
+
+Return ONE JSON object with exactly these fields:
+{{
+  "name": "<properly capitalized, appealing recipe name, 2-6 words>",
+  "description": "<2-3 sentence appetizing description of key flavors and what makes it special>",
+  "metadata": {{
+    "prep_time_minutes": <realistic prep time in minutes>,
+    "cook_time_minutes": <realistic cook time in minutes>,
+    "calories": <estimated calories per serving>,
+    "rating": <estimated rating from 3.5 to 5.0>,
+    "difficulty": "<Easy, Medium or Hard>",
+    "tastes": ["<primary taste>", "<secondary taste>"],
+    "meal_types": ["<applicable meal type(s)>"],
+    "dietary_tags": ["<applicable dietary tags>"]
+  }},
+  "ingredients": [
+    {{"ingredient": "<specific ingredient name>", "quantity": "<amount with units>", "notes": "<prep notes or empty string>"}}
+  ],
+  "steps_beginner": ["<step>", "..."],
+  "steps_advanced": ["<step>", "..."]
+}}
+
+Guidelines:
+- NAME: Authentic to the region (e.g., "chicken biryani" → "Hyderabadi Chicken Biryani")
+- METADATA: Prep 10-45 minutes, cook 15-90 minutes, 200-800 calories for most dishes
+- DIFFICULTY: Exactly one of "Easy", "Medium", "Hard" based on techniques, timing and number of components
+- TASTES: 2-3 from "Sweet", "Spicy", "Savory", "Sour", "Tangy", "Mild", "Rich", "Bitter", "Umami"
+- MEAL_TYPES: 1-2 from "Breakfast", "Lunch", "Dinner", "Snack", "Dessert", "Appetizer"
+- DIETARY_TAGS: Applicable tags from "Vegetarian", "Vegan", "Non-Vegetarian", "Gluten-Free", "Dairy-Free", "Nut-Free", "Low-Carb", "High-Protein", "Keto-Friendly", "Paleo"
+- INGREDIENTS: 8-15 specific ingredients with realistic quantities, main ingredients first, then spices/seasonings
+- STEPS: 8-15 steps each, in chronological order, each starting with a verb and 1-3 sentences long
+  * BEGINNER: Simple, detailed, explain techniques, smaller sub-steps
+  * ADVANCED: Concise, assume knowledge, combine related actions
+- Include timing and temperature in steps when relevant
+
+Return ONLY valid JSON, no markdown code blocks, no explanation.
+
+Dish Name: {dish_name}
+Region: {region}"""
 
-Return ONLY valid JSON, no markdown code blocks, no explanation."""
 
+# ============================================================================
+# Pre-split Templates
+# ============================================================================
+
+def _split_template(template: str) -> Tuple[Union[str, Tuple[str]], ...]:
+    """
+    Split a str.format template into literal segments and (field,) markers
+    once at import, so rendering is a single join instead of a re-parse
+    """
+    parts = []
+    for literal, field, _, _ in Formatter().parse(template):
+        if literal:
+            parts.append(literal)
+        if field is not None:
+            parts.append((field,))
+    return tuple(parts)
+
+
+_SPLIT_TEMPLATES = {
+    "RECIPE_NAME": _split_template(RECIPE_NAME_PROMPT),
+    "RECIPE_DESCRIPTION": _split_template(RECIPE_DESCRIPTION_PROMPT),
+    "INGREDIENTS_LIST": _split_template(INGREDIENTS_LIST_PROMPT),
+    "STEPS": _split_template(STEPS_PROMPT),
+    "STEPS_BOTH": _split_template(STEPS_BOTH_PROMPT),
+    "INGREDIENTS_ADAPT": _split_template(INGREDIENTS_ADAPT_PROMPT),
+    "STEPS_ADAPT": _split_template(STEPS_ADAPT_PROMPT),
+    "RECIPE_METADATA": _split_template(RECIPE_METADATA_PROMPT),
+    "FULL_RECIPE": _split_template(FULL_RECIPE_PROMPT),
+}
+
+
+def render(template_id: str, **kwargs) -> str:
+    """
+    Render a recipe creation prompt (same output as <template_id>_PROMPT.format(**kwargs))
+    
+    Example:
+        render("RECIPE_NAME", dish_name="paneer tikka", region="Indian")
+    """
+    return "".join(
+        part if isinstance(part, str) else str(kwargs[part[0]])
+        for part in _SPLIT_TEMPLATES[template_id]
+    )
@@ -3,6 +3,8 @@ Recipe regeneration prompt templates
 Used for generating beginner/advanced steps, validating ingredients, and generating images
 """
 
+from prompts.recipe_creation_prompts import _split_template
+
 # Ingredients image generation prompt
 INGREDIENTS_IMAGE_PROMPT = """Professional food photography showing ALL ingredients for this recipe arranged beautifully on a clean surface.
 
@@ -173,3 +175,26 @@ Create a purely visual photograph of the finished dish with ZERO text."""
 
 # Note: Step image prompts are now handled by core.step_image_prompt_generator
 # This ensures unified, cumulative state-based prompt generation across all flows
+
+
+# Parsed once at import; render() joins the pieces per call
+_SPLIT_TEMPLATES = {
+    "INGREDIENTS_IMAGE": _split_template(INGREDIENTS_IMAGE_PROMPT),
+    "BEGINNER_STEPS": _split_template(BEGINNER_STEPS_PROMPT),
+    "ADVANCED_STEPS": _split_template(ADVANCED_STEPS_PROMPT),
+    "INGREDIENT_VALIDATION": _split_template(INGREDIENT_VALIDATION_PROMPT),
+    "MAIN_IMAGE": _split_template(MAIN_IMAGE_PROMPT),
+}
+
+
+def render(template_id: str, **kwargs) -> str:
+    """
+    Render a recipe regeneration prompt (same output as <template_id>_PROMPT.format(**kwargs))
+    
+    Example:
+        render("MAIN_IMAGE", recipe_name="Paneer Tikka", description="Smoky grilled paneer")
+    """
+    return "".join(
+        part if isinstance(part, str) else str(kwargs[part[0]])
+        for part in _SPLIT_TEMPLATES[template_id]
+    )
@@ -6,6 +6,9 @@
 -- Date: October 29, 2025
 -- ============================================================================
 
+-- Trigram matching, for the name ILIKE '%...%' search index below
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Drop existing table if it exists (be careful in production!)
 DROP TABLE IF EXISTS top_recipes CASCADE;
 
@@ -42,6 +45,18 @@ CREATE TABLE top_recipes (
     image_url TEXT,
     step_image_urls TEXT[] DEFAULT '{}',
     
+    -- Regenerated content (JSONB so reads come back already decoded)
+    ingredients_image TEXT,
+    steps_beginner JSONB,
+    steps_advanced JSONB,
+    steps_beginner_images JSONB,  -- [{"url", "step_index", "generated_at"}]
+    steps_advanced_images JSONB,  -- [{"url", "step_index", "generated_at"}]
+    ingredient_image_urls JSONB,  -- [{"url", "ingredient_index", "ingredient_name"}]
+    
+    -- Cumulative prompt state per step type, for resuming step images
+    -- {"original": {...}, "beginner": {...}} (large entries: {"gzip": "<base64>"})
+    steps_state_snapshots JSONB,
+    
     -- Ratings and scores
     popularity_score DECIMAL(5,2) DEFAULT 0.0,
     rating DECIMAL(3,2) DEFAULT 0.0 CHECK (rating >= 0 AND rating <= 5),
@@ -57,13 +72,15 @@ CREATE TABLE top_recipes (
 -- Create indexes for common queries
 CREATE INDEX idx_top_recipes_region ON top_recipes(region);
 CREATE INDEX idx_top_recipes_difficulty ON top_recipes(difficulty);
-CREATE INDEX idx_top_recipes_rating ON top_recipes(rating DESC);
-CREATE INDEX idx_top_recipes_popularity ON top_recipes(popularity_score DESC);
+-- (sort column, id) matches get_top_recipes' ORDER BY, so pages come off the index
+CREATE INDEX idx_top_recipes_rating ON top_recipes(rating DESC, id DESC);
+CREATE INDEX idx_top_recipes_popularity ON top_recipes(popularity_score DESC, id DESC);
 CREATE INDEX idx_top_recipes_total_time ON top_recipes(total_time_minutes);
 CREATE INDEX idx_top_recipes_meal_types ON top_recipes USING GIN(meal_types);
 CREATE INDEX idx_top_recipes_dietary_tags ON top_recipes USING GIN(dietary_tags);
 CREATE INDEX idx_top_recipes_tastes ON top_recipes USING GIN(tastes);
 CREATE INDEX idx_top_recipes_name_search ON top_recipes USING GIN(to_tsvector('english', name));
+CREATE INDEX idx_top_recipes_name_trgm ON top_recipes USING GIN(name gin_trgm_ops);
 
 -- Create function to automatically update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -88,6 +105,22 @@ COMMENT ON COLUMN top_recipes.tastes IS 'JSONB array of taste profiles with inte
 COMMENT ON COLUMN top_recipes.ingredients IS 'JSONB array of ingredients: [{"quantity": "2", "unit": "cups", "name": "Rice", "preparation": "washed"}]';
 COMMENT ON COLUMN top_recipes.steps IS 'Array of cooking step instructions';
 COMMENT ON COLUMN top_recipes.step_image_urls IS 'Array of image URLs for each step (empty string if no image)';
+COMMENT ON COLUMN top_recipes.steps_state_snapshots IS 'Cumulative step-image prompt state per step type, used to resume generation';
+
+-- Existing databases: ALTER TABLE top_recipes ADD COLUMN IF NOT EXISTS steps_state_snapshots JSONB;
+-- Existing databases with the regenerated-content columns stored as TEXT:
+-- ALTER TABLE top_recipes
+--     ALTER COLUMN steps_beginner TYPE JSONB USING steps_beginner::jsonb,
+--     ALTER COLUMN steps_advanced TYPE JSONB USING steps_advanced::jsonb,
+--     ALTER COLUMN steps_beginner_images TYPE JSONB USING steps_beginner_images::jsonb,
+--     ALTER COLUMN steps_advanced_images TYPE JSONB USING steps_advanced_images::jsonb,
+--     ALTER COLUMN ingredient_image_urls TYPE JSONB USING ingredient_image_urls::jsonb;
+-- Existing databases, listing/search indexes:
+-- CREATE EXTENSION IF NOT EXISTS pg_trgm;
+-- DROP INDEX IF EXISTS idx_top_recipes_rating, idx_top_recipes_popularity;
+-- CREATE INDEX idx_top_recipes_rating ON top_recipes(rating DESC, id DESC);
+-- CREATE INDEX idx_top_recipes_popularity ON top_recipes(popularity_score DESC, id DESC);
+-- CREATE INDEX IF NOT EXISTS idx_top_recipes_name_trgm ON top_recipes USING GIN(name gin_trgm_ops);
 
 -- Grant permissions (adjust based on your Supabase setup)
 -- If using RLS (Row Level Security), add policies as needed
@@ -0,0 +1,79 @@
+"""
+Unit tests for core.top_recipes_service query paths (no database needed;
+the pooled connection is replaced with an in-memory fake).
+"""
+
+import sys
+import os
+from contextlib import contextmanager
+
+import pytest
+
+pytest.importorskip("psycopg_pool")
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from core import top_recipes_service
+
+
+class _FakeCursor:
+    """Serves LIMIT/OFFSET slices of `rows` with the window total attached"""
+    
+    def __init__(self, rows, name=None):
+        self._rows = rows
+        self.name = name
+        self.itersize = None
+        self._result = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def execute(self, query, params):
+        limit, offset = params[-2], params[-1]
+        page = self._rows[offset:offset + limit]
+        self._result = [{**row, '__total': len(self._rows)} for row in page]
+    
+    def __iter__(self):
+        return iter(self._result)
+
+
+class _FakeConnection:
+    def __init__(self, rows):
+        self._rows = rows
+        self.cursor_names = []
+    
+    def cursor(self, name=None):
+        self.cursor_names.append(name)
+        return _FakeCursor(self._rows, name)
+
+
+def _summary_row(recipe_id):
+    return {
+        'id': recipe_id, 'name': f"Recipe {recipe_id}", 'description': None,
+        'region': None, 'difficulty': None, 'total_time_minutes': None,
+        'servings': None, 'calories': None, 'image_url': None,
+        'rating': 0.0, 'popularity_score': 0.0, 'meal_types': [], 'dietary_tags': []
+    }
+
+
+def test_internal_large_limit_returns_every_row(monkeypatch):
+    """Callers fetching everything (limit=10000) are not capped at the public page size"""
+    rows = [_summary_row(i) for i in range(1, 451)]
+    conn = _FakeConnection(rows)
+    
+    @contextmanager
+    def fake_connection():
+        yield conn
+    
+    monkeypatch.setattr(top_recipes_service, "get_supabase_connection", fake_connection)
+    
+    recipes, total_count = top_recipes_service.get_top_recipes(limit=10000, detailed=False)
+    
+    assert len(rows) > top_recipes_service.TOP_RECIPES_MAX_LIMIT
+    assert total_count == len(rows)
+    assert [recipe.id for recipe in recipes] == [row['id'] for row in rows]
+    # Large pages still stream through the named server-side cursor
+    assert conn.cursor_names == ["top_recipes_stream"]
@@ -100,13 +100,13 @@ Composition: Clean background, properly plated, restaurant-quality presentation.
         
         # Generate image with Gemini (with retry logic)
         def generate_image():
-            image_base64, _ = image_gen._generate_with_imagen(prompt)
-            if not image_base64:
+            image_bytes, _ = image_gen._generate_imagen_bytes(prompt, use_cache=False)
+            if not image_bytes:
                 raise Exception("No image data returned from Gemini")
-            return image_base64
+            return image_bytes
         
         tracker.log(f"Generating main image for: {recipe_name}", "INFO", recipe_id, recipe_name)
-        image_base64 = retry_with_backoff(generate_image, max_retries=3, initial_delay=15)
+        image_bytes = retry_with_backoff(generate_image, max_retries=3, initial_delay=15)
         
         # Upload to S3 (with retry logic)
         def upload_to_s3():
@@ -114,7 +114,7 @@ Composition: Clean background, properly plated, restaurant-quality presentation.
             return s3_service.upload_recipe_main_image(
                 recipe_id=recipe_id,
                 recipe_name=recipe_name,
-                image_base64=image_base64,
+                image_bytes=image_bytes,
                 archive_existing=True
             )
         
@@ -267,10 +267,10 @@ def generate_step_images_with_retry(
             
             # Generate image
             def generate_step_image():
-                image_base64, _ = image_gen._generate_with_imagen(prompt)
-                if not image_base64:
+                image_bytes, _ = image_gen._generate_imagen_bytes(prompt, use_cache=False)
+                if not image_bytes:
                     raise Exception("No image data returned from Gemini")
-                return image_base64
+                return image_bytes
             
             tracker.log(
                 f"Generating step {step_num}/{total_steps} image ({step_type})",
@@ -279,7 +279,7 @@ def generate_step_images_with_retry(
                 recipe_name
             )
             
-            image_base64 = retry_with_backoff(generate_step_image, max_retries=3, initial_delay=15)
+            image_bytes = retry_with_backoff(generate_step_image, max_retries=3, initial_delay=15)
             
             # Upload to S3 with step_type
             def upload_step_to_s3():
@@ -287,7 +287,7 @@ def generate_step_images_with_retry(
                     recipe_id=recipe_id,
                     recipe_name=recipe_name,
                     step_index=step_num,
-                    image_base64=image_base64,
+                    image_bytes=image_bytes,
                     archive_existing=True,
                     step_type=step_type
                 )
@@ -15,6 +15,17 @@ from psycopg.rows import dict_row
 import os
 from dotenv import load_dotenv
 
+# orjson when available (ingredient validation input and step lists), stdlib otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(data) -> str:
+        return orjson.dumps(data).decode("utf-8")
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 from core.top_recipes_service import get_recipe_by_id, get_top_recipes, update_recipe
 from core.recipe_regeneration_service import RecipeRegenerationService
 
@@ -306,10 +317,11 @@ def process_single_recipe(
                 _fix_steps_text(recipe, service, updates)
         else:
             # Generate mode - normal flow
-            if fix_main_image:
+            if fix_main_image and fix_ingredients_image:
+                _fix_main_and_ingredients_images(recipe, service, updates)
+            elif fix_main_image:
                 _fix_main_image(recipe, service, updates)
-            
-            if fix_ingredients_image:
+            elif fix_ingredients_image:
                 _fix_ingredients_image(recipe, service, updates)
             
             if fix_ingredients_text:
@@ -343,7 +355,8 @@ def process_single_recipe(
             "ERROR",
             recipe_id,
             recipe_name,
-            error_details={"error": error_msg, "traceback": traceback.format_exc()}
+            # No traceback here: the job loop logs it once for the re-raised error
+            error_details={"error": error_msg}
         )
         # Re-raise to allow upstream handler to track rate limits and terminate if needed
         raise
@@ -370,7 +383,7 @@ def _fix_ingredients_image(recipe: Dict, service: RecipeRegenerationService, upd
     """Fix ingredients image if null"""
     ingredients = recipe.get('ingredients', '')
     if isinstance(ingredients, (list, dict)):
-        ingredients = json.dumps(ingredients)
+        ingredients = _json_dumps(ingredients)
     
     current_ingredients_image = recipe.get('ingredients_image')
     new_ingredients_image = service.generate_ingredients_image(
@@ -383,11 +396,33 @@ def _fix_ingredients_image(recipe: Dict, service: RecipeRegenerationService, upd
         updates['ingredients_image'] = new_ingredients_image
 
 
+def _fix_main_and_ingredients_images(recipe: Dict, service: RecipeRegenerationService, updates: Dict):
+    """Fix main and ingredients images if null (generated concurrently)"""
+    ingredients = recipe.get('ingredients', '')
+    if isinstance(ingredients, (list, dict)):
+        ingredients = _json_dumps(ingredients)
+    
+    current_image = recipe.get('image_url')
+    current_ingredients_image = recipe.get('ingredients_image')
+    new_image, new_ingredients_image = service.generate_all_images(
+        recipe['id'],
+        recipe['name'],
+        recipe.get('description', ''),
+        ingredients,
+        current_image,
+        current_ingredients_image
+    )
+    if new_image and new_image != current_image:
+        updates['image_url'] = new_image
+    if new_ingredients_image and new_ingredients_image != current_ingredients_image:
+        updates['ingredients_image'] = new_ingredients_image
+
+
 def _fix_ingredients_text(recipe: Dict, service: RecipeRegenerationService, updates: Dict):
     """Validate and fix ingredients text"""
     ingredients = recipe.get('ingredients', '')
     if isinstance(ingredients, (list, dict)):
-        ingredients = json.dumps(ingredients)
+        ingredients = _json_dumps(ingredients)
     
     validation_result = service.validate_and_fix_ingredients(
         recipe['id'],
@@ -403,41 +438,35 @@ def _fix_steps_text(recipe: Dict, service: RecipeRegenerationService, updates: D
     """Generate or complete beginner and advanced steps"""
     ingredients = recipe.get('ingredients', '')
     if isinstance(ingredients, (list, dict)):
-        ingredients = json.dumps(ingredients)
+        ingredients = _json_dumps(ingredients)
     
     steps = recipe.get('steps', '')
     if isinstance(steps, (list, dict)):
-        steps = json.dumps(steps)
+        steps = _json_dumps(steps)
     
-    # Beginner steps
+    # Beginner and advanced steps are independent, so generate them concurrently
     existing_beginner = recipe.get('steps_beginner')
-    if not existing_beginner or len(existing_beginner) < 10:
-        beginner_steps = service.generate_beginner_steps(
-            recipe['id'],
-            recipe['name'],
-            recipe.get('description', ''),
-            ingredients,
-            steps,
-            existing_steps=existing_beginner,
-            desired_count=10
-        )
-        if beginner_steps:
-            updates['steps_beginner'] = json.dumps(beginner_steps)
-    
-    # Advanced steps
     existing_advanced = recipe.get('steps_advanced')
-    if not existing_advanced or len(existing_advanced) < 8:
-        advanced_steps = service.generate_advanced_steps(
-            recipe['id'],
-            recipe['name'],
-            recipe.get('description', ''),
-            ingredients,
-            steps,
-            existing_steps=existing_advanced,
-            desired_count=8
-        )
-        if advanced_steps:
-            updates['steps_advanced'] = json.dumps(advanced_steps)
+    need_beginner = not existing_beginner or len(existing_beginner) < 10
+    need_advanced = not existing_advanced or len(existing_advanced) < 8
+    if not (need_beginner or need_advanced):
+        return
+    
+    beginner_steps, advanced_steps = service.generate_both_step_texts(
+        recipe['id'],
+        recipe['name'],
+        recipe.get('description', ''),
+        ingredients,
+        steps,
+        existing_beginner=existing_beginner,
+        existing_advanced=existing_advanced,
+        beginner=need_beginner,
+        advanced=need_advanced
+    )
+    if beginner_steps:
+        updates['steps_beginner'] = _json_dumps(beginner_steps)
+    if advanced_steps:
+        updates['steps_advanced'] = _json_dumps(advanced_steps)
 
 
 def _fix_steps_images(recipe: Dict, service: RecipeRegenerationService, tracker: RecipeRegenerationTracker, updates: Dict):
@@ -451,7 +480,8 @@ def _fix_steps_images(recipe: Dict, service: RecipeRegenerationService, tracker:
         _generate_step_images_if_needed(
             recipe_id, recipe_name, beginner_steps,
             recipe.get('steps_beginner_images', []) or [],
-            "beginner", service, tracker, updates
+            "beginner", service, tracker, updates,
+            recipe_obj=recipe
         )
     
     # Advanced step images
@@ -460,7 +490,8 @@ def _fix_steps_images(recipe: Dict, service: RecipeRegenerationService, tracker:
         _generate_step_images_if_needed(
             recipe_id, recipe_name, advanced_steps,
             recipe.get('steps_advanced_images', []) or [],
-            "advanced", service, tracker, updates
+            "advanced", service, tracker, updates,
+            recipe_obj=recipe
         )
 
 
@@ -468,7 +499,7 @@ def _get_steps_from_recipe_or_updates(recipe: Dict, updates: Dict, key: str) ->
     """Get steps from updates or recipe"""
     if key in updates:
         steps = updates[key]
-        return json.loads(steps) if isinstance(steps, str) else steps
+        return _json_loads(steps) if isinstance(steps, str) else steps
     return recipe.get(key)
 
 
@@ -480,7 +511,8 @@ def _generate_step_images_if_needed(
     step_type: str,
     service: RecipeRegenerationService,
     tracker: RecipeRegenerationTracker,
-    updates: Dict
+    updates: Dict,
+    recipe_obj: Optional[Dict] = None
 ):
     """Generate step images if missing"""
     existing_count = len(existing_images)
@@ -497,11 +529,12 @@ def _generate_step_images_if_needed(
         )
         
         new_images = service.generate_step_images(
-            recipe_id, recipe_name, steps, existing_images, step_type=step_type
+            recipe_id, recipe_name, steps, existing_images, step_type=step_type,
+            recipe_obj=recipe_obj
         )
         
         if len(new_images) > existing_count:
-            updates[f'steps_{step_type}_images'] = json.dumps(new_images)
+            updates[f'steps_{step_type}_images'] = _json_dumps(new_images)
             tracker.log(
                 f"Successfully generated {len(new_images) - existing_count} {step_type} step images. "
                 f"Total: {len(new_images)}/{required_count}",
@@ -539,7 +572,7 @@ def _update_recipe_in_db(recipe_id: int, recipe_name: str, updates: Dict, tracke
         for key, value in updates.items():
             if key in jsonb_columns:
                 # Serialize to JSON string for JSONB columns
-                values.append(json.dumps(value) if value is not None else None)
+                values.append(_json_dumps(value) if value is not None else None)
             else:
                 values.append(value)
         values.append(recipe_id)
@@ -732,6 +765,8 @@ def start_recipe_regeneration(
                     "ERROR"
                 )
                 tracker.complete_job('failed', error_message)
+                service.clear_recipe_cache()
+                service.close()
                 return {
                     "success": False,
                     "message": error_message,
@@ -828,6 +863,9 @@ def start_recipe_regeneration(
             # Small delay between recipes
             time.sleep(1)
         
+        service.clear_recipe_cache()
+        service.close()
+        
         # Complete job
         tracker.complete_job('completed')
         tracker.log(